@@ -0,0 +1,60 @@
+# api/async_views.py
+"""
+Base class for async API views.
+
+DRF's APIView is sync-only, so the async variants of I/O-bound endpoints
+are plain Django async views. AsyncAPIView covers the parts of APIView
+those endpoints use: the DEFAULT_AUTHENTICATION_CLASSES (run through
+sync_to_async, since they read the cache and the database), an
+IsAuthenticated check, and errors shaped like DRF's.
+"""
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.settings import api_settings
+
+
+class AsyncAPIView(View):
+    """Handlers must be async def; request.user is the token's user."""
+    authentication_required = True
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        # Token-authenticated like APIView, which is csrf_exempt too
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    @staticmethod
+    def authenticate(request, authenticators):
+        """The user of the first authenticator that accepts the request, or None."""
+        for authenticator in authenticators:
+            result = authenticator.authenticate(request)
+            if result is not None:
+                return result[0]
+        return None
+
+    async def dispatch(self, request, *args, **kwargs):
+        authenticators = [auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+        header = next(filter(None, (auth.authenticate_header(request) for auth in authenticators)), None)
+        try:
+            user = await sync_to_async(self.authenticate)(request, authenticators)
+        except exceptions.AuthenticationFailed as e:
+            return self.unauthenticated(e.detail, header)
+        if user is not None:
+            request.user = user
+        elif self.authentication_required:
+            return self.unauthenticated(exceptions.NotAuthenticated.default_detail, header)
+        return await super().dispatch(request, *args, **kwargs)
+
+    @staticmethod
+    def unauthenticated(detail, header):
+        # Like DRF: 401 with a challenge when an authenticator offers one, else 403
+        response = JsonResponse(
+            {"detail": str(detail)},
+            status=status.HTTP_401_UNAUTHORIZED if header else status.HTTP_403_FORBIDDEN,
+        )
+        if header:
+            response["WWW-Authenticate"] = header
+        return response
@@ -0,0 +1,111 @@
+# api/conditional.py
+"""
+Conditional GET for read endpoints that clients poll.
+
+@conditional_get(sources) builds validators from the querysets a response
+is made of: the row count and latest updated_at (created_at where there is
+none) of each, read together in one UNION query. When the request's
+If-None-Match or If-Modified-Since still matches, the view returns 304
+without running its own queries or serializers; otherwise the response
+carries ETag and Last-Modified.
+
+Inserts and edits move the latest timestamp; deletes change the count.
+Last-Modified can't show a delete, and If-None-Match wins when a client
+sends both, so clients should echo the ETag.
+"""
+import hashlib
+from functools import wraps
+
+from django.db.models import CharField, Count, Max, Value
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def timestamp_field(model):
+    names = {field.name for field in model._meta.concrete_fields}
+    return "updated_at" if "updated_at" in names else "created_at"
+
+
+def queryset_state(queryset, label):
+    """(label, row count, latest timestamp) of queryset, as a one-row values_list queryset."""
+    return (
+        queryset.order_by()
+        .annotate(source=Value(label, output_field=CharField()))
+        .values("source")
+        .annotate(count=Count("pk"), latest=Max(timestamp_field(queryset.model)))
+        .values_list("source", "count", "latest")
+    )
+
+
+def seminar_rows():
+    """
+    Seminars for sources, read without SeminarManager's UPDATE: the view runs
+    it when it renders, and seminar_catalog() covers what it would change.
+    """
+    from seminars.models import Seminar
+
+    return Seminar._base_manager.all()
+
+
+def seminar_catalog():
+    """What a nested SeminarSerializer reads besides the seminar rows themselves."""
+    from certificates.models import CertificateTemplate
+    from seminars.models import Category
+
+    return [
+        Category.objects.all(),
+        CertificateTemplate.objects.all(),
+        # Past their end but not yet marked done: the count moves when a seminar ends
+        seminar_rows().filter(is_done=False, date_end__lt=timezone.now()),
+    ]
+
+
+def compute_validators(querysets, *extra):
+    """(quoted ETag, latest timestamp or None), in one query; extra values are mixed into the ETag."""
+    states = [queryset_state(queryset, f"{i}:{queryset.model._meta.label}") for i, queryset in enumerate(querysets)]
+    rows = states[0].union(*states[1:], all=True) if states else []
+    found = {source: (count, stamp) for source, count, stamp in rows}
+
+    parts = [str(value) for value in extra]
+    latest = None
+    for state in states:
+        source = state.query.annotations["source"].value
+        count, stamp = found.get(source, (0, None))
+        parts.append(f"{source}:{count}:{stamp.isoformat() if stamp else ''}")
+        if stamp is not None and (latest is None or stamp > latest):
+            latest = stamp
+    etag = quote_etag(hashlib.md5("|".join(parts).encode()).hexdigest())
+    return etag, latest
+
+
+def conditional_get(sources):
+    """
+    Decorate a GET handler of an APIView or viewset. sources(view, request,
+    *args, **kwargs) returns the querysets the response is built from.
+    """
+
+    def decorator(method):
+        @wraps(method)
+        def wrapped(view, request, *args, **kwargs):
+            # Same URL, different representation: per user and per renderer (JSON vs browsable)
+            etag, latest = compute_validators(
+                sources(view, request, *args, **kwargs),
+                request.get_full_path(),
+                getattr(request.user, "pk", None),
+                getattr(request, "accepted_media_type", ""),
+            )
+            last_modified = int(latest.timestamp()) if latest is not None else None
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = method(view, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            response.setdefault("ETag", etag)
+            if last_modified is not None:
+                response.setdefault("Last-Modified", http_date(last_modified))
+            return response
+
+        return wrapped
+
+    return decorator
@@ -0,0 +1,123 @@
+# api/dashboard.py
+"""
+Everything the participant dashboard shows, in one response.
+
+load_dashboard_user() reads the user with their planned seminars, attended
+seminars, evaluations and hosted certificates: five queries whatever the
+user's history, each kept by only() to the columns UserDashboardSerializer
+reads.
+
+get_dashboard() caches the serialized result per user in DASHBOARD_CACHE.
+api.signals drops a user's entry when one of their rows changes and bumps
+a generation key when seminars, categories or templates change, since
+those show on every user's dashboard. Seminars flipped to done by
+SeminarManager (a bulk update, no signals) show up within
+DASHBOARD_CACHE_SECONDS.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Prefetch, Q
+from django.utils import timezone
+
+from attendance.models import AttendedSeminar
+from certificates.models import Certificate
+from evaluation.models import RATING_FIELDS, Evaluation
+from evaluation.serializers import stored_certificate_id
+from seminars.models import PlannedSeminar
+from users.models import CustomUser
+
+from .serializers import UserDashboardSerializer
+
+GENERATION_KEY = "dashboard:generation"
+
+# Columns read by the nested SeminarSerializer
+SEMINAR_FIELDS = (
+    "id", "title", "description", "speaker", "venue", "date_start", "date_end",
+    "duration_minutes", "is_done", "created_at",
+    "category__id", "category__name",
+    "certificate_template__id", "certificate_template__seminar", "certificate_template__template_image",
+    "certificate_template__name_font_size", "certificate_template__title_font_size",
+    "certificate_template__default_used",
+)
+SEMINAR_RELATED = ("seminar__category", "seminar__certificate_template")
+
+
+def _seminar_fields(prefix="seminar__"):
+    return [prefix + field for field in SEMINAR_FIELDS]
+
+
+def dashboard_prefetches():
+    return [
+        Prefetch(
+            "planned_seminars",
+            queryset=PlannedSeminar.objects
+            # Same as SeminarManager marking finished seminars done, without its UPDATE
+            .filter(seminar__is_done=False, seminar__date_end__gte=timezone.now())
+            .select_related(*SEMINAR_RELATED)
+            .only("id", "user", "created_at", *_seminar_fields())
+            .order_by("seminar__date_start"),
+        ),
+        Prefetch(
+            "attended_seminars",
+            queryset=AttendedSeminar.objects.select_related(*SEMINAR_RELATED).only(
+                "id", "user", "check_in_time", "check_out_time", "attended_at", "duration_minutes",
+                "certificate_issued", "certificate_issued_at", *_seminar_fields(),
+            ),
+        ),
+        Prefetch(
+            "evaluations",
+            queryset=Evaluation.objects.select_related(*SEMINAR_RELATED)
+            .annotate(stored_certificate_id=stored_certificate_id())
+            .only("id", "user", "suggestions", "is_completed", "created_at", *RATING_FIELDS, *_seminar_fields()),
+        ),
+        Prefetch(
+            "certificate_set",
+            queryset=Certificate.objects.filter(Q(file_path__gt="") | Q(file__isnull=False))
+            .select_related("seminar")
+            .only("id", "user", "created_at", "seminar__id", "seminar__title")
+            .order_by("-created_at"),
+            to_attr="stored_certificates",
+        ),
+    ]
+
+
+def load_dashboard_user(user_id):
+    return (
+        CustomUser.objects.only("id", "username", "first_name", "last_name", "email", "role", "is_email_verified")
+        .prefetch_related(*dashboard_prefetches())
+        .get(pk=user_id)
+    )
+
+
+def _cache():
+    return caches[getattr(settings, "DASHBOARD_CACHE", "default")]
+
+
+def _user_key(user_id):
+    return f"dashboard:user:{user_id}"
+
+
+def get_dashboard(user):
+    """Serialized dashboard for user, from the cache when nothing it shows has changed."""
+    cache = _cache()
+    key = _user_key(user.pk)
+    cached = cache.get_many([key, GENERATION_KEY])
+    generation = cached.get(GENERATION_KEY)
+    entry = cached.get(key)
+    if entry is not None and entry[0] == generation:
+        return entry[1]
+
+    data = UserDashboardSerializer(load_dashboard_user(user.pk)).data
+    cache.set(key, (generation, data), getattr(settings, "DASHBOARD_CACHE_SECONDS", 300))
+    return data
+
+
+def invalidate_dashboard(user_id):
+    _cache().delete(_user_key(user_id))
+
+
+def invalidate_all_dashboards():
+    """Expire every user's entry at once, for changes to shared rows like seminars."""
+    _cache().set(GENERATION_KEY, uuid.uuid4().hex, None)
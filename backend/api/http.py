@@ -0,0 +1,77 @@
+# api/http.py
+"""
+Pooled async HTTP client for async views and the async mail worker.
+
+get_async_client() returns one httpx.AsyncClient per event loop, so every
+request a loop serves shares its keep-alive pool of up to
+ASYNC_HTTP_MAX_CONNECTIONS connections. A client can't be used outside the
+loop it was created in: under ASGI the server's loop lives as long as the
+worker and so does its client, while an async view served over WSGI runs
+in a throwaway loop and gets a throwaway client. Calls are added to the
+current request's timings like the urllib3 hook in api.instrumentation.
+httpx is imported on first use to keep it out of worker startup.
+"""
+import asyncio
+import threading
+import time
+import weakref
+
+from django.conf import settings
+
+from .instrumentation import record_http
+
+_clients = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+_transport_class = None
+
+
+def _timed_transport_class():
+    global _transport_class
+    if _transport_class is None:
+        import httpx
+
+        class TimedTransport(httpx.AsyncHTTPTransport):
+            async def handle_async_request(self, request):
+                started = time.perf_counter()
+                try:
+                    return await super().handle_async_request(request)
+                finally:
+                    record_http(request.url.host, (time.perf_counter() - started) * 1000)
+
+        _transport_class = TimedTransport
+    return _transport_class
+
+
+def build_async_client(max_connections=None, timeout=None, **kwargs):
+    """A new AsyncClient with its own connection pool."""
+    import httpx
+
+    max_connections = max_connections or getattr(settings, "ASYNC_HTTP_MAX_CONNECTIONS", 100)
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=min(getattr(settings, "ASYNC_HTTP_MAX_KEEPALIVE", 20), max_connections),
+    )
+    timeout = httpx.Timeout(
+        timeout or getattr(settings, "ASYNC_HTTP_TIMEOUT", 30),
+        connect=getattr(settings, "ASYNC_HTTP_CONNECT_TIMEOUT", 5),
+    )
+    return httpx.AsyncClient(transport=_timed_transport_class()(limits=limits), timeout=timeout, **kwargs)
+
+
+def get_async_client():
+    """The running loop's shared client, built on first use."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        with _lock:
+            client = _clients.get(loop)
+            if client is None or client.is_closed:
+                client = _clients[loop] = build_async_client()
+    return client
+
+
+async def close_async_client():
+    """Close the running loop's shared client, e.g. before a worker's loop exits."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -0,0 +1,137 @@
+# api/importtime.py
+"""
+Worker cold-start import profile.
+
+profile_startup() boots the project in a fresh interpreter run with
+-X importtime: django.setup(), the URLconf, and the WSGI handler with its
+middleware, which is what a gunicorn worker imports before it serves its
+first request. The per-module times Python writes to stderr are parsed
+into an ImportProfile. check_startup() compares the fastest of a few runs
+against settings.STARTUP_IMPORT_BUDGET_MS and lists any of
+settings.STARTUP_DEFERRED_MODULES that got imported at boot;
+loaded_at_startup() only does the latter, from sys.modules.
+
+The boot runs with the current settings module and refuses database
+connections: booting must not need one, and the check must never write
+to whichever database the settings point at.
+"""
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+
+BOOT_SCRIPT = """
+import importlib
+import sys
+
+from django.db.backends.base import base
+
+
+def refuse_connection(self):
+    raise RuntimeError(f"Startup opened a connection to the {self.alias!r} database")
+
+
+base.BaseDatabaseWrapper.ensure_connection = refuse_connection
+
+import django
+
+django.setup()
+from django.conf import settings
+
+importlib.import_module(settings.ROOT_URLCONF)
+from django.core.handlers.wsgi import WSGIHandler
+
+WSGIHandler()
+"""
+
+PRINT_MODULES = "\nimport json; print(json.dumps(sorted(sys.modules)))\n"
+
+
+def _loaded(names, modules):
+    """Which of names (or their submodules) are in modules."""
+    return sorted(
+        name for name in names
+        if any(m == name or m.startswith(name + ".") for m in modules)
+    )
+
+
+def _boot(script, *flags):
+    env = dict(os.environ)
+    env["DJANGO_SETTINGS_MODULE"] = settings.SETTINGS_MODULE
+    completed = subprocess.run(
+        [sys.executable, *flags, "-c", script],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, timeout=120,
+    )
+    if completed.returncode:
+        raise RuntimeError(f"Startup failed:\n{completed.stderr[-2000:]}")
+    return completed
+
+
+class ImportProfile:
+    """Parsed -X importtime output: (module, self_us, cumulative_us, depth) rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    @classmethod
+    def parse(cls, text):
+        rows = []
+        for line in text.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            # One space of padding, then two per nesting level
+            depth = (len(name) - len(name.lstrip())) // 2
+            rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+        return cls(rows)
+
+    @property
+    def modules(self):
+        return {row[0] for row in self.rows}
+
+    @property
+    def total_ms(self):
+        return sum(row[1] for row in self.rows) / 1000
+
+    def loaded(self, names):
+        """Which of names (or their submodules) were imported."""
+        return _loaded(names, self.modules)
+
+    def slowest(self, count=15):
+        """Top-level imports by cumulative time: what each import statement at boot cost."""
+        roots = [row for row in self.rows if row[3] == 0]
+        return sorted(roots, key=lambda row: row[2], reverse=True)[:count]
+
+
+def profile_startup(script=BOOT_SCRIPT):
+    """Run script under -X importtime in a fresh interpreter and return its ImportProfile."""
+    return ImportProfile.parse(_boot(script, "-X", "importtime").stderr)
+
+
+def loaded_at_startup(deferred=None):
+    """Which of STARTUP_DEFERRED_MODULES a fresh worker boot leaves in sys.modules."""
+    deferred = deferred if deferred is not None else settings.STARTUP_DEFERRED_MODULES
+    modules = json.loads(_boot(BOOT_SCRIPT + PRINT_MODULES).stdout.splitlines()[-1])
+    return _loaded(deferred, modules)
+
+
+def check_startup(runs=3, budget_ms=None, deferred=None):
+    """
+    Profile runs cold starts and return (fastest profile, problems). problems
+    is empty when the fastest run is within budget and no deferred module
+    was imported in any run.
+    """
+    budget_ms = budget_ms if budget_ms is not None else settings.STARTUP_IMPORT_BUDGET_MS
+    deferred = deferred if deferred is not None else settings.STARTUP_DEFERRED_MODULES
+    profiles = [profile_startup() for _ in range(max(runs, 1))]
+    fastest = min(profiles, key=lambda p: p.total_ms)
+
+    problems = []
+    if fastest.total_ms > budget_ms:
+        problems.append(f"Startup imports took {fastest.total_ms:.0f}ms (budget {budget_ms}ms)")
+    eager = sorted({name for profile in profiles for name in profile.loaded(deferred)})
+    if eager:
+        problems.append(f"Imported at startup but should be deferred: {', '.join(eager)}")
+    return fastest, problems
@@ -0,0 +1,341 @@
+# api/instrumentation.py
+"""
+Per-request timing: query count, DB time, outbound HTTP time and total time.
+
+RequestMetricsMiddleware times every request, adds a Server-Timing header,
+and records the numbers in a rolling per-route histogram that the admin
+metrics endpoint reads. DB time comes from a connection execute_wrapper;
+HTTP time comes from a hook on urllib3's connection pool, which requests,
+cloudinary and the Brevo SDK all send through, and from record_http() for
+httpx (api.http). Work on background threads has no current request and
+isn't counted.
+
+Under ASGI the middleware runs async, so async views aren't pushed onto a
+thread. Connections must not be touched from the event loop there; the
+execute_wrapper is added to each connection as it opens instead.
+"""
+from collections import deque
+from contextlib import ExitStack
+import contextvars
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+DEFAULT_HTTP_SERVICES = {
+    "brevo": ("brevo.com", "sendinblue.com"),
+    "cloudinary": ("cloudinary.com",),
+}
+
+_current = contextvars.ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    """What the current request has spent so far."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_ms = 0.0
+        self.http_calls = 0
+        self.http_ms = {}
+        self._in_http = False
+
+    @property
+    def http_total_ms(self):
+        return sum(self.http_ms.values())
+
+    def add_http(self, service, ms):
+        self.http_calls += 1
+        self.http_ms[service] = self.http_ms.get(service, 0.0) + ms
+
+    def server_timing(self, total_ms):
+        parts = [f'db;dur={self.db_ms:.1f};desc="{self.queries} queries"']
+        for service, ms in sorted(self.http_ms.items()):
+            parts.append(f"http-{service};dur={ms:.1f}")
+        app_ms = max(total_ms - self.db_ms - self.http_total_ms, 0.0)
+        parts.append(f"app;dur={app_ms:.1f}")
+        parts.append(f"total;dur={total_ms:.1f}")
+        return ", ".join(parts)
+
+
+def current_timings():
+    """The RequestTimings of the request being handled, or None."""
+    return _current.get()
+
+
+def _time_query(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.db_ms += (time.perf_counter() - started) * 1000
+
+
+def _http_service(host):
+    host = (host or "").lower()
+    services = getattr(settings, "REQUEST_METRICS_HTTP_SERVICES", DEFAULT_HTTP_SERVICES)
+    for service, domains in services.items():
+        if any(host == domain or host.endswith("." + domain) for domain in domains):
+            return service
+    return "other"
+
+
+def record_http(host, ms):
+    """Count an outbound call that didn't go through urllib3 against the current request."""
+    timings = _current.get()
+    if timings is not None:
+        timings.add_http(_http_service(host), ms)
+
+
+def _wrap_new_connection(sender, connection, **kwargs):
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_time_query)
+
+
+def install_db_timing():
+    """Time queries on every connection opened from now on (async mode)."""
+    connection_created.connect(_wrap_new_connection, dispatch_uid="api.instrumentation.db_timing")
+
+
+_http_hook_installed = False
+_http_hook_lock = threading.Lock()
+
+
+def install_http_timing():
+    """Wrap urllib3's HTTPConnectionPool.urlopen once per process."""
+    global _http_hook_installed
+    with _http_hook_lock:
+        if _http_hook_installed:
+            return
+        from urllib3.connectionpool import HTTPConnectionPool
+
+        original = HTTPConnectionPool.urlopen
+
+        def urlopen(self, method, url, *args, **kwargs):
+            timings = _current.get()
+            # urlopen calls itself for retries and redirects; time the outer call only
+            if timings is None or timings._in_http:
+                return original(self, method, url, *args, **kwargs)
+            timings._in_http = True
+            started = time.perf_counter()
+            try:
+                return original(self, method, url, *args, **kwargs)
+            finally:
+                timings._in_http = False
+                timings.add_http(_http_service(self.host), (time.perf_counter() - started) * 1000)
+
+        HTTPConnectionPool.urlopen = urlopen
+        _http_hook_installed = True
+
+
+class _RouteStats:
+    __slots__ = ("count", "errors", "total_ms", "db_ms", "http_ms", "queries", "max_ms", "max_queries", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.db_ms = 0.0
+        self.http_ms = 0.0
+        self.queries = 0
+        self.max_ms = 0.0
+        self.max_queries = 0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, total_ms, timings, status_code):
+        self.count += 1
+        if status_code >= 500:
+            self.errors += 1
+        self.total_ms += total_ms
+        self.db_ms += timings.db_ms
+        self.http_ms += timings.http_total_ms
+        self.queries += timings.queries
+        self.max_ms = max(self.max_ms, total_ms)
+        self.max_queries = max(self.max_queries, timings.queries)
+        for i, bound in enumerate(BUCKETS_MS):
+            if total_ms <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def merge(self, other):
+        self.count += other.count
+        self.errors += other.errors
+        self.total_ms += other.total_ms
+        self.db_ms += other.db_ms
+        self.http_ms += other.http_ms
+        self.queries += other.queries
+        self.max_ms = max(self.max_ms, other.max_ms)
+        self.max_queries = max(self.max_queries, other.max_queries)
+        for i, n in enumerate(other.buckets):
+            self.buckets[i] += n
+
+    def percentile(self, q):
+        """Estimate from the buckets, interpolating linearly inside the bucket."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for i, n in enumerate(self.buckets):
+            upper = BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max_ms
+            if n and seen + n >= rank:
+                return round(min(lower + (upper - lower) * (rank - seen) / n, self.max_ms), 1)
+            seen += n
+            lower = upper
+        return round(self.max_ms, 1)
+
+    def to_dict(self, route):
+        def avg(total):
+            return round(total / self.count, 2) if self.count else None
+
+        return {
+            "route": route,
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": avg(self.total_ms),
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 1),
+            "avg_queries": avg(self.queries),
+            "max_queries": self.max_queries,
+            "avg_db_ms": avg(self.db_ms),
+            "avg_http_ms": avg(self.http_ms),
+            "total_ms": round(self.total_ms, 1),
+            "histogram": {
+                **{f"le_{bound}": n for bound, n in zip(BUCKETS_MS, self.buckets)},
+                "inf": self.buckets[-1],
+            },
+        }
+
+
+class RouteHistogram:
+    """
+    Per-route stats over the last windows * window_seconds seconds. Each
+    window holds its own counters, so old traffic ages out a window at a time.
+    """
+
+    def __init__(self, window_seconds=60, windows=15, clock=time.monotonic):
+        self.window_seconds = window_seconds
+        self.windows = windows
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._windows = deque()  # (window start, {route: _RouteStats})
+
+    def _prune(self, now):
+        horizon = now - self.window_seconds * self.windows
+        while self._windows and self._windows[0][0] <= horizon:
+            self._windows.popleft()
+
+    def record(self, route, total_ms, timings, status_code):
+        now = self.clock()
+        start = now - now % self.window_seconds
+        with self._lock:
+            if not self._windows or self._windows[-1][0] != start:
+                self._windows.append((start, {}))
+                self._prune(now)
+            routes = self._windows[-1][1]
+            stats = routes.get(route)
+            if stats is None:
+                stats = routes[route] = _RouteStats()
+            stats.add(total_ms, timings, status_code)
+
+    def merged(self):
+        """{route: _RouteStats} over every live window."""
+        with self._lock:
+            self._prune(self.clock())
+            merged = {}
+            for _, routes in self._windows:
+                for route, stats in routes.items():
+                    total = merged.get(route)
+                    if total is None:
+                        total = merged[route] = _RouteStats()
+                    total.merge(stats)
+        return merged
+
+    def snapshot(self):
+        """Route stats, busiest (by total time) first."""
+        routes = [stats.to_dict(route) for route, stats in self.merged().items()]
+        routes.sort(key=lambda r: -r["total_ms"])
+        return {
+            "window_seconds": self.window_seconds * self.windows,
+            "buckets_ms": list(BUCKETS_MS),
+            "routes": routes,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._windows.clear()
+
+
+route_histogram = RouteHistogram(
+    window_seconds=getattr(settings, "REQUEST_METRICS_WINDOW_SECONDS", 60),
+    windows=getattr(settings, "REQUEST_METRICS_WINDOWS", 15),
+)
+
+
+def route_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None or match.route is None:
+        return f"{request.method} <unmatched>"
+    return f"{request.method} /{match.route}"
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, "REQUEST_METRICS_SERVER_TIMING", True)
+        install_http_timing()
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            install_db_timing()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    # Connections opened under an async handler already carry it
+                    if _time_query not in connection.execute_wrappers:
+                        stack.enter_context(connection.execute_wrapper(_time_query))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings, started)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings, started)
+
+    def finish(self, request, response, timings, started):
+        total_ms = (time.perf_counter() - started) * 1000
+        route_histogram.record(route_name(request), total_ms, timings, response.status_code)
+        if self.server_timing:
+            response["Server-Timing"] = timings.server_timing(total_ms)
+        return response
@@ -0,0 +1,240 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import tempfile
+import threading
+import time
+from types import ModuleType
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.test.utils import override_settings
+from django.urls import path
+
+SCENARIOS = ("probe", "mail")
+
+
+class _InFlight:
+    """Counts calls in progress and remembers the peak."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.current = 0
+        self.peak = 0
+
+    def __enter__(self):
+        with self.lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc):
+        with self.lock:
+            self.current -= 1
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Show how many slow external calls one worker keeps in flight, sync vs async. "
+        "A local stand-in answers after --latency-ms. 'probe' requests the certificate "
+        "template default config, which downloads the template to read its size: the DRF "
+        "view through the WSGI handler from --threads threads (a gthread worker) against "
+        "the async view through the ASGI handler on one event loop. 'mail' sends Brevo "
+        "emails with BrevoTransport.send from --threads threads against asend on one loop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scenario", choices=SCENARIOS + ("all",), default="all")
+        parser.add_argument("--calls", type=int, default=400, help="Calls per mode")
+        parser.add_argument("--latency-ms", type=float, default=200, help="Stand-in response delay")
+        parser.add_argument("--threads", type=int, default=4, help="Threads of the sync worker")
+        parser.add_argument("--concurrency", type=int, default=None,
+                            help="Calls started at once on the event loop (default ASYNC_HTTP_MAX_CONNECTIONS)")
+        parser.add_argument("--json", help="Also write the report to this file")
+
+    def handle(self, *args, **options):
+        from mailer.standin import StandInServer
+
+        options["concurrency"] = options["concurrency"] or settings.ASYNC_HTTP_MAX_CONNECTIONS
+        latency = options["latency_ms"] / 1000
+        server = StandInServer(latency=latency, template_latency=latency).start()
+        scenarios = SCENARIOS if options["scenario"] == "all" else (options["scenario"],)
+        rows = []
+        try:
+            if "probe" in scenarios:
+                rows += self.probe(server, options)
+            if "mail" in scenarios:
+                rows += self.mail(server, options)
+        finally:
+            server.stop()
+
+        self.stdout.write(
+            f"{options['calls']} calls per mode, stand-in latency {options['latency_ms']:.0f}ms, "
+            f"{options['threads']} sync threads, async concurrency {options['concurrency']} "
+            f"(pool of {settings.ASYNC_HTTP_MAX_CONNECTIONS} connections)"
+        )
+        header = f"{'scenario':<10}{'mode':<8}{'calls':>7}{'errors':>8}{'seconds':>9}{'calls/s':>9}{'in flight':>11}{'p50 ms':>9}{'p95 ms':>9}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for row in rows:
+            self.stdout.write(
+                f"{row['scenario']:<10}{row['mode']:<8}{row['calls']:>7}{row['errors']:>8}{row['seconds']:>9}"
+                f"{row['calls_per_second']:>9}{row['peak_in_flight']:>11}{row['p50_ms']:>9}{row['p95_ms']:>9}"
+            )
+        for scenario in scenarios:
+            by_mode = {row["mode"]: row for row in rows if row["scenario"] == scenario}
+            if by_mode["sync"]["calls_per_second"]:
+                self.stdout.write(
+                    f"{scenario}: async handled {by_mode['async']['calls_per_second'] / by_mode['sync']['calls_per_second']:.1f}x "
+                    f"the calls per second with {by_mode['async']['peak_in_flight']} in flight "
+                    f"vs {by_mode['sync']['peak_in_flight']}"
+                )
+        if options["json"]:
+            with open(options["json"], "w") as f:
+                json.dump({"options": {k: options[k] for k in ("calls", "latency_ms", "threads", "concurrency")},
+                           "results": rows}, f, indent=2)
+
+    # --- runners ------------------------------------------------------
+
+    def run_threads(self, scenario, call, options):
+        in_flight = _InFlight()
+        samples, errors = [], []
+
+        def one(_):
+            started = time.perf_counter()
+            with in_flight:
+                try:
+                    call()
+                except Exception as e:
+                    errors.append(e)
+                    return
+            samples.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["threads"]) as pool:
+            list(pool.map(one, range(options["calls"])))
+        return self.row(scenario, "sync", samples, errors, time.perf_counter() - started, in_flight.peak)
+
+    def run_async(self, scenario, acall, options):
+        from api.http import close_async_client
+
+        in_flight = _InFlight()
+        samples, errors = [], []
+
+        async def main():
+            semaphore = asyncio.Semaphore(options["concurrency"])
+
+            async def one():
+                async with semaphore:
+                    started = time.perf_counter()
+                    with in_flight:
+                        try:
+                            await acall()
+                        except Exception as e:
+                            errors.append(e)
+                            return
+                    samples.append((time.perf_counter() - started) * 1000)
+
+            try:
+                await asyncio.gather(*(one() for _ in range(options["calls"])))
+            finally:
+                await close_async_client()
+
+        started = time.perf_counter()
+        asyncio.run(main())
+        return self.row(scenario, "async", samples, errors, time.perf_counter() - started, in_flight.peak)
+
+    def row(self, scenario, mode, samples, errors, seconds, peak):
+        if errors:
+            self.stderr.write(f"{scenario} {mode}: {len(errors)} errors, first: {errors[0]!r}")
+        return {
+            "scenario": scenario,
+            "mode": mode,
+            "calls": len(samples) + len(errors),
+            "errors": len(errors),
+            "seconds": round(seconds, 2),
+            "calls_per_second": round(len(samples) / seconds, 1) if seconds else 0,
+            "peak_in_flight": peak,
+            "p50_ms": round(_percentile(samples, 50) or 0, 1),
+            "p95_ms": round(_percentile(samples, 95) or 0, 1),
+        }
+
+    # --- scenarios ----------------------------------------------------
+
+    def probe(self, server, options):
+        from django.test import AsyncClient, Client
+        from rest_framework.authtoken.models import Token
+
+        from certificates.async_views import AsyncTemplateDefaultConfigView
+        from certificates.views import CertificateTemplateViewSet
+        from users.models import CustomUser
+
+        # Both variants side by side, whichever one ASYNC_VIEWS routes
+        urlconf = ModuleType("benchmark_async_io_urls")
+        urlconf.urlpatterns = [
+            path("sync/", CertificateTemplateViewSet.as_view({"get": "default_config"})),
+            path("async/", AsyncTemplateDefaultConfigView.as_view()),
+        ]
+        old_name = connection.settings_dict["NAME"]
+        if connection.vendor == "sqlite":
+            # Requests run on several threads; the in-memory test database can't be shared
+            fd, db_path = tempfile.mkstemp(suffix=".sqlite3", prefix="async-io-")
+            os.close(fd)
+            connection.settings_dict["TEST"]["NAME"] = db_path
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            user = CustomUser.objects.create_user(username="asyncio-bench", email="asyncio-bench@example.com",
+                                                  password="Async-io-benchmark-1")
+            headers = {"Authorization": f"Token {Token.objects.create(user=user).key}"}
+            with override_settings(
+                ROOT_URLCONF=urlconf,
+                ALLOWED_HOSTS=["*"],
+                DEFAULT_CERTIFICATE_TEMPLATE_URL=server.template_url,
+            ):
+                client = Client()
+
+                def call_sync():
+                    try:
+                        response = client.get("/sync/", headers=headers)
+                    finally:
+                        close_old_connections()
+                    if response.status_code != 200:
+                        raise RuntimeError(f"status {response.status_code}")
+
+                async def call_async():
+                    response = await AsyncClient().get("/async/", headers=headers)
+                    if response.status_code != 200:
+                        raise RuntimeError(f"status {response.status_code}")
+
+                return [
+                    self.run_threads("probe", call_sync, options),
+                    self.run_async("probe", call_async, options),
+                ]
+        finally:
+            close_old_connections()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def mail(self, server, options):
+        import sib_api_v3_sdk
+
+        from mailer.transports import BrevoTransport
+
+        message = sib_api_v3_sdk.SendSmtpEmail(
+            sender={"name": "Benchmark", "email": "benchmark@example.com"},
+            to=[{"email": "participant@example.com", "name": "Participant"}],
+            subject="Benchmark", html_content="<p>Benchmark</p>",
+        )
+        sync_transport = BrevoTransport(host=server.url, pool_size=options["threads"])
+        async_transport = BrevoTransport(host=server.url)
+        return [
+            self.run_threads("mail", lambda: sync_transport.send(message), options),
+            self.run_async("mail", lambda: async_transport.asend(message), options),
+        ]
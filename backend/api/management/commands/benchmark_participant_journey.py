@@ -0,0 +1,366 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+from django.test.utils import override_settings
+from django.utils import timezone
+
+STEPS = [
+    "register", "login", "browse seminars", "plan seminar", "check in", "check out",
+    "available evaluations", "submit evaluation", "certificate delivered", "attended seminars",
+]
+PASSWORD = "Journey-benchmark-1"
+
+_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+class JourneyFailed(Exception):
+    pass
+
+
+class _Recorder:
+    """Latency and query samples per step, shared by the journey threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {step: [] for step in STEPS}
+        self.errors = {step: 0 for step in STEPS}
+        self.journeys = []
+
+    def add(self, step, ms, queries):
+        with self.lock:
+            self.samples[step].append((ms, queries))
+
+    def fail(self, step):
+        with self.lock:
+            self.errors[step] += 1
+
+
+def _queries(server_timing):
+    """Query count from the Server-Timing header RequestMetricsMiddleware adds."""
+    match = _QUERIES.search(server_timing or "")
+    return int(match.group(1)) if match else None
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class _InProcessClient:
+    """Django test client; requests run the full middleware stack in this process."""
+
+    def __init__(self):
+        from django.test import Client
+
+        self.client = Client()
+        self.token = None
+
+    def request(self, method, path, data=None):
+        headers = {"HTTP_AUTHORIZATION": f"Token {self.token}"} if self.token else {}
+        send = getattr(self.client, method.lower())
+        if data is None:
+            response = send(path, **headers)
+        else:
+            response = send(path, json.dumps(data), content_type="application/json", **headers)
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        return response.status_code, body, response.get("Server-Timing")
+
+
+class _HttpClient:
+    """requests session against a running server."""
+
+    def __init__(self, base_url):
+        import requests
+
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+        self.token = None
+
+    def request(self, method, path, data=None):
+        headers = {"Authorization": f"Token {self.token}"} if self.token else {}
+        response = self.session.request(method, self.base_url + path, json=data, headers=headers, timeout=60)
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        return response.status_code, body, response.headers.get("Server-Timing")
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the participant journey (register, login, browse, plan, check in/out, "
+        "evaluate, certificate delivery, attended list) with concurrent virtual users "
+        "and report per-step latency percentiles and query counts. By default it runs "
+        "in-process against a throwaway test database with local stand-ins for Brevo "
+        "and the Cloudinary-hosted template; --url drives a running server instead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--journeys", type=int, default=40, help="Virtual participants to run")
+        parser.add_argument("--concurrency", type=int, default=4, help="Journeys in flight at once")
+        parser.add_argument("--url", help="Base URL of a running server, e.g. http://127.0.0.1:8000")
+        parser.add_argument("--live-seminars", type=int, default=4,
+                            help="Ongoing seminars the journeys check in to")
+        parser.add_argument("--background-users", type=int, default=200,
+                            help="Synthetic participants generated first so lists aren't empty")
+        parser.add_argument("--background-seminars", type=int, default=40)
+        parser.add_argument("--latency-ms", type=float, default=50, help="Stand-in Brevo latency")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="Share of stand-in sends that fail")
+        parser.add_argument("--worker-threads", type=int, default=4, help="Outbox worker threads (in-process)")
+        parser.add_argument("--certificate-timeout", type=float, default=60,
+                            help="Seconds to wait for a certificate email before failing the journey")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--json", help="Also write the report to this file")
+
+    def handle(self, *args, **options):
+        if options["url"]:
+            recorder, seconds = self.run_live(options)
+            mode = f"live server {options['url']}"
+        else:
+            recorder, seconds = self.run_in_process(options)
+            mode = f"in-process ({connection.vendor}), stand-in latency {options['latency_ms']}ms"
+
+        report = self.report(recorder, seconds, options)
+        self.stdout.write(
+            f"{options['journeys']} journeys, concurrency {options['concurrency']}, {mode}, "
+            f"{report['journeys_completed']} completed in {report['seconds']}s"
+        )
+        header = f"{'step':<24}{'n':>6}{'err':>5}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'avg q':>7}{'max q':>7}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for row in report["steps"] + [report["journey"]]:
+            self.stdout.write(
+                f"{row['step']:<24}{row['count']:>6}{row['errors']:>5}"
+                + "".join(f"{_fmt(row[key]):>9}" for key in ("p50_ms", "p95_ms", "p99_ms", "max_ms"))
+                + f"{_fmt(row['avg_queries']):>7}{_fmt(row['max_queries']):>7}"
+            )
+        self.stdout.write(f"total queries: {report['total_queries']}")
+        if options["json"]:
+            with open(options["json"], "w") as f:
+                json.dump(report, f, indent=2)
+
+    # --- modes --------------------------------------------------------
+
+    def run_in_process(self, options):
+        from certificates.tasks import CertificateWorker
+        from mailer.standin import StandInServer
+        from mailer.transports import BrevoTransport
+        from mailer.worker import OutboxWorker
+
+        server = StandInServer(latency=options["latency_ms"] / 1000, error_rate=options["error_rate"],
+                               seed=options["seed"]).start()
+        old_name = connection.settings_dict["NAME"]
+        if connection.vendor == "sqlite":
+            # The default in-memory test database can't take concurrent
+            # writers; a file with immediate transactions serializes them
+            fd, path = tempfile.mkstemp(suffix=".sqlite3", prefix="journey-")
+            os.close(fd)
+            connection.settings_dict["TEST"]["NAME"] = path
+            connection.settings_dict["OPTIONS"]["transaction_mode"] = "IMMEDIATE"
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        stop = threading.Event()
+        try:
+            with override_settings(
+                DEFAULT_CERTIFICATE_TEMPLATE_URL=server.template_url,
+                ALLOWED_HOSTS=["*"],
+                REQUEST_METRICS_SERVER_TIMING=True,
+                MAIL_RETRY_BASE_DELAY=0.05,
+                MAIL_RETRY_MAX_DELAY=0.5,
+            ):
+                worker = OutboxWorker(
+                    transport=BrevoTransport(host=server.url, pool_size=options["worker_threads"]),
+                    threads=options["worker_threads"],
+                    rate=1000,
+                )
+                certificates = CertificateWorker(threads=options["worker_threads"])
+                mail_thread = threading.Thread(
+                    target=worker.run,
+                    kwargs={"poll_interval": 0.05, "stop": stop.is_set, "jobs": [certificates.drain_once]},
+                    daemon=True, name="journey-mailer",
+                )
+                mail_thread.start()
+                try:
+                    seminars = self.prepare(options, prefix="journey")
+                    return self.run_journeys(options, seminars, _InProcessClient, prefix="journey")
+                finally:
+                    stop.set()
+                    mail_thread.join()
+                    worker.close()
+                    certificates.close()
+        finally:
+            close_old_connections()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            server.stop()
+
+    def run_live(self, options):
+        # Data is prepared in the configured database, which the server must share
+        prefix = f"journey{int(time.time())}_"
+        seminars = self.prepare(options, prefix=prefix)
+        return self.run_journeys(options, seminars, lambda: _HttpClient(options["url"]), prefix=prefix)
+
+    # --- setup --------------------------------------------------------
+
+    def prepare(self, options, prefix):
+        """Background data plus seminars running right now; returns (seminar id, in token, out token)."""
+        from api.synthetic import generate
+        from attendance.models import SeminarQRCode
+        from certificates.models import CertificateTemplate
+        from seminars.models import Seminar
+
+        if options["background_users"] or options["background_seminars"]:
+            generate(
+                users=options["background_users"], seminars=options["background_seminars"],
+                prefix=f"{prefix}bg", seed=options["seed"], attendances_per_user=5,
+            )
+
+        now = timezone.now()
+        # bulk_create skips the signal that would give them a Cloudinary-hosted template
+        seminars = Seminar.objects.bulk_create([
+            Seminar(
+                title=f"Journey seminar {i}", speaker="Benchmark", venue="Main Auditorium",
+                date_start=now - timedelta(minutes=30), date_end=now + timedelta(hours=2),
+                duration_minutes=150,
+            )
+            for i in range(options["live_seminars"])
+        ])
+        CertificateTemplate.objects.bulk_create([
+            CertificateTemplate(seminar=seminar, default_used=True) for seminar in seminars
+        ])
+        codes = SeminarQRCode.objects.bulk_create([
+            SeminarQRCode(
+                seminar=seminar,
+                qr_token_check_in=f"{prefix}in-{seminar.id}",
+                qr_token_check_out=f"{prefix}out-{seminar.id}",
+            )
+            for seminar in seminars
+        ])
+        return [(code.seminar_id, code.qr_token_check_in, code.qr_token_check_out) for code in codes]
+
+    # --- journeys -----------------------------------------------------
+
+    def run_journeys(self, options, seminars, make_client, prefix):
+        recorder = _Recorder()
+
+        def run(n):
+            try:
+                self.journey(make_client(), recorder, n, seminars[n % len(seminars)], prefix, options)
+            except JourneyFailed:
+                pass
+            finally:
+                close_old_connections()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            list(pool.map(run, range(options["journeys"])))
+        return recorder, time.perf_counter() - started
+
+    def journey(self, client, recorder, n, seminar, prefix, options):
+        seminar_id, check_in_token, check_out_token = seminar
+        username = f"{prefix}user{n}"
+        journey_started = time.perf_counter()
+        journey_queries = 0
+
+        def call(step, method, path, data=None, expect=(200,)):
+            nonlocal journey_queries
+            started = time.perf_counter()
+            status, body, server_timing = client.request(method, path, data)
+            ms = (time.perf_counter() - started) * 1000
+            queries = _queries(server_timing)
+            if status not in expect:
+                recorder.fail(step)
+                raise JourneyFailed(f"{step}: {status} {body}")
+            recorder.add(step, ms, queries)
+            journey_queries += queries or 0
+            return body
+
+        call("register", "POST", "/dj-rest-auth/registration/", {
+            "username": username, "email": f"{username}@example.com", "first_name": "Journey",
+            "last_name": f"User {n}", "password1": PASSWORD, "password2": PASSWORD,
+        }, expect=(200, 201))
+        client.token = call("login", "POST", "/dj-rest-auth/login/",
+                            {"username": username, "password": PASSWORD})["key"]
+        call("browse seminars", "GET", "/api/seminars/")
+        call("plan seminar", "POST", "/api/planned-seminars/", {"seminar": seminar_id}, expect=(201,))
+        call("check in", "POST", f"/api/attendance/{seminar_id}/check_in/", {"qr_token": check_in_token})
+        call("check out", "POST", f"/api/attendance/{seminar_id}/check_out/", {"qr_token": check_out_token})
+        call("available evaluations", "GET", "/api/evaluations/available-evaluations/")
+        evaluation = call("submit evaluation", "POST", "/api/evaluations/", {
+            "seminar_id": seminar_id, "suggestions": "More hands-on examples please",
+            "content_and_relevance": 5, "presenters_effectiveness": 4, "organization_and_structure": 4,
+            "materials_usefulness": 5, "overall_satisfaction": 5,
+        }, expect=(200, 201))
+
+        # Rendered in the background and emailed through the outbox: poll like the frontend does
+        status_url = evaluation["certificate_delivery"]["status_url"]
+        started = time.perf_counter()
+        queries = 0
+        deadline = started + options["certificate_timeout"]
+        while True:
+            status, body, server_timing = client.request("GET", status_url)
+            queries += _queries(server_timing) or 0
+            done = status != 200 or body["status"] in ("sent", "failed")
+            if done or time.perf_counter() > deadline:
+                break
+            time.sleep(0.02)
+        journey_queries += queries
+        if status != 200 or body["status"] != "sent":
+            recorder.fail("certificate delivered")
+            raise JourneyFailed(f"certificate: {status} {body}")
+        recorder.add("certificate delivered", (time.perf_counter() - started) * 1000, queries)
+
+        call("attended seminars", "GET", "/api/attendance/attended-seminars/my_attended_seminars/")
+        with recorder.lock:
+            recorder.journeys.append(((time.perf_counter() - journey_started) * 1000, journey_queries))
+
+    # --- report -------------------------------------------------------
+
+    def report(self, recorder, seconds, options):
+        def row(step, samples, errors):
+            ms = [s[0] for s in samples]
+            queries = [s[1] for s in samples if s[1] is not None]
+            return {
+                "step": step,
+                "count": len(samples),
+                "errors": errors,
+                "p50_ms": _round(_percentile(ms, 50)),
+                "p95_ms": _round(_percentile(ms, 95)),
+                "p99_ms": _round(_percentile(ms, 99)),
+                "max_ms": _round(max(ms) if ms else None),
+                "avg_queries": _round(sum(queries) / len(queries) if queries else None),
+                "max_queries": max(queries) if queries else None,
+                "total_queries": sum(queries),
+            }
+
+        steps = [row(step, recorder.samples[step], recorder.errors[step]) for step in STEPS]
+        journey = row("whole journey", recorder.journeys, options["journeys"] - len(recorder.journeys))
+        return {
+            "journeys": options["journeys"],
+            "journeys_completed": len(recorder.journeys),
+            "concurrency": options["concurrency"],
+            "seconds": round(seconds, 2),
+            "journeys_per_second": round(len(recorder.journeys) / seconds, 2) if seconds else None,
+            "steps": steps,
+            "journey": journey,
+            "total_queries": journey["total_queries"],
+        }
+
+
+def _round(value):
+    return round(value, 1) if value is not None else None
+
+
+def _fmt(value):
+    return "-" if value is None else value
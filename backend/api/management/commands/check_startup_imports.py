@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.importtime import check_startup
+
+
+class Command(BaseCommand):
+    help = (
+        "Profile worker cold start with python -X importtime and fail when the imports "
+        "take longer than STARTUP_IMPORT_BUDGET_MS or load a STARTUP_DEFERRED_MODULES library."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=3, help="Cold starts to profile; the fastest is judged")
+        parser.add_argument("--budget-ms", type=int, default=settings.STARTUP_IMPORT_BUDGET_MS)
+        parser.add_argument("--top", type=int, default=15, help="Slowest top-level imports to list")
+
+    def handle(self, *args, **options):
+        profile, problems = check_startup(runs=options["runs"], budget_ms=options["budget_ms"])
+
+        self.stdout.write(f"{'module':<50} {'cumulative ms':>14} {'self ms':>9}")
+        for name, self_us, cumulative_us, _ in profile.slowest(options["top"]):
+            self.stdout.write(f"{name:<50} {cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}")
+        self.stdout.write(
+            f"Startup imports: {profile.total_ms:.0f}ms across {len(profile.rows)} modules "
+            f"(budget {options['budget_ms']}ms)"
+        )
+
+        if problems:
+            raise CommandError("\n".join(problems))
+        self.stdout.write(self.style.SUCCESS("Startup import budget OK"))
@@ -0,0 +1,85 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from api.synthetic import DEFAULT_PASSWORD, generate
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a large, deterministic dataset for scale testing: participants, "
+        "categories, seminars with QR codes and templates, plans, attendances, "
+        "attended seminars, evaluations and certificate records. "
+        "--users 100000 --attendances-per-user 10 gives a 1M-row attendance table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--categories", type=int, default=6)
+        parser.add_argument("--seminars", type=int, default=200)
+        parser.add_argument("--plans-per-user", type=int, default=3)
+        parser.add_argument("--attendances-per-user", type=int, default=10)
+        parser.add_argument("--present-rate", type=float, default=0.9,
+                            help="Share of attendances that checked out too")
+        parser.add_argument("--evaluation-rate", type=float, default=0.8,
+                            help="Share of attended seminars that were evaluated")
+        parser.add_argument("--finished-ratio", type=float, default=0.75,
+                            help="Share of seminars that are already over")
+        parser.add_argument("--template-ratio", type=float, default=0.5,
+                            help="Share of seminars with a certificate template row")
+        parser.add_argument("--prefix", default="user", help="Username prefix; must not be in use yet")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--anchor", help="ISO date the seminar dates are laid around (default: today)")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--skip-indexes", action="store_true",
+                            help="Don't rebuild evaluation summaries and the suggestion index")
+
+    def handle(self, *args, **options):
+        if options["attendances_per_user"] and not options["seminars"]:
+            raise CommandError("--attendances-per-user needs --seminars")
+        if CustomUser.objects.filter(username__startswith=options["prefix"]).exists():
+            raise CommandError(
+                f"Users named {options['prefix']}* already exist; pick another --prefix or flush the database"
+            )
+
+        anchor = None
+        if options["anchor"]:
+            try:
+                anchor = datetime.fromisoformat(options["anchor"])
+            except ValueError:
+                raise CommandError("--anchor must be an ISO date, e.g. 2025-01-31")
+            if timezone.is_naive(anchor):
+                anchor = timezone.make_aware(anchor, dt_timezone.utc)
+
+        result = generate(
+            users=options["users"],
+            categories=options["categories"],
+            seminars=options["seminars"],
+            plans_per_user=options["plans_per_user"],
+            attendances_per_user=options["attendances_per_user"],
+            present_rate=options["present_rate"],
+            evaluation_rate=options["evaluation_rate"],
+            finished_ratio=options["finished_ratio"],
+            template_ratio=options["template_ratio"],
+            prefix=options["prefix"],
+            seed=options["seed"],
+            anchor=anchor,
+            batch_size=options["batch_size"],
+            rebuild_indexes=not options["skip_indexes"],
+            progress=self.progress if options["verbosity"] > 1 else None,
+        )
+
+        summary = result.to_dict()
+        for label, count in sorted(summary["counts"].items()):
+            self.stdout.write(f"  {label:<36} {count:>10}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {summary['rows']} rows in {summary['seconds']}s ({summary['rows_per_second']} rows/s)"
+        ))
+        self.stdout.write(
+            f"Log in as {options['prefix']}admin or {options['prefix']}0 with password '{DEFAULT_PASSWORD}'"
+        )
+
+    def progress(self, label, count):
+        self.stdout.write(f"  {label}: {count}")
@@ -0,0 +1,83 @@
+# api/metrics.py
+"""
+Prometheus metrics for the domain hot paths.
+
+With PROMETHEUS_MULTIPROC_DIR set in the environment (gunicorn.conf.py
+and the Procfile set it), prometheus_client keeps each process's values in mmap'ed files in that
+directory and the /metrics view sums them, so one scrape covers every
+gunicorn worker and the mail worker on the same host.
+"""
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+ATTENDANCE_SCANS = Counter(
+    "podium_attendance_scans_total",
+    "QR attendance scans by action and outcome (recorded or the validation failure)",
+    ["action", "result"],
+)
+
+CERTIFICATE_RENDER_SECONDS = Histogram(
+    "podium_certificate_render_seconds",
+    "Time to load the template, draw and encode one certificate PNG",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+CERTIFICATE_RENDER_BYTES = Histogram(
+    "podium_certificate_render_bytes",
+    "Size of rendered certificate PNGs",
+    buckets=(50_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000, 10_000_000),
+)
+
+BREVO_SEND_SECONDS = Histogram(
+    "podium_brevo_send_seconds",
+    "Brevo transactional send latency, including failed sends",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+BREVO_SEND_FAILURES = Counter(
+    "podium_brevo_send_failures_total",
+    "Failed Brevo sends by HTTP status (0 for connection errors and timeouts)",
+    ["status"],
+)
+
+REPLICA_FALLBACKS = Counter(
+    "podium_replica_fallbacks_total",
+    "Times replica-routed views fell back to the primary, by reason (lagging, unavailable or error)",
+    ["reason"],
+)
+
+
+def scan(action, result):
+    ATTENDANCE_SCANS.labels(action=action, result=result).inc()
+
+
+def replica_fallback(reason):
+    REPLICA_FALLBACKS.labels(reason=reason).inc()
+
+
+@contextmanager
+def timed(histogram):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - started)
+
+
+def render_latest():
+    """(body, content type) in the Prometheus text format."""
+    if getattr(settings, "PROMETHEUS_MULTIPROC_DIR", ""):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
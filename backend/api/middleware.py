@@ -0,0 +1,37 @@
+# api/middleware.py
+"""
+WhiteNoise middleware that can run async.
+
+WhiteNoiseMiddleware is sync-only, and one sync-only middleware makes
+Django run everything below it, async views included, on a thread per
+request under ASGI. This subclass serves static files the same way but
+passes everything else straight to the async handler.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            # Opens the file and stats it
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,126 @@
+# api/replica.py
+"""
+Read-replica routing for analytics and exports.
+
+Views opt in with @use_replica; everything else, and every write, stays on
+the primary. Reads inside an opted-in view go to the REPLICA_DATABASE
+alias while it is configured and healthy. The replica is skipped (reads
+stay on the primary) when it is more than REPLICA_MAX_LAG_SECONDS behind,
+when it can't be reached, or, for the rest of the check interval, after a
+view failed on it; in that last case the view is run again on the
+primary. Health is checked at most once every REPLICA_CHECK_INTERVAL
+seconds per process.
+"""
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+_read_alias = contextvars.ContextVar("replica_read_alias", default=None)
+_health = {"checked_at": None, "usable": False}
+
+
+def replica_lag(alias):
+    """Seconds the replica is behind the primary; 0 where the backend can't tell."""
+    connection = connections[alias]
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            # An idle primary sends no new transactions, so only count time while WAL is still being replayed
+            cursor.execute(
+                "SELECT CASE WHEN NOT pg_is_in_recovery() "
+                "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+            )
+            return float(cursor.fetchone()[0])
+        cursor.execute("SELECT 1")
+    return 0.0
+
+
+def replica_alias():
+    """The alias to read from for an opted-in view: the replica, or None for the primary."""
+    alias = getattr(settings, "REPLICA_DATABASE", "replica")
+    if alias not in connections.settings:
+        return None
+    now = time.monotonic()
+    checked_at = _health["checked_at"]
+    if checked_at is None or now - checked_at >= getattr(settings, "REPLICA_CHECK_INTERVAL", 10):
+        try:
+            lag = replica_lag(alias)
+        except DatabaseError as e:
+            logger.warning("Replica %s unavailable, reading from the primary: %s", alias, e)
+            usable, reason = False, "unavailable"
+        else:
+            usable = lag <= getattr(settings, "REPLICA_MAX_LAG_SECONDS", 30)
+            reason = "lagging"
+            if not usable:
+                logger.warning("Replica %s is %.1fs behind, reading from the primary", alias, lag)
+        _health.update(checked_at=now, usable=usable)
+        if not usable:
+            metrics.replica_fallback(reason)
+    return alias if _health["usable"] else None
+
+
+def mark_replica_down():
+    """Keep reads on the primary until the next health check."""
+    _health.update(checked_at=time.monotonic(), usable=False)
+
+
+def reset_replica_health():
+    _health.update(checked_at=None, usable=False)
+
+
+@contextmanager
+def replica_reads(alias=None):
+    """Route reads in the block to alias (default: the healthy replica, if any)."""
+    token = _read_alias.set(alias if alias is not None else replica_alias())
+    try:
+        yield _read_alias.get()
+    finally:
+        _read_alias.reset(token)
+
+
+def use_replica(view):
+    """Serve a read-only view (function, APIView method or viewset action) from the replica."""
+
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        with replica_reads() as alias:
+            if alias is None:
+                return view(*args, **kwargs)
+            try:
+                return view(*args, **kwargs)
+            except DatabaseError as e:
+                logger.warning("Read on replica %s failed, retrying on the primary: %s", alias, e)
+        # Outside the except block so the replica error isn't chained to a primary one
+        mark_replica_down()
+        metrics.replica_fallback("error")
+        return view(*args, **kwargs)
+
+    return wrapped
+
+
+class ReadReplicaRouter:
+    """Reads inside replica_reads() go to the replica; writes always go to the primary."""
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        # Not None: Django would otherwise write instances back to the database they were read from
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Same data on both sides
+        aliases = {DEFAULT_DB_ALIAS, getattr(settings, "REPLICA_DATABASE", "replica")}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
@@ -1,20 +1,22 @@
 from rest_framework import serializers
-from backend.certificates.serializers import CertificateSerializer
-from backend.evaluation.serializers import EvaluationSerializer
-from backend.seminars.serializers import PlannedSeminarSerializer
-from backend.users.models import CustomUser
+from attendance.serializers import AttendedSeminarSerializer
+from certificates.serializers import CertificateSerializer
+from evaluation.serializers import EvaluationSerializer
+from seminars.serializers import PlannedSeminarSerializer
+from users.models import CustomUser
 
 
 class UserDashboardSerializer(serializers.ModelSerializer):
-    attendances = serializers.AttendanceSerializer(many=True, read_only=True)
+    """Expects the relations prefetched by api.dashboard.load_dashboard_user()."""
     planned_seminars = PlannedSeminarSerializer(many=True, read_only=True)
+    attended_seminars = AttendedSeminarSerializer(many=True, read_only=True)
     evaluations = EvaluationSerializer(many=True, read_only=True)
-    certificates = CertificateSerializer(many=True, read_only=True)
+    certificates = CertificateSerializer(many=True, read_only=True, source="stored_certificates")
 
     class Meta:
         model = CustomUser
         fields = [
             "id", "username", "first_name", "last_name", "email",
             "role", "is_email_verified",
-            "attendances", "planned_seminars", "evaluations", "certificates"
+            "planned_seminars", "attended_seminars", "evaluations", "certificates"
         ]
@@ -0,0 +1,47 @@
+# api/signals.py
+"""
+Dashboard cache invalidation (api.dashboard). Rows that belong to one user
+drop that user's entry; seminars, categories and certificate templates
+appear on everyone's dashboard and expire all entries.
+
+Planned seminars, certificates and certificate templates have no
+post_delete receiver: one would make every seminar or user delete load
+those rows before deleting them. Those cascades are covered by the seminar
+and user receivers, certificates aren't deleted on their own, and the
+views that delete a planned seminar or a template invalidate themselves.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from attendance.models import AttendedSeminar
+from certificates.models import Certificate, CertificateTemplate
+from evaluation.models import Evaluation
+from seminars.models import Category, PlannedSeminar, Seminar
+from users.models import CustomUser
+
+from .dashboard import invalidate_all_dashboards, invalidate_dashboard
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def user_changed(sender, instance, **kwargs):
+    invalidate_dashboard(instance.pk)
+
+
+@receiver(post_save, sender=PlannedSeminar)
+@receiver(post_save, sender=AttendedSeminar)
+@receiver(post_delete, sender=AttendedSeminar)
+@receiver(post_save, sender=Evaluation)
+@receiver(post_delete, sender=Evaluation)
+@receiver(post_save, sender=Certificate)
+def user_row_changed(sender, instance, **kwargs):
+    invalidate_dashboard(instance.user_id)
+
+
+@receiver(post_save, sender=Seminar)
+@receiver(post_delete, sender=Seminar)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=CertificateTemplate)
+def shared_row_changed(sender, instance, **kwargs):
+    invalidate_all_dashboards()
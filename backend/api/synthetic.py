@@ -0,0 +1,248 @@
+# api/synthetic.py
+"""
+Synthetic dataset generator for scale testing.
+
+generate() creates participants, categories, seminars (past and upcoming)
+with QR codes and certificate templates, then walks the participants
+generating plans, attendances, attended seminars, evaluations and
+certificate records. Rows are written with bulk_create in fixed-size
+batches, so memory stays flat however large the run; only ids and seminar
+dates are kept between batches. Every choice comes from one
+random.Random(seed) and dates are anchored to a fixed instant, so the
+same arguments always produce the same rows. bulk_create skips signals,
+so rows the signals would derive are written here and the evaluation
+summaries and suggestion index are rebuilt at the end.
+"""
+from collections import defaultdict
+from datetime import datetime, time as dtime, timedelta, timezone as dt_timezone
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+SPEAKERS = [
+    "Dr. Maria Santos", "Engr. Jose Reyes", "Prof. Ana Cruz", "Mark Villanueva",
+    "Dr. Liza Mendoza", "Carlo Garcia", "Atty. Rina Bautista", "Paolo Ramos",
+]
+VENUES = ["Main Auditorium", "Room 101", "Room 204", "Library Hall", "Online (Zoom)", "Gymnasium"]
+TOPICS = [
+    "Cybersecurity Basics", "Data Privacy", "Leadership in Practice", "Mental Health at Work",
+    "Cloud Computing", "Public Speaking", "Financial Literacy", "Machine Learning 101",
+    "Project Management", "Research Writing", "Entrepreneurship", "UI/UX Design",
+]
+CATEGORY_NAMES = ["Technology", "Leadership", "Health", "Finance", "Research", "Arts", "Other"]
+SUGGESTIONS = [
+    "More hands-on examples please",
+    "The speaker was engaging and the slides were clear",
+    "Venue was too warm, otherwise great",
+    "Would like the materials shared before the session",
+    "Great session, more time for questions next time",
+    "",
+]
+# Ratings lean positive, like real evaluation forms
+RATING_WEIGHTS = (4, 8, 20, 38, 30)
+
+DEFAULT_PASSWORD = "password"
+
+
+class GenerationResult:
+    """Row counts per table and timings of one generate() run."""
+
+    def __init__(self):
+        self.counts = defaultdict(int)
+        self.admin_id = None
+        self.user_ids = []
+        self.category_ids = []
+        self.seminar_ids = []
+        self.seconds = 0.0
+
+    @property
+    def rows(self):
+        return sum(self.counts.values())
+
+    def to_dict(self):
+        return {
+            "counts": dict(self.counts),
+            "rows": self.rows,
+            "seconds": round(self.seconds, 2),
+            "rows_per_second": round(self.rows / self.seconds, 1) if self.seconds else None,
+        }
+
+
+class _BatchWriter:
+    """Buffers model instances per model and bulk_creates each buffer when it fills."""
+
+    def __init__(self, batch_size, result, progress=None):
+        self.batch_size = batch_size
+        self.result = result
+        self.progress = progress
+        self.buffers = {}
+
+    def add(self, obj):
+        buffer = self.buffers.setdefault(type(obj), [])
+        buffer.append(obj)
+        if len(buffer) >= self.batch_size:
+            self.flush(type(obj))
+
+    def flush(self, model=None):
+        for m in [model] if model else list(self.buffers):
+            rows = self.buffers.get(m)
+            if not rows:
+                continue
+            with transaction.atomic():
+                m.objects.bulk_create(rows, batch_size=self.batch_size)
+            self.result.counts[m._meta.label] += len(rows)
+            self.buffers[m] = []
+            if self.progress:
+                self.progress(m._meta.label, self.result.counts[m._meta.label])
+
+
+def _spread(i, ratio):
+    """True for about ratio of consecutive i, evenly spaced."""
+    return (i * ratio) % 1 < ratio
+
+
+def _token(rng):
+    return "%032x" % rng.getrandbits(128)
+
+
+def generate(users=1000, categories=6, seminars=200, plans_per_user=3, attendances_per_user=10,
+             present_rate=0.9, evaluation_rate=0.8, finished_ratio=0.75, template_ratio=0.5,
+             notifications_rate=0.5, prefix="user", seed=42, batch_size=5000, anchor=None,
+             rebuild_indexes=True, progress=None):
+    """
+    Generate a dataset and return a GenerationResult. About
+    users * attendances_per_user attendance rows are written; present_rate
+    of those become attended seminars and evaluation_rate of the attended
+    ones are evaluated, with a certificate record and delivery. anchor is
+    the "now" the seminar dates are laid around (default: today, 00:00 UTC).
+    """
+    from allauth.account.models import EmailAddress
+    from attendance.models import Attendance, AttendedSeminar, SeminarQRCode
+    from certificates.models import CertificateDelivery, CertificateRecord, CertificateTemplate
+    from evaluation.models import Evaluation, RATING_FIELDS
+    from seminars.models import Category, PlannedSeminar, Seminar
+    from users.models import CustomUser, EmailNotificationPreference
+
+    started = time.perf_counter()
+    rng = random.Random(seed)
+    if anchor is None:
+        anchor = datetime.combine(timezone.now().date(), dtime.min, tzinfo=dt_timezone.utc)
+    result = GenerationResult()
+    writer = _BatchWriter(batch_size, result, progress)
+    # One hash for everybody; hashing per row would dominate the run
+    password = make_password(DEFAULT_PASSWORD)
+
+    admin = CustomUser.objects.create(
+        username=f"{prefix}admin", email=f"{prefix}admin@example.com", password=password,
+        role="admin", first_name="Ada", last_name="Admin",
+    )
+    result.admin_id = admin.id
+    result.counts[CustomUser._meta.label] += 1
+
+    for start in range(0, users, batch_size):
+        batch = CustomUser.objects.bulk_create([
+            CustomUser(
+                username=f"{prefix}{i}", email=f"{prefix}{i}@example.com", password=password,
+                first_name=f"First{i}", last_name=f"Last{i}", role="participant",
+            )
+            for i in range(start, min(start + batch_size, users))
+        ])
+        result.user_ids.extend(u.id for u in batch)
+        result.counts[CustomUser._meta.label] += len(batch)
+        for n, user in enumerate(batch, start):
+            writer.add(EmailAddress(user=user, email=user.email, verified=True, primary=True))
+            writer.add(EmailNotificationPreference(user=user, enabled=_spread(n, notifications_rate)))
+    writer.flush()
+
+    names = CATEGORY_NAMES[:categories] + [f"Category {i}" for i in range(len(CATEGORY_NAMES), categories)]
+    Category.objects.bulk_create([Category(name=name) for name in names], ignore_conflicts=True)
+    category_ids = dict(Category.objects.filter(name__in=names).values_list("name", "id"))
+    result.category_ids = [category_ids[name] for name in names]
+
+    # Finished seminars run daily-ish up to the anchor, the rest are upcoming
+    finished_count = round(seminars * finished_ratio)
+    finished, upcoming = [], []
+    # Marked as announced, or the mail worker would email every participant about each one
+    announced_at = timezone.now()
+    for start in range(0, seminars, batch_size):
+        rows = []
+        for i in range(start, min(start + batch_size, seminars)):
+            if i < finished_count:
+                day = anchor - timedelta(days=(finished_count - i) * 2 + rng.randint(0, 1))
+            else:
+                day = anchor + timedelta(days=(i - finished_count) * 2 + 1 + rng.randint(0, 1))
+            date_start = day + timedelta(hours=rng.choice((8, 9, 10, 13, 14)))
+            duration = rng.choice((60, 90, 120, 180))
+            rows.append(Seminar(
+                title=f"{rng.choice(TOPICS)} #{i}",
+                description=f"A session on {rng.choice(TOPICS).lower()}.",
+                speaker=rng.choice(SPEAKERS),
+                venue=rng.choice(VENUES),
+                date_start=date_start,
+                date_end=date_start + timedelta(minutes=duration),
+                duration_minutes=duration,
+                is_done=i < finished_count,
+                category_id=rng.choice(result.category_ids) if result.category_ids else None,
+                notifications_queued_at=announced_at,
+            ))
+        for n, seminar in enumerate(Seminar.objects.bulk_create(rows), start):
+            result.seminar_ids.append(seminar.id)
+            (finished if seminar.is_done else upcoming).append(
+                (seminar.id, seminar.date_start, seminar.date_end)
+            )
+            writer.add(SeminarQRCode(
+                seminar_id=seminar.id, qr_token_check_in=_token(rng), qr_token_check_out=_token(rng),
+            ))
+            if _spread(n, template_ratio):
+                writer.add(CertificateTemplate(seminar_id=seminar.id, default_used=True))
+        result.counts[Seminar._meta.label] += len(rows)
+    writer.flush()
+
+    upcoming_ids = [seminar_id for seminar_id, _, _ in upcoming]
+    emails = dict(CustomUser.objects.filter(id__in=result.user_ids).values_list("id", "email").iterator())
+    for user_id in result.user_ids:
+        for seminar_id in rng.sample(upcoming_ids, min(plans_per_user, len(upcoming_ids))):
+            writer.add(PlannedSeminar(user_id=user_id, seminar_id=seminar_id))
+
+        for seminar_id, date_start, date_end in rng.sample(finished, min(attendances_per_user, len(finished))):
+            check_in = date_start + timedelta(minutes=rng.randint(-10, 15))
+            present = rng.random() < present_rate
+            check_out = date_end - timedelta(minutes=rng.randint(0, 15)) if present else None
+            writer.add(Attendance(
+                user_id=user_id, seminar_id=seminar_id, check_in=check_in, check_out=check_out,
+                is_present=present,
+            ))
+            if not present:
+                continue
+
+            evaluated = rng.random() < evaluation_rate
+            writer.add(AttendedSeminar(
+                user_id=user_id, seminar_id=seminar_id, check_in_time=check_in, check_out_time=check_out,
+                duration_minutes=int((check_out - check_in).total_seconds() // 60),
+                certificate_issued=evaluated, certificate_issued_at=date_end + timedelta(hours=1) if evaluated else None,
+            ))
+            if not evaluated:
+                continue
+            writer.add(Evaluation(
+                user_id=user_id, seminar_id=seminar_id, is_completed=True,
+                suggestions=rng.choice(SUGGESTIONS),
+                **dict(zip(RATING_FIELDS, rng.choices(range(1, 6), RATING_WEIGHTS, k=len(RATING_FIELDS)))),
+            ))
+            writer.add(CertificateRecord(user_id=user_id, seminar_id=seminar_id, email=emails[user_id]))
+            writer.add(CertificateDelivery(
+                user_id=user_id, seminar_id=seminar_id, status=CertificateDelivery.STATUS_QUEUED_FOR_EMAIL,
+            ))
+    writer.flush()
+
+    if rebuild_indexes:
+        from evaluation.keywords import rebuild_suggestion_index
+        from evaluation.services import rebuild_summaries
+
+        rebuild_summaries()
+        rebuild_suggestion_index()
+
+    result.seconds = time.perf_counter() - started
+    return result
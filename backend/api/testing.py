@@ -0,0 +1,144 @@
+# api/testing.py
+"""
+Shared helpers for the query-budget tests in each app's tests.py.
+
+seed() generates a small deterministic dataset with api.synthetic, and
+QueryBudgetTestCase.assertBudget() requests a route and fails when it runs
+more queries than its budget. Wall-clock time depends on the machine, so
+it is only reported: set QUERY_BUDGET_TABLE=1 to print every measured
+request as a table at the end of each test class, or QUERY_BUDGET_REPORT
+to a file path to append the rows as JSON lines for comparing runs.
+"""
+import json
+import os
+import sys
+import time
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .synthetic import generate
+
+
+class SeedData:
+    """Handles to what seed() created."""
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def seed(participants=60, seminars=15, attendances_per_user=5, plans_per_user=3,
+         evaluation_rate=0.8, seed_value=42):
+    """
+    Generate a small dataset with api.synthetic and return a SeedData. Two
+    thirds of the seminars are finished; every participant attends
+    attendances_per_user of those, evaluates about evaluation_rate of them
+    and plans plans_per_user upcoming ones.
+    """
+    from seminars.models import Category, Seminar
+    from users.models import CustomUser
+
+    result = generate(
+        users=participants, categories=4, seminars=seminars, plans_per_user=plans_per_user,
+        attendances_per_user=attendances_per_user, present_rate=1.0, evaluation_rate=evaluation_rate,
+        finished_ratio=2 / 3, prefix="participant", seed=seed_value,
+    )
+    users = list(CustomUser.objects.filter(id__in=result.user_ids).order_by("id"))
+    seminar_objs = list(Seminar.objects.filter(id__in=result.seminar_ids).order_by("id"))
+    return SeedData(
+        admin=CustomUser.objects.get(id=result.admin_id),
+        users=users,
+        participant=users[0],
+        categories=list(Category.objects.filter(id__in=result.category_ids).order_by("id")),
+        seminars=seminar_objs,
+        finished=[s for s in seminar_objs if s.is_done],
+        upcoming=[s for s in seminar_objs if not s.is_done],
+    )
+
+
+class QueryBudgetTestCase(TestCase):
+    """Seeds once per class; assertBudget() checks one request against its budget."""
+    seed_kwargs = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed(**cls.seed_kwargs)
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.budget_results = []
+
+    def setUp(self):
+        # Throttle buckets and cached lookups would leak between tests
+        cache.clear()
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.budget_results and os.getenv("QUERY_BUDGET_TABLE"):
+            print_budget_table(cls.__name__, cls.budget_results)
+        super().tearDownClass()
+
+    def assertBudget(self, method, path, max_queries, user=None, data=None,
+                     format="json", status=200, warm=None):
+        """
+        Request path as user (anonymous if None) and assert the response
+        status and query count; the elapsed time is recorded, not asserted.
+        GETs are made once beforehand so one-off costs (URL and template
+        loading) don't count.
+        """
+        client = APIClient()
+        if user is not None:
+            client.force_authenticate(user)
+        send = getattr(client, method.lower())
+        if warm is None:
+            warm = method.upper() == "GET"
+        if warm:
+            send(path, data, format=format)
+
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = send(path, data, format=format)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+        row = {
+            "suite": type(self).__name__,
+            "method": method.upper(),
+            "path": path,
+            "status": response.status_code,
+            "queries": len(queries),
+            "budget": max_queries,
+            "ms": round(elapsed_ms, 1),
+        }
+        type(self).budget_results.append(row)
+        report = os.getenv("QUERY_BUDGET_REPORT")
+        if report:
+            with open(report, "a") as f:
+                f.write(json.dumps(row) + "\n")
+
+        if status is not None:
+            self.assertEqual(
+                response.status_code, status,
+                f"{method} {path} returned {response.status_code}: {getattr(response, 'data', '')}",
+            )
+        self.assertLessEqual(
+            len(queries), max_queries,
+            f"{method} {path} ran {len(queries)} queries (budget {max_queries}):\n"
+            + "\n".join(f"  {i}. {q['sql'][:200]}" for i, q in enumerate(queries.captured_queries, 1)),
+        )
+        return response
+
+
+def print_budget_table(title, rows, stream=None):
+    stream = stream or sys.stderr
+    header = ("method", "path", "status", "queries", "budget", "ms")
+    table = [header] + [tuple(str(row[key]) for key in header) for row in rows]
+    widths = [max(len(line[i]) for line in table) for i in range(len(header))]
+    stream.write(f"\n{title}\n")
+    for n, line in enumerate(table):
+        stream.write("| " + " | ".join(cell.ljust(widths[i]) for i, cell in enumerate(line)) + " |\n")
+        if n == 0:
+            stream.write("|" + "|".join("-" * (w + 2) for w in widths) + "|\n")
@@ -1,3 +1,389 @@
-from django.test import TestCase
+# api/tests.py
+"""
+Query budgets for the routes declared in api/urls.py. Each test fails if the
+route's query count grows with the seeded data (an N+1).
+StartupImportTests checks that worker boot leaves the deferred libraries unloaded.
+PrometheusMetricsTests covers /metrics access; ReplicaRoutingTests the
+read-replica router (api.replica).
+"""
+from datetime import timedelta
+import os
+import sqlite3
+import tempfile
+from unittest import SkipTest, mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import OperationalError, connection, connections, router
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.importtime import loaded_at_startup
+from api.replica import replica_reads, reset_replica_health
+from api.synthetic import generate
+
+from api.testing import QueryBudgetTestCase, seed
+from attendance.models import AttendedSeminar
+from mailer.models import OutboxEmail
+from seminars.models import Category, PlannedSeminar, Seminar
+from seminars.tasks import queue_pending_notifications
+from users.models import ParticipantImport
+
+
+class SeminarRouteBudgetTests(QueryBudgetTestCase):
+
+    def test_seminar_list_participant(self):
+        self.assertBudget("GET", "/api/seminars/", 3, user=self.data.participant)
+
+    def test_seminar_list_admin(self):
+        self.assertBudget("GET", "/api/seminars/", 3, user=self.data.admin)
+
+    def test_seminar_list_filtered(self):
+        category = self.data.categories[0]
+        self.assertBudget("GET", f"/api/seminars/?category={category.id}", 3,
+                          user=self.data.participant)
+
+    def test_seminar_detail(self):
+        self.assertBudget("GET", f"/api/seminars/{self.data.upcoming[0].id}/", 3, user=self.data.participant)
+
+    def test_seminar_create(self):
+        start = timezone.now() + timedelta(days=30)
+        self.assertBudget("POST", "/api/seminars/", 4, user=self.data.admin, status=201, data={
+            "title": "Budgeted", "description": "d", "speaker": "s", "venue": "v",
+            "date_start": start.isoformat(), "date_end": (start + timedelta(hours=2)).isoformat(),
+            "duration_minutes": 120, "category_id": self.data.categories[0].id,
+        })
+
+    def test_seminar_update(self):
+        seminar = self.data.upcoming[0]
+        self.assertBudget("PUT", f"/api/seminars/{seminar.id}/", 3, user=self.data.admin,
+                          data={"venue": "Main hall"})
+
+    def test_seminar_delete(self):
+        # A finished seminar's cascade also runs the per-evaluation delete
+        # signals that keep the summaries and suggestion index in step
+        seminar = self.data.upcoming[-1]
+        self.assertBudget("DELETE", f"/api/seminars/{seminar.id}/", 15, user=self.data.admin, status=204)
+
+    def test_planned_seminars(self):
+        self.assertBudget("GET", "/api/planned-seminars/", 1, user=self.data.participant)
+
+    def test_plan_seminar(self):
+        planned = set(self.data.participant.planned_seminars.values_list("seminar_id", flat=True))
+        seminar = next(s for s in self.data.upcoming if s.id not in planned)
+        self.assertBudget("POST", "/api/planned-seminars/", 4, user=self.data.participant, status=201,
+                          data={"seminar": seminar.id})
+
+    def test_unplan_seminar(self):
+        plan = self.data.participant.planned_seminars.first()
+        self.assertBudget("DELETE", f"/api/planned-seminars/{plan.id}/", 2, user=self.data.participant,
+                          status=204)
+
+    def test_categories(self):
+        self.assertBudget("GET", "/api/seminars/categories/", 2, user=self.data.participant)
+
+    def test_category_create(self):
+        self.assertBudget("POST", "/api/seminars/categories/", 2, user=self.data.admin, status=201,
+                          data={"name": "Agriculture"})
+
+    def test_category_delete(self):
+        category = self.data.categories[0]
+        self.assertBudget("DELETE", f"/api/seminars/categories/{category.id}/", 3, user=self.data.admin,
+                          status=204)
+
+
+class UserRouteBudgetTests(QueryBudgetTestCase):
+
+    def test_current_user(self):
+        self.assertBudget("GET", "/api/user/", 0, user=self.data.participant)
+
+    def test_email_notifications(self):
+        self.assertBudget("GET", "/api/users/email-notifications/", 1, user=self.data.participant)
+
+    def test_toggle_email_notifications(self):
+        self.assertBudget("PATCH", "/api/users/email-notifications/", 2, user=self.data.participant,
+                          data={"enabled": True})
+
+    def test_forgot_password(self):
+        self.assertBudget("POST", "/api/forgot-password/", 2, data={"email": self.data.participant.email})
+
+    def test_reset_password_bad_token(self):
+        self.assertBudget("POST", "/api/reset-password/", 0, status=400,
+                          data={"uid": "x", "token": "y", "password": "N3w-passw0rd!"})
+
+    def test_request_email_change(self):
+        self.assertBudget("POST", "/api/request-email-change/", 7, user=self.data.participant,
+                          data={"new_email": "moved@example.com"})
+
+    def test_verify_email_change_bad_code(self):
+        self.assertBudget("POST", "/api/verify-email-change/", 1, user=self.data.participant, status=400,
+                          data={"new_email": "moved@example.com", "code": "000000"})
+
+    def test_participant_import_dry_run(self):
+        csv = SimpleUploadedFile("people.csv", b"username,email\nnewcomer,newcomer@example.com\n")
+        self.assertBudget("POST", "/api/users/import/", 2, user=self.data.admin,
+                          data={"file": csv, "dry_run": "true"}, format="multipart")
+
+    def test_participant_import_detail(self):
+        job = ParticipantImport.objects.create(created_by=self.data.admin, filename="people.csv")
+        self.assertBudget("GET", f"/api/users/import/{job.id}/", 1, user=self.data.admin)
+
+    def test_mailer_stats(self):
+        self.assertBudget("GET", "/api/mailer/stats/", 5, user=self.data.admin)
+
+    def test_request_metrics(self):
+        self.assertBudget("GET", "/api/metrics/requests/", 0, user=self.data.admin)
+
+    def test_dashboard(self):
+        response = self.assertBudget("GET", "/api/dashboard/", 5, user=self.data.participant, warm=False)
+        for key in ("planned_seminars", "attended_seminars", "evaluations"):
+            self.assertTrue(response.data[key], key)
+
+    def test_dashboard_cached(self):
+        self.assertBudget("GET", "/api/dashboard/", 0, user=self.data.participant)
+
+
+class DashboardCacheTests(QueryBudgetTestCase):
+    """A user's writes refresh their own dashboard; seminar edits refresh everyone's."""
+    seed_kwargs = {"participants": 4, "seminars": 6, "attendances_per_user": 2, "plans_per_user": 1}
+
+    def dashboard(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get("/api/dashboard/").data
+
+    def test_own_write_invalidates(self):
+        participant, other = self.data.users[:2]
+        self.dashboard(other)
+        planned = {p["seminar"]["id"] for p in self.dashboard(participant)["planned_seminars"]}
+        seminar = next(s for s in self.data.upcoming if s.id not in planned)
+        PlannedSeminar.objects.create(user=participant, seminar=seminar)
+
+        self.assertIn(seminar.id, {p["seminar"]["id"] for p in self.dashboard(participant)["planned_seminars"]})
+        # Someone else's write leaves this entry cached
+        self.assertBudget("GET", "/api/dashboard/", 0, user=other, warm=False)
+
+    def test_unplan_invalidates(self):
+        participant = self.data.participant
+        planned = self.dashboard(participant)["planned_seminars"][0]
+        client = APIClient()
+        client.force_authenticate(participant)
+        self.assertEqual(client.delete(f"/api/planned-seminars/{planned['id']}/").status_code, 204)
+        self.assertNotIn(planned["id"], {p["id"] for p in self.dashboard(participant)["planned_seminars"]})
+
+    def test_seminar_edit_invalidates_all(self):
+        participant = self.data.participant
+        seminar_id = self.dashboard(participant)["attended_seminars"][0]["seminar"]["id"]
+        seminar = Seminar.objects.get(id=seminar_id)
+        seminar.title = "Renamed seminar"
+        seminar.save()
+        titles = {a["seminar"]["title"] for a in self.dashboard(participant)["attended_seminars"]}
+        self.assertIn("Renamed seminar", titles)
+
+
+class ConditionalGetTests(QueryBudgetTestCase):
+    """Polled read endpoints answer 304 from their validators until a row they show changes."""
+    seed_kwargs = {"participants": 4, "seminars": 6, "attendances_per_user": 2, "evaluation_rate": 0.5}
+
+    def get(self, path, user=None, **headers):
+        client = APIClient()
+        client.force_authenticate(user or self.data.participant)
+        return client.get(path, **headers)
+
+    def test_not_modified_skips_view(self):
+        seminar = self.data.upcoming[0]
+        for path in (
+            "/api/seminars/",
+            f"/api/seminars/{seminar.id}/",
+            "/api/seminars/categories/",
+            "/api/attendance/attended-seminars/",
+            "/api/attendance/attended-seminars/my_attended_seminars/",
+            "/api/evaluations/available-evaluations/",
+            f"/api/certificates/certificate-templates/by_seminar/?seminar_id={seminar.id}",
+        ):
+            with self.subTest(path=path):
+                response = self.get(path)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn("Last-Modified", response)
+                with self.assertNumQueries(1):
+                    cached = self.get(path, HTTP_IF_NONE_MATCH=response["ETag"])
+                self.assertEqual(cached.status_code, 304)
+                self.assertEqual(cached["ETag"], response["ETag"])
+                self.assertFalse(cached.content)
+
+    def test_if_modified_since(self):
+        response = self.get("/api/seminars/categories/")
+        cached = self.get("/api/seminars/categories/", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(cached.status_code, 304)
+
+    def test_edit_changes_etag(self):
+        seminar = self.data.upcoming[0]
+        etag = self.get("/api/seminars/")["ETag"]
+        seminar.venue = "Annex"
+        seminar.save()
+        response = self.get("/api/seminars/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_nested_row_changes_etag(self):
+        etag = self.get("/api/seminars/")["ETag"]
+        category = self.data.categories[0]
+        category.name = "Renamed category"
+        category.save()
+        self.assertEqual(self.get("/api/seminars/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_delete_changes_etag(self):
+        etag = self.get("/api/seminars/categories/")["ETag"]
+        Category.objects.filter(id=self.data.categories[0].id).delete()
+        self.assertEqual(self.get("/api/seminars/categories/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_seminar_ending_changes_etag(self):
+        etag = self.get("/api/seminars/")["ETag"]
+        # Past its end but not yet marked done by SeminarManager
+        Seminar._base_manager.filter(id=self.data.upcoming[0].id).update(date_end=timezone.now() - timedelta(minutes=1))
+        response = self.get("/api/seminars/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(self.data.upcoming[0].id, {s["id"] for s in response.data})
+
+    def test_etag_per_user(self):
+        participant = self.get("/api/attendance/attended-seminars/")
+        admin = self.get("/api/attendance/attended-seminars/", user=self.data.admin)
+        self.assertNotEqual(participant["ETag"], admin["ETag"])
+
+
+class SyntheticDataTests(TestCase):
+
+    def test_generated_seminars_are_not_announced(self):
+        generate(users=5, categories=2, seminars=4, attendances_per_user=2)
+        self.assertEqual(queue_pending_notifications(), 0)
+        self.assertFalse(OutboxEmail.objects.exists())
+
+
+class StartupImportTests(SimpleTestCase):
+    """
+    Worker boot leaves STARTUP_DEFERRED_MODULES unloaded, without touching a
+    database. The time budget is machine-dependent and left to
+    manage.py check_startup_imports.
+    """
+
+    def test_deferred_modules_not_loaded(self):
+        self.assertEqual(loaded_at_startup(), [])
+
+
+class PrometheusMetricsTests(TestCase):
+    """/metrics answers only a request carrying METRICS_TOKEN, whatever its address."""
+
+    @override_settings(METRICS_TOKEN="scrape-secret")
+    def test_token_required(self):
+        self.assertEqual(self.client.get("/metrics", REMOTE_ADDR="127.0.0.1").status_code, 403)
+        self.assertEqual(
+            self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer wrong").status_code, 403,
+        )
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer scrape-secret")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"podium_attendance_scans_total", response.content)
+
+    @override_settings(METRICS_TOKEN="")
+    def test_closed_without_token(self):
+        self.assertEqual(
+            self.client.get("/metrics", REMOTE_ADDR="127.0.0.1", HTTP_AUTHORIZATION="Bearer ").status_code, 403,
+        )
+
+
+class ReplicaRoutingTests(TestCase):
+    """
+    The replica is a second SQLite database holding a copy of the test
+    database taken before seeding, i.e. a replica that hasn't caught up:
+    responses built from the replica count no attended seminars.
+    """
+    statistics_url = "/api/attendance/attended-seminars/statistics/"
+
+    @classmethod
+    def setUpClass(cls):
+        if connection.vendor != "sqlite":
+            raise SkipTest("the replica is copied with SQLite's backup API")
+        fd, cls.replica_path = tempfile.mkstemp(suffix=".sqlite3", prefix="replica-")
+        os.close(fd)
+        # Before super() opens the test transaction, which the copy would wait on
+        connection.ensure_connection()
+        target = sqlite3.connect(cls.replica_path)
+        try:
+            connection.connection.backup(target)
+        finally:
+            target.close()
+        connections.settings["replica"] = {
+            **connections.settings["default"], "NAME": cls.replica_path, "TEST": {"MIRROR": None},
+        }
+        # Not a class attribute: the runner checks those aliases before this runs
+        cls.databases = {"default", "replica"}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections["replica"].close()
+        del connections["replica"]
+        del connections.settings["replica"]
+        os.remove(cls.replica_path)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed(participants=10, seminars=6, attendances_per_user=3)
+        cls.primary_total = AttendedSeminar.objects.count()
+
+    def setUp(self):
+        cache.clear()
+        reset_replica_health()
+        self.addCleanup(reset_replica_health)
+        self.client = APIClient()
+        self.client.force_authenticate(self.data.admin)
+
+    def statistics_total(self):
+        response = self.client.get(self.statistics_url)
+        self.assertEqual(response.status_code, 200)
+        return response.data["total_attended"]
+
+    def test_opted_in_views_read_replica(self):
+        self.assertGreater(self.primary_total, 0)
+        self.assertEqual(self.statistics_total(), 0)
+        response = self.client.get(f"/api/attendance/present-users/{self.data.finished[0].id}/")
+        self.assertEqual(response.data, [])
+
+    def test_other_views_read_primary(self):
+        response = self.client.get(f"/api/attendance/attended-seminars/user/{self.data.participant.id}/")
+        self.assertGreater(response.data["total_attended"], 0)
+
+    def test_writes_go_to_primary(self):
+        Category.objects.using("replica").create(id=1000, name="Replicated")
+        with replica_reads("replica"):
+            category = Category.objects.get(id=1000)
+            self.assertEqual(category._state.db, "replica")
+            self.assertEqual(router.db_for_write(Category, instance=category), "default")
+            category.name = "Saved"
+            category.save()
+        self.assertEqual(Category.objects.using("default").get(id=1000).name, "Saved")
+        self.assertEqual(Category.objects.using("replica").get(id=1000).name, "Replicated")
+
+    @override_settings(REPLICA_MAX_LAG_SECONDS=5)
+    def test_lagging_replica_falls_back_to_primary(self):
+        with mock.patch("api.replica.replica_lag", return_value=60):
+            self.assertEqual(self.statistics_total(), self.primary_total)
+
+    def test_unreachable_replica_falls_back_to_primary(self):
+        with mock.patch("api.replica.replica_lag", side_effect=OperationalError("unable to open database file")):
+            self.assertEqual(self.statistics_total(), self.primary_total)
+
+    def test_replica_error_retries_on_primary(self):
+        with connections["replica"].cursor() as cursor:
+            # Rolled back with the test's transaction
+            cursor.execute("DROP TABLE attendance_attendedseminar")
+        self.assertEqual(self.statistics_total(), self.primary_total)
+        # Skipped until the next health check
+        with mock.patch("api.replica.replica_lag") as lag:
+            self.assertEqual(self.statistics_total(), self.primary_total)
+        lag.assert_not_called()
+
+    @override_settings(REPLICA_DATABASE="missing")
+    def test_without_replica_reads_primary(self):
+        self.assertEqual(self.statistics_total(), self.primary_total)
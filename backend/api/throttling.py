@@ -0,0 +1,125 @@
+# api/throttling.py
+"""
+Token-bucket throttles for DRF views.
+
+Rates use DRF's "N/period" syntax in REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]:
+a bucket holds up to N tokens and refills continuously at N per period,
+so short bursts pass and sustained abuse is held to the average rate.
+Bucket state lives in the THROTTLE_CACHE cache, so a throttle check never
+touches the database or an external service. Limits only hold across
+worker processes when that alias is a shared cache (Redis, Memcached, the
+database cache): with the default LocMem cache every process keeps its own
+buckets, and N workers allow N times the configured rate.
+"""
+import hashlib
+import math
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import exceptions, status
+from rest_framework.throttling import SimpleRateThrottle
+
+_lock = threading.Lock()
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    cache_format = "throttle_bucket_%(scope)s_%(ident)s"
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, "THROTTLE_CACHE", "default")]
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        capacity = self.num_requests
+        refill_per_second = self.num_requests / self.duration
+        now = self.timer()
+
+        with _lock:
+            tokens, updated = self.cache.get(self.key) or (capacity, now)
+            tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            # Buckets left alone for a full period are full again; let them expire
+            self.cache.set(self.key, (tokens, now), self.duration)
+
+        self._wait = 0 if allowed else (1 - tokens) / refill_per_second
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """One bucket per client IP."""
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {"scope": self.scope, "ident": self.get_ident(request)}
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """One bucket per authenticated user (per IP for anonymous requests)."""
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = f"user-{request.user.pk}"
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+
+class FieldTokenBucketThrottle(TokenBucketThrottle):
+    """
+    One bucket per value of a request body field (e.g. the email being
+    targeted), so rotating IPs doesn't help against a single victim.
+    """
+    field = "email"
+
+    def get_cache_key(self, request, view):
+        value = str(request.data.get(self.field, "")).strip().lower()
+        if not value:
+            return None
+        ident = hashlib.sha256(value.encode()).hexdigest()
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+
+class ThrottledError(exceptions.APIException):
+    """429 with the {"error": ...} body the frontend expects."""
+    status_code = status.HTTP_429_TOO_MANY_REQUESTS
+
+    def __init__(self, message, wait=None):
+        super().__init__({"error": message})
+        self.wait = math.ceil(wait) if wait is not None else None
+
+
+class ValidatedThrottleMixin:
+    """
+    Skips the throttle check DRF runs before the handler. The view calls
+    consume_throttles(request) once the input has passed validation, so a
+    rejected request doesn't use up the caller's tokens.
+    """
+
+    def check_throttles(self, request):
+        pass
+
+    def consume_throttles(self, request):
+        super().check_throttles(request)
+
+
+class ErrorMessageThrottleMixin:
+    """
+    For views that report errors as {"error": ...}.
+    throttle_message may use {wait}, the whole seconds until a retry is allowed.
+    """
+    throttle_message = "Too many requests. Please try again in {wait} seconds."
+
+    def throttled(self, request, wait):
+        raise ThrottledError(self.throttle_message.format(wait=math.ceil(wait or 0)), wait)
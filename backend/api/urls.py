@@ -4,8 +4,9 @@ from django.conf.urls.static import static
 from django.conf import settings
 from users.views import CurrentUserView, EmailNotificationToggleView
 from seminars.views import SeminarListCreateAPIView, SeminarDetailAPIView, PlannedSeminarAPIView, PlannedSeminarDetailAPIView, CategoryListCreateAPIView, CategoryDeleteAPIView
+from api.views import RequestMetricsAPIView, UserDashboardAPIView
 from attendance.views import generate_qr_code, record_attendance, download_qr_code
-from users.views import CurrentUserView, ForgotPasswordView, ResetPasswordView, RequestEmailChangeView, VerifyEmailChangeView
+from users.views import CurrentUserView, ForgotPasswordView, ResetPasswordView, RequestEmailChangeView, VerifyEmailChangeView, ParticipantImportView, ParticipantImportDetailView
 
 urlpatterns = [
     path('user/', CurrentUserView.as_view(), name='current-user'),
@@ -29,5 +30,10 @@ urlpatterns = [
 
     path("seminars/categories/", CategoryListCreateAPIView.as_view(), name="category-list-create"),
     path("seminars/categories/<int:pk>/", CategoryDeleteAPIView.as_view(), name="category-delete"),
-    path("users/email-notifications/", EmailNotificationToggleView.as_view(), name="email-notifications")
+    path("users/email-notifications/", EmailNotificationToggleView.as_view(), name="email-notifications"),
+    path("users/import/", ParticipantImportView.as_view(), name="participant-import"),
+    path("users/import/<int:pk>/", ParticipantImportDetailView.as_view(), name="participant-import-detail"),
+    path("mailer/", include("mailer.urls")),
+    path("dashboard/", UserDashboardAPIView.as_view(), name="user-dashboard"),
+    path("metrics/requests/", RequestMetricsAPIView.as_view(), name="request-metrics"),
 ] 
@@ -1,6 +1,15 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework import status
+
+from .dashboard import get_dashboard
+from .instrumentation import route_histogram
+from .metrics import render_latest
 
 class CurrentUserView(APIView):
     permission_classes = [IsAuthenticated]
@@ -16,3 +25,48 @@ class CurrentUserView(APIView):
             "role": user.role,
             "isEmailVerified": user.is_email_verified, 
         })
+
+
+class UserDashboardAPIView(APIView):
+    """
+    The current user with their planned seminars, attended seminars,
+    evaluations and certificates, in place of one request for each.
+    GET /api/dashboard/
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response(get_dashboard(request.user))
+
+
+class RequestMetricsAPIView(APIView):
+    """
+    Admin-only: per-route latency histogram, query counts, DB and outbound
+    HTTP time over the rolling window. Numbers are for this worker process.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role != "admin":
+            return Response({"error": "Only admins can view request metrics."}, status=status.HTTP_403_FORBIDDEN)
+        return Response(route_histogram.snapshot())
+
+    def delete(self, request):
+        if request.user.role != "admin":
+            return Response({"error": "Only admins can reset request metrics."}, status=status.HTTP_403_FORBIDDEN)
+        route_histogram.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+def prometheus_metrics(request):
+    """
+    Prometheus scrape target, for requests carrying
+    "Authorization: Bearer <METRICS_TOKEN>". The client address isn't
+    trusted: behind a proxy on the same host every request is from localhost.
+    """
+    token = getattr(settings, "METRICS_TOKEN", "")
+    supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+    if not (token and hmac.compare_digest(supplied, token)):
+        return HttpResponseForbidden("Forbidden")
+    body, content_type = render_latest()
+    return HttpResponse(body, content_type=content_type)
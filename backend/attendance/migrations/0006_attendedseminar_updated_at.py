@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0005_attendedseminar'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendedseminar',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, help_text='Last change, e.g. check-out time or certificate status'),
+        ),
+    ]
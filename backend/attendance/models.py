@@ -3,10 +3,13 @@ from django.conf import settings
 from seminars.models import Seminar
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+import logging
 import uuid
 
 User = settings.AUTH_USER_MODEL
 
+logger = logging.getLogger(__name__)
+
 class Attendance(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="attendances")
     seminar = models.ForeignKey("seminars.Seminar", on_delete=models.CASCADE, related_name="attendances")
@@ -66,6 +69,10 @@ class AttendedSeminar(models.Model):
         auto_now_add=True,
         help_text="When this attendance record was confirmed"
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text="Last change, e.g. check-out time or certificate status"
+    )
     
     # Additional useful fields
     duration_minutes = models.PositiveIntegerField(
@@ -127,8 +134,8 @@ def create_attended_seminar(sender, instance, created, **kwargs):
     if instance.is_present and instance.check_in and instance.check_out:
         # Check if AttendedSeminar already exists
         attended, created = AttendedSeminar.objects.get_or_create(
-            user=instance.user,
-            seminar=instance.seminar,
+            user_id=instance.user_id,
+            seminar_id=instance.seminar_id,
             defaults={
                 'check_in_time': instance.check_in,
                 'check_out_time': instance.check_out,
@@ -141,12 +148,16 @@ def create_attended_seminar(sender, instance, created, **kwargs):
             attended.check_out_time = instance.check_out
             attended.save()
         
-        print(f"AttendedSeminar record {'created' if created else 'updated'} for {instance.user.username} - {instance.seminar.title}")
+        # ids only: logging the username/title would fetch both related rows
+        logger.info(
+            "AttendedSeminar %s for user %s, seminar %s",
+            "created" if created else "updated", instance.user_id, instance.seminar_id,
+        )
     
     # Optional: Remove AttendedSeminar if is_present becomes False
     elif not instance.is_present:
         AttendedSeminar.objects.filter(
-            user=instance.user,
-            seminar=instance.seminar
+            user_id=instance.user_id,
+            seminar_id=instance.seminar_id
         ).delete()
-        print(f"AttendedSeminar record removed for {instance.user.username} - {instance.seminar.title}")
+        logger.info("AttendedSeminar removed for user %s, seminar %s", instance.user_id, instance.seminar_id)
@@ -1,3 +1,60 @@
-from django.test import TestCase
+# attendance/tests.py
+from datetime import timedelta
 
-# Create your tests here.
+from django.utils import timezone
+
+from api.testing import QueryBudgetTestCase
+from attendance.models import Attendance
+
+
+class AttendanceRouteBudgetTests(QueryBudgetTestCase):
+
+    def test_attended_seminars_admin(self):
+        self.assertBudget("GET", "/api/attendance/attended-seminars/", 2, user=self.data.admin)
+
+    def test_attended_seminars_participant(self):
+        self.assertBudget("GET", "/api/attendance/attended-seminars/", 2, user=self.data.participant)
+
+    def test_my_attended_seminars(self):
+        self.assertBudget("GET", "/api/attendance/attended-seminars/my_attended_seminars/", 2,
+                          user=self.data.participant)
+
+    def test_attended_by_seminar(self):
+        seminar = self.data.finished[0]
+        self.assertBudget("GET", f"/api/attendance/attended-seminars/seminar/{seminar.id}/", 3,
+                          user=self.data.admin)
+
+    def test_attended_by_user(self):
+        self.assertBudget("GET", f"/api/attendance/attended-seminars/user/{self.data.participant.id}/", 2,
+                          user=self.data.admin)
+
+    def test_statistics(self):
+        self.assertBudget("GET", "/api/attendance/attended-seminars/statistics/", 4, user=self.data.admin)
+
+    def test_present_users(self):
+        seminar = self.data.finished[0]
+        self.assertBudget("GET", f"/api/attendance/present-users/{seminar.id}/", 1, user=self.data.admin)
+
+    def test_download_qr(self):
+        seminar = self.data.upcoming[0]
+        self.assertBudget("GET", f"/api/download-qr/{seminar.id}/check_in/", 3, user=self.data.admin)
+
+    def test_generate_qr(self):
+        seminar = self.data.upcoming[0]
+        self.assertBudget("POST", f"/api/generate-qr/{seminar.id}/", 4, user=self.data.admin)
+
+    def test_check_in(self):
+        seminar = self.data.upcoming[0]
+        self.assertBudget("POST", f"/api/attendance/{seminar.id}/check_in/", 10, user=self.data.participant,
+                          data={"qr_token": seminar.qr_codes.qr_token_check_in})
+
+    def test_check_out(self):
+        seminar = self.data.upcoming[0]
+        Attendance.objects.create(user=self.data.participant, seminar=seminar, check_in=timezone.now() - timedelta(minutes=90))
+        self.assertBudget("POST", f"/api/attendance/{seminar.id}/check_out/", 9, user=self.data.participant,
+                          data={"qr_token": seminar.qr_codes.qr_token_check_out})
+
+    def test_rejected_check_in(self):
+        seminar = self.data.upcoming[0]
+        self.assertBudget("POST", f"/api/attendance/{seminar.id}/check_in/", 3, user=self.data.participant,
+                          data={"qr_token": "wrong"}, status=400)
@@ -1,7 +1,6 @@
 import uuid
-import qrcode
 from io import BytesIO
-from django.http import HttpResponse, JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404
 from .models import Attendance, SeminarQRCode, AttendedSeminar
 from users.models import CustomUser
@@ -12,10 +11,12 @@ from rest_framework.response import Response
 from rest_framework import status, viewsets
 from django.utils import timezone
 from datetime import timedelta
-from PIL import Image, ImageDraw, ImageFont
 from django.conf import settings
 import base64
 from attendance.serializers import AttendanceUserSerializer, AttendedSeminarSerializer
+from api import metrics
+from api.conditional import conditional_get, seminar_catalog, seminar_rows
+from api.replica import use_replica
 
 
 base_url = settings.BASE_URL
@@ -23,6 +24,7 @@ base_url = settings.BASE_URL
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@use_replica
 def get_present_users(request, seminar_id):
     """
     Returns users who are marked as present for a specific seminar.
@@ -40,6 +42,9 @@ def get_present_users(request, seminar_id):
 
 # Helper function to generate QR code image with label
 def generate_image_with_label(qr_img, label_text):
+    # Pillow is only needed to draw QR images; importing it here keeps it out of worker boot
+    from PIL import Image, ImageDraw, ImageFont
+
     try:
         font = ImageFont.truetype("arial.ttf", size=20)
     except IOError:
@@ -70,6 +75,8 @@ def generate_image_with_label(qr_img, label_text):
 
 # Helper function to generate QR code image in memory
 def generate_qr_code_image(url):
+    import qrcode
+
     qr_img = qrcode.make(url).convert("RGBA")
     
     # Save QR code image to a BytesIO buffer instead of saving it to a file
@@ -107,6 +114,8 @@ def generate_qr_code(request, seminar_id):
 
     # Helper: generate base64 QR image
     def make_qr_base64(url):
+        import qrcode
+
         qr_img = qrcode.make(url).convert("RGBA")
         buffer = BytesIO()
         qr_img.save(buffer, format="PNG")
@@ -152,6 +161,8 @@ def download_qr_code(request, seminar_id, action):
         return HttpResponse("Invalid action", status=400)
 
     url = f"{base_url}/attendance?action={action}&seminar={seminar.id}&token={qr_token}"
+    import qrcode
+
     qr_img = qrcode.make(url).convert("RGBA")
 
     qr_img_buffer = generate_image_with_label(qr_img, f"{seminar.title}_{action}")
@@ -162,48 +173,71 @@ def download_qr_code(request, seminar_id, action):
     return response
 
 
+def _scan(action, result, response=None):
+    # Unknown actions share one label so junk URLs can't grow the series count
+    metrics.scan(action if action in ("check_in", "check_out") else "invalid", result)
+    return response
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def record_attendance(request, seminar_id, action):
     qr_token = request.data.get("qr_token")
     if not qr_token:
-        return Response({"error": "QR token is required."}, status=400)
+        return _scan(action, "missing_token", Response({"error": "QR token is required."}, status=400))
 
-    seminar = get_object_or_404(Seminar, id=seminar_id)
+    try:
+        seminar = get_object_or_404(Seminar, id=seminar_id)
+    except Http404:
+        _scan(action, "unknown_seminar")
+        raise
 
     # Check if QR code is expired (1 hour after seminar end + 15 minutes grace period)
     grace_period = timedelta(minutes=15)
     expiration_time = seminar.date_end + timedelta(hours=1) + grace_period
     if timezone.now() > expiration_time:
-        return Response({"error": "QR code expired."}, status=400)
+        return _scan(action, "expired", Response({"error": "QR code expired."}, status=400))
 
-    seminar_qr = get_object_or_404(SeminarQRCode, seminar=seminar)
+    try:
+        seminar_qr = get_object_or_404(SeminarQRCode, seminar=seminar)
+    except Http404:
+        _scan(action, "no_qr_code")
+        raise
 
     # Token validation
     if action == "check_in":
         if seminar_qr.qr_token_check_in != qr_token:
-            return Response({"error": "Invalid QR token for check-in."}, status=400)
+            return _scan(action, "invalid_token", Response({"error": "Invalid QR token for check-in."}, status=400))
     elif action == "check_out":
         if seminar_qr.qr_token_check_out != qr_token:
-            return Response({"error": "Invalid QR token for check-out."}, status=400)
+            return _scan(action, "invalid_token", Response({"error": "Invalid QR token for check-out."}, status=400))
     else:
-        return Response({"error": "Invalid action."}, status=400)
+        return _scan(action, "invalid_action", Response({"error": "Invalid action."}, status=400))
 
     attendance, created = Attendance.objects.get_or_create(user=request.user, seminar=seminar)
 
     if action == "check_in":
         if attendance.check_in:
-            return Response({"error": "Already checked in."}, status=400)
+            return _scan(action, "duplicate", Response({"error": "Already checked in."}, status=400))
         attendance.check_in = timezone.now()
         attendance.save()
-        return Response({"success": "Check-in successful."})
+        return _scan(action, "recorded", Response({"success": "Check-in successful."}))
 
     elif action == "check_out":
         if attendance.check_out:
-            return Response({"error": "Already checked out."}, status=400)
+            return _scan(action, "duplicate", Response({"error": "Already checked out."}, status=400))
         attendance.check_out = timezone.now()
         attendance.save()
-        return Response({"success": "Check-out successful."})
+        return _scan(action, "recorded", Response({"success": "Check-out successful."}))
+
+
+# Everything AttendedSeminarSerializer reads: user_name and the nested SeminarSerializer
+ATTENDED_SEMINAR_RELATED = ("user", "seminar__category", "seminar__certificate_template")
+
+
+def attended_sources(attended):
+    """Rows behind an AttendedSeminarSerializer list: the records and the seminars they nest."""
+    return [attended, seminar_rows().filter(pk__in=attended.values("seminar_id")), *seminar_catalog()]
 
 
 class AttendedSeminarViewSet(viewsets.ReadOnlyModelViewSet):
@@ -218,7 +252,7 @@ class AttendedSeminarViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         """Filter based on user role and query parameters"""
         user = self.request.user
-        queryset = AttendedSeminar.objects.select_related('user', 'seminar')
+        queryset = AttendedSeminar.objects.select_related(*ATTENDED_SEMINAR_RELATED)
         
         # Filter by role
         if user.role != 'admin':
@@ -241,7 +275,12 @@ class AttendedSeminarViewSet(viewsets.ReadOnlyModelViewSet):
         
         return queryset
 
+    @conditional_get(lambda view, request, *args, **kwargs: attended_sources(view.get_queryset()))
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
     @action(detail=False, methods=['get'])
+    @conditional_get(lambda view, request: attended_sources(AttendedSeminar.objects.filter(user=request.user)))
     def my_attended_seminars(self, request):
         """
         Get all seminars the current user has attended
@@ -249,15 +288,16 @@ class AttendedSeminarViewSet(viewsets.ReadOnlyModelViewSet):
         """
         attended_seminars = AttendedSeminar.objects.filter(
             user=request.user
-        ).select_related('seminar')
+        ).select_related(*ATTENDED_SEMINAR_RELATED)
         
         serializer = self.get_serializer(attended_seminars, many=True)
         return Response({
-            'count': attended_seminars.count(),
+            'count': len(serializer.data),
             'results': serializer.data
         })
 
     @action(detail=False, methods=['get'], url_path='seminar/(?P<seminar_id>[^/.]+)')
+    @use_replica
     def by_seminar(self, request, seminar_id=None):
         """
         Get all users who attended a specific seminar
@@ -273,13 +313,13 @@ class AttendedSeminarViewSet(viewsets.ReadOnlyModelViewSet):
         seminar = get_object_or_404(Seminar, id=seminar_id)
         attended_seminars = AttendedSeminar.objects.filter(
             seminar=seminar
-        ).select_related('user', 'seminar')
+        ).select_related(*ATTENDED_SEMINAR_RELATED)
         
         serializer = self.get_serializer(attended_seminars, many=True)
         return Response({
             'seminar_id': seminar.id,
             'seminar_title': seminar.title,
-            'total_attendees': attended_seminars.count(),
+            'total_attendees': len(serializer.data),
             'attendees': serializer.data
         })
 
@@ -299,17 +339,18 @@ class AttendedSeminarViewSet(viewsets.ReadOnlyModelViewSet):
         user = get_object_or_404(CustomUser, id=user_id)
         attended_seminars = AttendedSeminar.objects.filter(
             user=user
-        ).select_related('seminar')
+        ).select_related(*ATTENDED_SEMINAR_RELATED)
         
         serializer = self.get_serializer(attended_seminars, many=True)
         return Response({
             'user_id': user.id,
             'username': user.username,
-            'total_attended': attended_seminars.count(),
+            'total_attended': len(serializer.data),
             'seminars': serializer.data
         })
 
     @action(detail=False, methods=['get'])
+    @use_replica
     def statistics(self, request):
         """
         Get attendance statistics
@@ -1,6 +1,6 @@
 # certificates/admin.py
 from django.contrib import admin
-from .models import CertificateTemplate, CertificateRecord
+from .models import CertificateTemplate, CertificateRecord, CertificateDelivery
 
 
 @admin.register(CertificateTemplate)
@@ -57,4 +57,12 @@ class CertificateRecordAdmin(admin.ModelAdmin):
     list_filter = ['sent_at', 'seminar']
     search_fields = ['user__username', 'user__email', 'seminar__title', 'email']
     readonly_fields = ['sent_at']
-    date_hierarchy = 'sent_at'
\ No newline at end of file
+    date_hierarchy = 'sent_at'
+
+
+@admin.register(CertificateDelivery)
+class CertificateDeliveryAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'seminar', 'status', 'attempts', 'created_at', 'updated_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['user__username', 'user__email', 'seminar__title']
+    readonly_fields = ['created_at', 'updated_at']
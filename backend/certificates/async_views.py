@@ -0,0 +1,109 @@
+# certificates/async_views.py
+"""
+Async variants of the certificate endpoints that wait on Cloudinary.
+
+Served instead of the sync views when ASYNC_VIEWS is on (certificates/urls.py),
+which only pays off under an ASGI server: while one request waits for a
+template download, the worker's event loop serves others instead of
+holding a thread. Outbound calls go through the pooled client in api.http;
+database work uses the async ORM or sync_to_async.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from rest_framework import status
+
+from api.async_views import AsyncAPIView
+from attendance.models import Attendance
+from evaluation.models import Evaluation
+from seminars.models import Seminar
+
+from .links import certificate_download_url, get_stored_certificate, links_enabled
+from .models import CertificateTemplate
+from .serializers import CertificateTemplateSerializer
+from .utils import aprobe_image_size, agenerate_certificate, send_certificate_link_email
+from .views import DEFAULT_TEMPLATE_SIZE, default_template_config
+
+
+class AsyncResendCertificateView(AsyncAPIView):
+    """ResendCertificateAPIView with the template download and rendering off the event loop."""
+
+    async def post(self, request, seminar_id, user_id):
+        try:
+            attendance = await Attendance.objects.select_related("user", "seminar").aget(
+                seminar_id=seminar_id, user_id=user_id,
+            )
+        except Attendance.DoesNotExist:
+            return JsonResponse(
+                {"status": "error", "message": "Attendance not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        evaluation_done = await Evaluation.objects.filter(
+            seminar_id=seminar_id, user_id=user_id, is_completed=True,
+        ).aexists()
+        if not evaluation_done:
+            return JsonResponse(
+                {"status": "error", "message": "Cannot send certificate. Evaluation is not completed."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if links_enabled():
+            certificate = await sync_to_async(get_stored_certificate)(seminar_id, user_id)
+            if certificate is not None:
+                # Already hosted: email a fresh link instead of re-rendering
+                await sync_to_async(send_certificate_link_email)(attendance.user, attendance.seminar, certificate)
+                return JsonResponse({
+                    "status": "success",
+                    "message": f"Certificate sent to {attendance.user.email}",
+                    "certificate_url": certificate_download_url(certificate),
+                })
+
+        certificate_data_url = await agenerate_certificate(attendance)
+        return JsonResponse({
+            "status": "success",
+            "message": f"Certificate sent to {attendance.user.email}",
+            "certificate_base64": certificate_data_url,
+        })
+
+
+async def adefault_template_config():
+    default_url = settings.DEFAULT_CERTIFICATE_TEMPLATE_URL
+    try:
+        width, height = await aprobe_image_size(default_url)
+    except Exception:
+        width, height = DEFAULT_TEMPLATE_SIZE
+    return default_template_config(default_url, width, height)
+
+
+class AsyncTemplateDefaultConfigView(AsyncAPIView):
+    """CertificateTemplateViewSet.default_config, reading only the image header."""
+
+    async def get(self, request):
+        return JsonResponse(await adefault_template_config())
+
+
+class AsyncTemplateBySeminarView(AsyncAPIView):
+    """CertificateTemplateViewSet.by_seminar; falls back to the probed default config."""
+
+    async def get(self, request):
+        seminar_id = request.GET.get("seminar_id")
+        if not seminar_id:
+            return JsonResponse(
+                {"error": "seminar_id parameter is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            # Seminar.objects marks finished seminars done on every queryset, so it can't be built here
+            seminar = await sync_to_async(
+                lambda: Seminar.objects.select_related("certificate_template").get(id=seminar_id)
+            )()
+        except Seminar.DoesNotExist:
+            return JsonResponse({"error": "Seminar not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            template = seminar.certificate_template
+        except CertificateTemplate.DoesNotExist:
+            return JsonResponse(await adefault_template_config())
+        return JsonResponse(CertificateTemplateSerializer(template, context={"request": request}).data)
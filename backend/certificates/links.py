@@ -0,0 +1,93 @@
+# certificates/links.py
+"""
+Hosted certificates for CERTIFICATE_DELIVERY_MODE = "link".
+
+Each certificate is stored once (Cloudinary, or default_storage when
+CERTIFICATE_STORAGE = "local") and emails carry a signed, expiring link
+to CertificateDownloadAPIView instead of the PNG itself.
+"""
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.signing import TimestampSigner
+from django.urls import reverse
+
+from .models import Certificate
+
+SIGNING_SALT = "certificates.download"
+
+
+def links_enabled():
+    return getattr(settings, "CERTIFICATE_DELIVERY_MODE", "attachment") == "link"
+
+
+def link_max_age():
+    return getattr(settings, "CERTIFICATE_LINK_MAX_AGE", 60 * 60 * 24 * 30)
+
+
+def store_certificate(seminar, user, certificate_bytes):
+    """Save the rendered PNG (replacing any earlier one) and return the Certificate row."""
+    certificate, _ = Certificate.objects.get_or_create(seminar=seminar, user=user)
+
+    if getattr(settings, "CERTIFICATE_STORAGE", "cloudinary") == "local":
+        if certificate.file_path:
+            default_storage.delete(certificate.file_path)
+        certificate.file_path = default_storage.save(
+            f"certificates/{seminar.id}/{user.id}.png",
+            ContentFile(certificate_bytes),
+        )
+        certificate.file = None
+    else:
+        import cloudinary
+        import cloudinary.uploader
+
+        result = cloudinary.uploader.upload(
+            certificate_bytes,
+            folder="certificates",
+            public_id=f"{seminar.id}_{user.id}",
+            overwrite=True,
+            resource_type="image",
+        )
+        certificate.file = cloudinary.CloudinaryResource(
+            result["public_id"],
+            format=result.get("format"),
+            version=str(result.get("version", "")),
+            type=result.get("type", "upload"),
+            resource_type=result.get("resource_type", "image"),
+        )
+        certificate.file_path = ""
+
+    certificate.save(update_fields=["file", "file_path"])
+    return certificate
+
+
+def get_stored_certificate(seminar_id, user_id):
+    """The hosted certificate for this attendee, or None if it hasn't been stored yet."""
+    certificate = (
+        Certificate.objects.select_related("seminar", "user")
+        .filter(seminar_id=seminar_id, user_id=user_id)
+        .first()
+    )
+    if certificate is None or not (certificate.file_path or certificate.file):
+        return None
+    return certificate
+
+
+def make_download_token(certificate):
+    """Token for a Certificate or a certificate id."""
+    return TimestampSigner(salt=SIGNING_SALT).sign(str(getattr(certificate, "pk", certificate)))
+
+
+def certificate_download_url(certificate):
+    """Absolute signed link; emails are built off the request path, so use API_BASE_URL."""
+    path = reverse("certificate-download", kwargs={"token": make_download_token(certificate)})
+    return f"{settings.API_BASE_URL.rstrip('/')}{path}"
+
+
+def certificate_from_token(token):
+    """
+    Resolve a download token.
+    Raises SignatureExpired / BadSignature, or Certificate.DoesNotExist.
+    """
+    certificate_id = TimestampSigner(salt=SIGNING_SALT).unsign(token, max_age=link_max_age())
+    return Certificate.objects.select_related("seminar").get(pk=int(certificate_id))
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certificates', '0010_certificatetemplate_show_title_and_more'),
+        ('seminars', '0006_assign_other_category'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CertificateDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('rendering', 'Rendering'), ('sent', 'Sent'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('seminar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='certificate_deliveries', to='seminars.seminar')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='certificate_deliveries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Certificate Delivery',
+                'verbose_name_plural': 'Certificate Deliveries',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certificates', '0011_certificatedelivery'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificate',
+            name='file_path',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
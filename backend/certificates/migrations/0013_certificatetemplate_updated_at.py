@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certificates', '0012_certificate_file_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificatetemplate',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
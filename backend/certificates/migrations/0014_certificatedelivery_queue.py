@@ -0,0 +1,61 @@
+# Generated by Django 5.2.6 on 2026-10-19 20:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def link_queued_emails(apps, schema_editor):
+    """Rows marked sent only had their email queued: relabel them and link the outbox row."""
+    CertificateDelivery = apps.get_model("certificates", "CertificateDelivery")
+    OutboxEmail = apps.get_model("mailer", "OutboxEmail")
+
+    emails = dict(
+        OutboxEmail.objects.filter(dedupe_key__startswith="certificate-delivery:")
+        .values_list("dedupe_key", "id")
+    )
+    deliveries = list(CertificateDelivery.objects.filter(status="sent").only("id"))
+    for delivery in deliveries:
+        delivery.status = "queued_for_email"
+        delivery.email_id = emails.get(f"certificate-delivery:{delivery.id}")
+    CertificateDelivery.objects.bulk_update(deliveries, ["status", "email"], batch_size=1000)
+
+
+def unlink_queued_emails(apps, schema_editor):
+    CertificateDelivery = apps.get_model("certificates", "CertificateDelivery")
+    CertificateDelivery.objects.filter(status="queued_for_email").update(status="sent")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certificates', '0013_certificatetemplate_updated_at'),
+        ('mailer', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificatedelivery',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='certificatedelivery',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='certificatedelivery',
+            name='email',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='mailer.outboxemail'),
+        ),
+        migrations.AlterField(
+            model_name='certificatedelivery',
+            name='status',
+            field=models.CharField(choices=[('queued', 'Queued'), ('rendering', 'Rendering'), ('queued_for_email', 'Queued for email'), ('failed', 'Failed')], default='queued', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='certificatedelivery',
+            index=models.Index(fields=['status', 'claimed_at'], name='certificate_status_602802_idx'),
+        ),
+        migrations.RunPython(link_queued_emails, unlink_queued_emails),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 20:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certificates', '0014_certificatedelivery_queue'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='certificatedelivery',
+            name='status',
+            field=models.CharField(choices=[('queued', 'Queued'), ('rendering', 'Rendering'), ('queued_for_email', 'Queued for email'), ('sent', 'Sent'), ('failed', 'Failed')], default='queued', max_length=20),
+        ),
+    ]
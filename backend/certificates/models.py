@@ -3,6 +3,8 @@ from django.db import models
 from django.conf import settings
 from cloudinary.models import CloudinaryField
 
+from mailer.models import OutboxEmail
+
 User = settings.AUTH_USER_MODEL
 
 # Web-safe fonts
@@ -65,6 +67,7 @@ class CertificateTemplate(models.Model):
     
     # Metadata
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     default_used = models.BooleanField(default=False)
 
     def __str__(self):
@@ -102,6 +105,8 @@ class Certificate(models.Model):
     seminar = models.ForeignKey("seminars.Seminar", on_delete=models.CASCADE)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     file = CloudinaryField('image', folder='certificates/', null=True, blank=True)
+    # Path in default_storage when CERTIFICATE_STORAGE = "local"
+    file_path = models.CharField(max_length=255, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -111,3 +116,76 @@ class Certificate(models.Model):
 
     def __str__(self):
         return f"{self.user} - {self.seminar.title}"
+
+
+class CertificateDelivery(models.Model):
+    """
+    A certificate to render and email in the background, and the status
+    handle returned to the client on evaluation submit so it can poll for
+    progress. The rows are the queue: the worker (manage.py run_mail_worker)
+    claims queued ones, and rows left in rendering by a stopped worker are
+    queued again once claimed_at is older than CERTIFICATE_CLAIM_TIMEOUT.
+    """
+    STATUS_QUEUED = "queued"
+    STATUS_RENDERING = "rendering"
+    # Rendered; the email is in the outbox and may not have gone out yet
+    STATUS_QUEUED_FOR_EMAIL = "queued_for_email"
+    STATUS_FAILED = "failed"
+    # The outbox row's outcome is reported while the email is queued, and
+    # stored (certificates.tasks.settle_deliveries) before that row is purged
+    STATUS_SENT = "sent"
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_RENDERING, "Rendering"),
+        (STATUS_QUEUED_FOR_EMAIL, "Queued for email"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    seminar = models.ForeignKey("seminars.Seminar", on_delete=models.CASCADE, related_name="certificate_deliveries")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="certificate_deliveries")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    error = models.TextField(blank=True)
+    email = models.ForeignKey(
+        "mailer.OutboxEmail", on_delete=models.SET_NULL, null=True, blank=True, related_name="+",
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Certificate Delivery"
+        verbose_name_plural = "Certificate Deliveries"
+        indexes = [
+            models.Index(fields=["status", "claimed_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.seminar} ({self.status})"
+
+    @property
+    def current_status(self):
+        """status, or the email's sent/failed outcome once it is in the outbox."""
+        if self.status == self.STATUS_QUEUED_FOR_EMAIL and self.email is not None:
+            if self.email.status == OutboxEmail.STATUS_SENT:
+                return self.STATUS_SENT
+            if self.email.status == OutboxEmail.STATUS_FAILED:
+                return self.STATUS_FAILED
+        return self.status
+
+    @property
+    def current_error(self):
+        if self.current_status == self.STATUS_FAILED and self.email is not None:
+            return self.error or self.email.last_error
+        return self.error
+
+    @property
+    def is_finished(self):
+        return self.current_status in (self.STATUS_SENT, self.STATUS_FAILED)
+
+    @property
+    def email_dedupe_key(self):
+        """Outbox dedupe key of this delivery's email."""
+        return f"certificate-delivery:{self.pk}"
@@ -1,13 +1,16 @@
 # certificates/serializers.py
 from rest_framework import serializers
 from django.conf import settings
-from .models import CertificateTemplate, FONT_CHOICES, Certificate
+from django.urls import reverse
+from .links import certificate_download_url
+from .models import CertificateTemplate, FONT_CHOICES, Certificate, CertificateDelivery
 from seminars.models import Seminar
 
 
 class CertificateTemplateSerializer(serializers.ModelSerializer):
     seminar_id = serializers.PrimaryKeyRelatedField(
-        queryset=Seminar.objects.all(),
+        # _base_manager: Seminar.objects runs SeminarManager's UPDATE, here at import time
+        queryset=Seminar._base_manager.all(),
         source="seminar",
         write_only=True
     )
@@ -78,7 +81,29 @@ class CertificateTemplateSerializer(serializers.ModelSerializer):
         return data
     
 class CertificateSerializer(serializers.ModelSerializer):
+    seminar_title = serializers.CharField(source="seminar.title", read_only=True)
+    # Signed link to the hosted file, like the ones emailed in link mode
+    download_url = serializers.SerializerMethodField()
+
     class Meta:
         model = Certificate
-        fields = ["id", "seminar", "user", "file", "created_at"]
-        read_only_fields = ["id", "created_at"]
\ No newline at end of file
+        fields = ["id", "seminar", "seminar_title", "user", "created_at", "download_url"]
+        read_only_fields = ["id", "created_at"]
+
+    def get_download_url(self, obj):
+        return certificate_download_url(obj)
+
+
+class CertificateDeliverySerializer(serializers.ModelSerializer):
+    status_url = serializers.SerializerMethodField()
+    # sent/failed come from the outbox row once the certificate is rendered
+    status = serializers.CharField(source="current_status")
+    error = serializers.CharField(source="current_error")
+
+    class Meta:
+        model = CertificateDelivery
+        fields = ["id", "seminar", "user", "status", "error", "created_at", "updated_at", "status_url"]
+        read_only_fields = fields
+
+    def get_status_url(self, obj):
+        return reverse("certificate-delivery-status", kwargs={"pk": obj.pk})
@@ -0,0 +1,125 @@
+# certificates/tasks.py
+"""
+Background certificate generation.
+
+Evaluation submits only create a CertificateDelivery row. CertificateWorker,
+run by the mail worker (manage.py run_mail_worker), claims queued rows with
+skip_locked, renders them on a small thread pool and queues their email in
+the outbox. A row is never lost with the process that claimed it: rows left
+in rendering longer than CERTIFICATE_CLAIM_TIMEOUT are queued again, and
+given up on after CERTIFICATE_MAX_ATTEMPTS claims.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, OuterRef, Subquery
+from django.utils import timezone
+
+from mailer.models import OutboxEmail
+
+from .models import CertificateDelivery
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_certificate(attendance):
+    """Queue certificate generation for an attendance and return its status handle."""
+    return CertificateDelivery.objects.create(
+        seminar_id=attendance.seminar_id,
+        user_id=attendance.user_id,
+    )
+
+
+def run_certificate_delivery(delivery_id):
+    """Render a claimed delivery's certificate and queue its email, recording the outcome on the row."""
+    from attendance.models import Attendance
+    from .utils import generate_certificate
+
+    close_old_connections()
+    try:
+        delivery = CertificateDelivery.objects.get(id=delivery_id)
+        try:
+            attendance = Attendance.objects.select_related("user", "seminar").get(
+                seminar_id=delivery.seminar_id,
+                user_id=delivery.user_id,
+            )
+            generate_certificate(attendance, dedupe_key=delivery.email_dedupe_key)
+        except Exception as e:
+            logger.exception("Certificate delivery %s failed", delivery_id)
+            delivery.status = CertificateDelivery.STATUS_FAILED
+            delivery.error = str(e)[:1000]
+            delivery.save(update_fields=["status", "error", "updated_at"])
+            return
+
+        delivery.status = CertificateDelivery.STATUS_QUEUED_FOR_EMAIL
+        delivery.email = OutboxEmail.objects.filter(dedupe_key=delivery.email_dedupe_key).first()
+        delivery.save(update_fields=["status", "email", "updated_at"])
+    finally:
+        close_old_connections()
+
+
+def settle_deliveries(email_ids):
+    """Store the sent/failed outcome on deliveries whose outbox rows are about to be purged."""
+    waiting = CertificateDelivery.objects.filter(
+        email_id__in=email_ids, status=CertificateDelivery.STATUS_QUEUED_FOR_EMAIL,
+    )
+    waiting.filter(email__status=OutboxEmail.STATUS_SENT).update(status=CertificateDelivery.STATUS_SENT)
+    waiting.filter(email__status=OutboxEmail.STATUS_FAILED).update(
+        status=CertificateDelivery.STATUS_FAILED,
+        error=Subquery(OutboxEmail.objects.filter(pk=OuterRef("email_id")).values("last_error")[:1]),
+    )
+
+
+class CertificateWorker:
+    """Claims queued deliveries and renders up to `threads` of them at a time."""
+
+    def __init__(self, threads=None, claim_timeout=None, max_attempts=None):
+        self.threads = threads or getattr(settings, "CERTIFICATE_WORKERS", 2)
+        self.claim_timeout = timedelta(seconds=claim_timeout or getattr(settings, "CERTIFICATE_CLAIM_TIMEOUT", 600))
+        self.max_attempts = max_attempts or getattr(settings, "CERTIFICATE_MAX_ATTEMPTS", 3)
+        self.executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="certificates")
+
+    def reset_stale(self, now):
+        """Queue again rows whose worker stopped mid-render; fail the ones that keep stopping it."""
+        stale = CertificateDelivery.objects.filter(
+            status=CertificateDelivery.STATUS_RENDERING,
+            claimed_at__lt=now - self.claim_timeout,
+        )
+        stale.filter(attempts__gte=self.max_attempts).update(
+            status=CertificateDelivery.STATUS_FAILED,
+            error=f"Rendering did not finish after {self.max_attempts} attempts",
+        )
+        stale.update(status=CertificateDelivery.STATUS_QUEUED)
+
+    def claim(self):
+        now = timezone.now()
+        self.reset_stale(now)
+
+        with transaction.atomic():
+            # skip_locked lets several workers drain the same table
+            ids = list(
+                CertificateDelivery.objects.select_for_update(skip_locked=True)
+                .filter(status=CertificateDelivery.STATUS_QUEUED)
+                .order_by("id")
+                .values_list("id", flat=True)[:self.threads]
+            )
+            if ids:
+                CertificateDelivery.objects.filter(id__in=ids).update(
+                    status=CertificateDelivery.STATUS_RENDERING,
+                    claimed_at=now,
+                    attempts=F("attempts") + 1,
+                )
+        return ids
+
+    def drain_once(self):
+        """Claim and render one round of queued deliveries. Returns how many were claimed."""
+        ids = self.claim()
+        for future in [self.executor.submit(run_certificate_delivery, delivery_id) for delivery_id in ids]:
+            future.result()
+        return len(ids)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
@@ -1,3 +1,239 @@
-from django.test import TestCase
+# certificates/tests.py
+from datetime import timedelta
+from io import BytesIO
+from types import ModuleType
+from unittest import mock
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.urls import path
+from django.utils import timezone
+from PIL import Image
+from rest_framework.authtoken.models import Token
+
+from api.testing import QueryBudgetTestCase, seed
+from attendance.models import Attendance
+from certificates.async_views import (
+    AsyncResendCertificateView,
+    AsyncTemplateBySeminarView,
+    AsyncTemplateDefaultConfigView,
+)
+from certificates.models import CertificateDelivery, CertificateTemplate
+from certificates.serializers import CertificateDeliverySerializer
+from certificates.tasks import CertificateWorker, enqueue_certificate, run_certificate_delivery, settle_deliveries
+from mailer.cleanup import purge_outbox
+from mailer.models import OutboxEmail
+from mailer.standin import StandInServer
+
+
+def _template_response(*args, **kwargs):
+    buffer = BytesIO()
+    Image.new("RGB", (400, 300), "white").save(buffer, format="PNG")
+    return mock.Mock(content=buffer.getvalue(), raise_for_status=lambda: None)
+
+
+class CertificateRouteBudgetTests(QueryBudgetTestCase):
+
+    def test_template_list(self):
+        self.assertBudget("GET", "/api/certificates/certificate-templates/", 1, user=self.data.admin)
+
+    def test_template_by_seminar(self):
+        seminar = self.data.seminars[0]
+        self.assertBudget("GET", f"/api/certificates/certificate-templates/by_seminar/?seminar_id={seminar.id}",
+                          4, user=self.data.admin)
+
+    def test_template_detail(self):
+        template = self.data.seminars[0].certificate_template
+        self.assertBudget("GET", f"/api/certificates/certificate-templates/{template.id}/", 1,
+                          user=self.data.admin)
+
+    @mock.patch("certificates.views.requests.get", side_effect=_template_response)
+    def test_default_config(self, _get):
+        self.assertBudget("GET", "/api/certificates/certificate-templates/default_config/", 0,
+                          user=self.data.admin)
+
+    def test_template_delete(self):
+        template = self.data.seminars[0].certificate_template
+        self.assertBudget("DELETE", f"/api/certificates/certificate-templates/{template.id}/", 3,
+                          user=self.data.admin, status=204)
+
+    def test_download_bad_token(self):
+        self.assertBudget("GET", "/api/certificates/certificate-download/1:bad:token/", 0, status=404)
+
+    def test_delivery_status(self):
+        delivery = CertificateDelivery.objects.filter(user=self.data.participant).first()
+        self.assertBudget("GET", f"/api/certificates/certificate-status/{delivery.id}/", 2,
+                          user=self.data.participant)
+
+    @mock.patch("certificates.utils.requests.get", side_effect=_template_response)
+    def test_resend_certificate(self, _get):
+        evaluation = self.data.participant.evaluations.first()
+        self.assertBudget(
+            "POST", f"/api/certificates/resend-certificate/{evaluation.seminar_id}/{evaluation.user_id}/",
+            5, user=self.data.admin,
+        )
+
+
+@mock.patch("certificates.tasks.close_old_connections")
+class CertificateWorkerTests(TestCase):
+    """Deliveries are claimed from the table, so a stopped worker's rows are picked up again."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed(participants=4, seminars=6, attendances_per_user=2, evaluation_rate=1.0)
+        cls.attendance = Attendance.objects.filter(user=cls.data.participant).first()
+
+    def setUp(self):
+        self.worker = CertificateWorker(threads=2, claim_timeout=60, max_attempts=2)
+        self.addCleanup(self.worker.close)
+
+    def test_claim_marks_rendering(self, _close):
+        first, second, third = (enqueue_certificate(self.attendance) for _ in range(3))
+        self.assertEqual(self.worker.claim(), [first.id, second.id])
+        first.refresh_from_db()
+        self.assertEqual((first.status, first.attempts), (CertificateDelivery.STATUS_RENDERING, 1))
+        self.assertIsNotNone(first.claimed_at)
+        self.assertEqual(self.worker.claim(), [third.id])
+        self.assertEqual(self.worker.claim(), [])
+
+    def test_stale_rendering_is_claimed_again(self, _close):
+        delivery = enqueue_certificate(self.attendance)
+        self.worker.claim()
+        CertificateDelivery.objects.filter(id=delivery.id).update(
+            claimed_at=timezone.now() - timedelta(minutes=5),
+        )
+        self.assertEqual(self.worker.claim(), [delivery.id])
+        delivery.refresh_from_db()
+        self.assertEqual(delivery.attempts, 2)
+
+    def test_stale_rendering_fails_after_max_attempts(self, _close):
+        delivery = enqueue_certificate(self.attendance)
+        CertificateDelivery.objects.filter(id=delivery.id).update(
+            status=CertificateDelivery.STATUS_RENDERING, attempts=2,
+            claimed_at=timezone.now() - timedelta(minutes=5),
+        )
+        self.assertEqual(self.worker.claim(), [])
+        delivery.refresh_from_db()
+        self.assertEqual(delivery.status, CertificateDelivery.STATUS_FAILED)
+        self.assertTrue(delivery.error)
+
+    @mock.patch("certificates.utils.requests.get", side_effect=_template_response)
+    def test_status_follows_outbox(self, _get, _close):
+        delivery = enqueue_certificate(self.attendance)
+        self.worker.claim()
+        run_certificate_delivery(delivery.id)
+        delivery.refresh_from_db()
+        self.assertEqual(delivery.status, CertificateDelivery.STATUS_QUEUED_FOR_EMAIL)
+        self.assertEqual(delivery.email.dedupe_key, delivery.email_dedupe_key)
+        self.assertEqual(CertificateDeliverySerializer(delivery).data["status"], "queued_for_email")
+
+        OutboxEmail.objects.filter(id=delivery.email_id).update(status=OutboxEmail.STATUS_SENT)
+        delivery.refresh_from_db()
+        self.assertEqual(CertificateDeliverySerializer(delivery).data["status"], "sent")
+
+        OutboxEmail.objects.filter(id=delivery.email_id).update(
+            status=OutboxEmail.STATUS_FAILED, last_error="Mailbox unavailable",
+        )
+        delivery.refresh_from_db()
+        data = CertificateDeliverySerializer(delivery).data
+        self.assertEqual((data["status"], data["error"]), ("failed", "Mailbox unavailable"))
+
+    @mock.patch("certificates.utils.generate_certificate", side_effect=OSError("cannot open font"))
+    def test_render_failure(self, _generate, _close):
+        delivery = enqueue_certificate(self.attendance)
+        self.worker.claim()
+        run_certificate_delivery(delivery.id)
+        delivery.refresh_from_db()
+        self.assertEqual((delivery.status, delivery.error), (CertificateDelivery.STATUS_FAILED, "cannot open font"))
+        self.assertIsNone(delivery.email_id)
+
+    def test_status_survives_outbox_purge(self, _close):
+        outcomes = {OutboxEmail.STATUS_SENT: "", OutboxEmail.STATUS_FAILED: "Mailbox unavailable"}
+        deliveries = {}
+        for email_status, last_error in outcomes.items():
+            email = OutboxEmail.objects.create(
+                kind=OutboxEmail.KIND_CERTIFICATE, to_email="p@example.com", subject="Certificate",
+                status=email_status, sent_at=timezone.now(), last_error=last_error,
+            )
+            deliveries[email_status] = CertificateDelivery.objects.create(
+                seminar_id=self.attendance.seminar_id, user_id=self.attendance.user_id,
+                status=CertificateDelivery.STATUS_QUEUED_FOR_EMAIL, email=email,
+            )
+
+        purge_outbox(before_delete=settle_deliveries, now=timezone.now() + timedelta(days=31))
+        for email_status, last_error in outcomes.items():
+            delivery = CertificateDelivery.objects.get(id=deliveries[email_status].id)
+            self.assertIsNone(delivery.email_id)
+            data = CertificateDeliverySerializer(delivery).data
+            self.assertEqual((data["status"], data["error"]), (email_status, last_error))
+
+
+async_urls = ModuleType("async_urls")
+async_urls.urlpatterns = [
+    path("resend/<int:seminar_id>/<int:user_id>/", AsyncResendCertificateView.as_view()),
+    path("default_config/", AsyncTemplateDefaultConfigView.as_view()),
+    path("by_seminar/", AsyncTemplateBySeminarView.as_view()),
+]
+
+
+@override_settings(ROOT_URLCONF=async_urls)
+class AsyncCertificateViewTests(TestCase):
+    """The ASYNC_VIEWS variants through the ASGI handler, with the template served by a stand-in."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = StandInServer(template_size=(400, 300)).start()
+        cls.addClassCleanup(cls.server.stop)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed(participants=10, seminars=6, attendances_per_user=3, evaluation_rate=0.5)
+        cls.token = Token.objects.create(user=cls.data.admin).key
+        cls.template = CertificateTemplate.objects.get(seminar=cls.data.seminars[0])
+        # Seminars get a template on creation; drop one to exercise the default config fallback
+        CertificateTemplate.objects.filter(seminar=cls.data.seminars[1]).delete()
+
+    def setUp(self):
+        settings_override = override_settings(DEFAULT_CERTIFICATE_TEMPLATE_URL=self.server.template_url)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    async def get(self, path, **kwargs):
+        return await self.async_client.get(path, headers={"Authorization": f"Token {self.token}"}, **kwargs)
+
+    async def test_resend_certificate(self):
+        evaluation = await self.data.participant.evaluations.afirst()
+        response = await self.async_client.post(
+            f"/resend/{evaluation.seminar_id}/{evaluation.user_id}/",
+            headers={"Authorization": f"Token {self.token}"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["certificate_base64"].startswith("data:image/png;base64,"))
+        self.assertIn("Server-Timing", response)
+
+    async def test_resend_requires_evaluation(self):
+        attendance = await Attendance.objects.exclude(
+            seminar__evaluations__user=self.data.participant,
+        ).filter(user=self.data.participant).afirst()
+        response = await self.async_client.post(
+            f"/resend/{attendance.seminar_id}/{attendance.user_id}/",
+            headers={"Authorization": f"Token {self.token}"},
+        )
+        self.assertEqual(response.status_code, 400)
+
+    async def test_requires_token(self):
+        response = await self.async_client.get("/default_config/")
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response["WWW-Authenticate"], "Token")
+
+    async def test_default_config_probes_template_size(self):
+        response = await self.get("/default_config/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()["template_width"], response.json()["template_height"]), (400, 300))
+
+    async def test_by_seminar(self):
+        response = await self.get("/by_seminar/", data={"seminar_id": self.template.seminar_id})
+        self.assertEqual(response.json()["id"], self.template.id)
+
+        response = await self.get("/by_seminar/", data={"seminar_id": self.data.seminars[1].id})
+        self.assertEqual(response.json()["template_width"], 400)
@@ -1,12 +1,30 @@
 # certificates/urls.py
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CertificateTemplateViewSet, ResendCertificateAPIView
+from .views import CertificateTemplateViewSet, ResendCertificateAPIView, CertificateDeliveryStatusAPIView, CertificateDownloadAPIView
 
 router = DefaultRouter()
 router.register(r'certificate-templates', CertificateTemplateViewSet, basename='certificate-template')
 
-urlpatterns = [
+if getattr(settings, "ASYNC_VIEWS", False):
+    from .async_views import AsyncResendCertificateView, AsyncTemplateBySeminarView, AsyncTemplateDefaultConfigView
+
+    # Ahead of the router, whose detail route would otherwise match these
+    async_urlpatterns = [
+        path("certificate-templates/default_config/", AsyncTemplateDefaultConfigView.as_view(),
+             name="certificate-template-default-config"),
+        path("certificate-templates/by_seminar/", AsyncTemplateBySeminarView.as_view(),
+             name="certificate-template-by-seminar"),
+    ]
+    resend_view = AsyncResendCertificateView.as_view()
+else:
+    async_urlpatterns = []
+    resend_view = ResendCertificateAPIView.as_view()
+
+urlpatterns = async_urlpatterns + [
     path('', include(router.urls)),
-    path("resend-certificate/<int:seminar_id>/<int:user_id>/", ResendCertificateAPIView.as_view(), name="resend-certificate"),
-]
\ No newline at end of file
+    path("resend-certificate/<int:seminar_id>/<int:user_id>/", resend_view, name="resend-certificate"),
+    path("certificate-status/<int:pk>/", CertificateDeliveryStatusAPIView.as_view(), name="certificate-delivery-status"),
+    path("certificate-download/<str:token>/", CertificateDownloadAPIView.as_view(), name="certificate-download"),
+]
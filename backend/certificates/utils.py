@@ -1,16 +1,25 @@
 # certificates/utils.py
+import asyncio
 from io import BytesIO
-from PIL import Image, ImageDraw, ImageFont
+from asgiref.sync import sync_to_async
 from django.core.mail import EmailMessage
 from django.conf import settings
 import requests
 import base64
+import logging
+import time
 
-import sib_api_v3_sdk
-from sib_api_v3_sdk.rest import ApiException
+from api.http import get_async_client
+from api.metrics import CERTIFICATE_RENDER_BYTES, CERTIFICATE_RENDER_SECONDS
 
+from mailer.models import OutboxEmail
+from mailer.outbox import enqueue_email
+
+from .links import certificate_download_url, link_max_age, links_enabled, store_certificate
 from .models import CertificateTemplate, CertificateRecord
 
+logger = logging.getLogger(__name__)
+
 
 from django.conf import settings
 import os
@@ -18,9 +27,10 @@ import os
 FONT_DIR = os.path.join(settings.BASE_DIR, "certificates", "fonts")
 
 from pathlib import Path
-from PIL import ImageFont
 
 def _load_font(font_name, font_size):
+    from PIL import ImageFont
+
     # Move up 2 levels: utils.py → certificates → backend
     project_root = Path(__file__).resolve().parent.parent   # /backend
 
@@ -28,87 +38,95 @@ def _load_font(font_name, font_size):
     font_path = project_root / "certificates" / "fonts" / font_name
 
     if not font_path.exists():
-        print(f"[ERROR] Font not found: {font_path}")
+        logger.error("Font not found: %s", font_path)
         return ImageFont.load_default()
 
     try:
         return ImageFont.truetype(str(font_path), font_size)
     except Exception as e:
-        print(f"[ERROR] Failed to load font {font_path}: {e}")
+        logger.error("Failed to load font %s: %s", font_path, e)
         return ImageFont.load_default()
 
-def generate_certificate(attendance):
-    """Generate certificate WITHOUT saving to Cloudinary."""
-    seminar = attendance.seminar
-    user = attendance.user
-    full_name = f"{user.first_name} {user.last_name}".strip() or user.username
+def _decode_template(content):
+    from PIL import Image
+
+    img = Image.open(BytesIO(content))
+    img.load()
+    return img
+
+
+def load_template_image(url):
+    """Download and decode the template image at url."""
+    response = requests.get(url, timeout=getattr(settings, "CERTIFICATE_TEMPLATE_TIMEOUT", 30))
+    response.raise_for_status()
+    return _decode_template(response.content)
+
+
+async def aload_template_image(url):
+    """load_template_image() through the pooled async client; decoding runs on a thread."""
+    response = await get_async_client().get(url, timeout=getattr(settings, "CERTIFICATE_TEMPLATE_TIMEOUT", 30))
+    response.raise_for_status()
+    return await asyncio.to_thread(_decode_template, response.content)
+
+
+def image_size(content):
+    """(width, height) of an encoded image."""
+    from PIL import Image
 
-    # Try to get the seminar's custom template
+    return Image.open(BytesIO(content)).size
+
+
+async def aprobe_image_size(url, chunk_size=16 * 1024):
+    """
+    (width, height) of the image at url. Reads only until Pillow can parse
+    the header, which for PNG and most JPEGs is the first chunk, rather
+    than downloading the whole template.
+    """
+    from PIL import UnidentifiedImageError
+
+    data = b""
+    async with get_async_client().stream("GET", url) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes(chunk_size):
+            data += chunk
+            try:
+                return image_size(data)
+            except (UnidentifiedImageError, OSError, SyntaxError):
+                continue
+    return image_size(data)
+
+
+def seminar_template(seminar):
+    """The seminar's CertificateTemplate, or None if it has none."""
     try:
-        template = seminar.certificate_template
-        use_default = False
+        return seminar.certificate_template
     except CertificateTemplate.DoesNotExist:
-        template = None
-        use_default = True
-
-    # Load image
-    if use_default or not template or not template.template_image:
-        default_url = getattr(
-            settings,
-            "DEFAULT_CERTIFICATE_TEMPLATE_URL",
-            "https://res.cloudinary.com/dcoc9jepl/image/upload/v1761304008/default_certificate_h09vbq.png"
-        )
-        response = requests.get(default_url)
-        response.raise_for_status()
-        img = Image.open(BytesIO(response.content))
-        img_width, img_height = img.size
-
-        if template:
-            name_x = int((template.name_x_percent / 100) * img_width)
-            name_y = int((template.name_y_percent / 100) * img_height)
-            title_x = int((template.title_x_percent / 100) * img_width)
-            title_y = int((template.title_y_percent / 100) * img_height)
-
-            name_config = {
-                'x': name_x,
-                'y': name_y,
-                'font_size': template.name_font_size,
-                'font_path': template.name_font,
-                'color': template.name_color,
-            }
-            title_config = {
-                'x': title_x,
-                'y': title_y,
-                'font_size': template.title_font_size,
-                'font_path': template.title_font,
-                'color': template.title_color,
-            }
-        else:
-            name_config = {
-                'x': img_width // 2,
-                'y': int(img_height * 0.44),
-                'font_size': 128,
-                'font_path': "Arial.ttf",
-                'color': "#000000"
-            }
-            title_config = {
-                'x': img_width // 2,
-                'y': int(img_height * 0.65),
-                'font_size': 80,
-                'font_path': "Arial.ttf",
-                'color': "#1a1a1a"
-            }
-    else:
-        response = requests.get(template.template_image.url)
-        response.raise_for_status()
-        img = Image.open(BytesIO(response.content))
-        img_width, img_height = img.size
-        
+        return None
+
+
+def template_image_url(template):
+    if template and template.template_image:
+        return template.template_image.url
+    return getattr(
+        settings,
+        "DEFAULT_CERTIFICATE_TEMPLATE_URL",
+        "https://res.cloudinary.com/dcoc9jepl/image/upload/v1761304008/default_certificate_h09vbq.png"
+    )
+
+
+def render_certificate(img, seminar, template, full_name):
+    """Draw the seminar title and participant name on img and return the PNG bytes."""
+    from PIL import ImageDraw
+
+    img_width, img_height = img.size
+
+    # A template without its own image positions text on the default one
+    if template:
         name_x = int((template.name_x_percent / 100) * img_width)
         name_y = int((template.name_y_percent / 100) * img_height)
         title_x = int((template.title_x_percent / 100) * img_width)
         title_y = int((template.title_y_percent / 100) * img_height)
-        
+
         name_config = {
             'x': name_x,
             'y': name_y,
@@ -123,6 +141,21 @@ def generate_certificate(attendance):
             'font_path': template.title_font,
             'color': template.title_color,
         }
+    else:
+        name_config = {
+            'x': img_width // 2,
+            'y': int(img_height * 0.44),
+            'font_size': 128,
+            'font_path': "Arial.ttf",
+            'color': "#000000"
+        }
+        title_config = {
+            'x': img_width // 2,
+            'y': int(img_height * 0.65),
+            'font_size': 80,
+            'font_path': "Arial.ttf",
+            'color': "#1a1a1a"
+        }
 
     draw = ImageDraw.Draw(img)
 
@@ -142,7 +175,7 @@ def generate_certificate(attendance):
             anchor='mm' 
         )
         
-        print(f"Title: '{title_text}' at ({title_config['x']}, {title_config['y']}) [centered]")
+        logger.debug("Title %r at (%s, %s)", title_text, title_config['x'], title_config['y'])
 
     # Draw participant name (always shown)
     name_font = _load_font(name_config['font_path'], name_config['font_size'])
@@ -156,17 +189,20 @@ def generate_certificate(attendance):
         anchor='mm' 
     )
     
-    print(f"Name: '{full_name}' at ({name_config['x']}, {name_config['y']}) [centered]")
+    logger.debug("Name %r at (%s, %s)", full_name, name_config['x'], name_config['y'])
 
     # Save to BytesIO
     buffer = BytesIO()
     img.save(buffer, format="PNG")
-    buffer.seek(0)
+    return buffer.getvalue()
 
-    certificate_bytes = buffer.getvalue()
-    certificate_base64 = base64.b64encode(certificate_bytes).decode('utf-8')
-    certificate_data_url = f"data:image/png;base64,{certificate_base64}"
 
+def _full_name(user):
+    return f"{user.first_name} {user.last_name}".strip() or user.username
+
+
+def _deliver_certificate(attendance, certificate_bytes, dedupe_key=None):
+    """Record the certificate and queue its email; returns the PNG as a data URL."""
     # Track certificate generation
     CertificateRecord.objects.get_or_create(
         seminar=attendance.seminar,
@@ -174,34 +210,53 @@ def generate_certificate(attendance):
         defaults={'email': attendance.user.email}
     )
 
-    # Send email
-    send_certificate_email(user, seminar, certificate_bytes)
-    
-    return certificate_data_url
+    # Queue email
+    send_certificate_email(attendance.user, attendance.seminar, certificate_bytes, dedupe_key=dedupe_key)
 
+    certificate_base64 = base64.b64encode(certificate_bytes).decode('utf-8')
+    return f"data:image/png;base64,{certificate_base64}"
 
 
-def send_certificate_email(user, seminar, certificate_bytes):
-    """Send the generated certificate via Brevo API."""
-    
-    # Configure Brevo API
-    configuration = sib_api_v3_sdk.Configuration()
-    configuration.api_key['api-key'] = settings.BREVO_API_KEY
-    
-    api_instance = sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
-    
-    # Convert bytes to base64 for Brevo API
-    certificate_base64 = base64.b64encode(certificate_bytes).decode('utf-8')
-    
-    # Prepare email
-    subject = f"Your Certificate for {seminar.title}"
-    sender = {
-        "name": settings.BREVO_SENDER_NAME,
-        "email": settings.BREVO_SENDER_EMAIL
-    }
-    to = [{"email": user.email, "name": f"{user.first_name} {user.last_name}".strip() or user.username}]
-    
-    html_content = f"""
+def generate_certificate(attendance, dedupe_key=None):
+    """
+    Generate certificate WITHOUT saving to Cloudinary.
+    dedupe_key is passed through to the certificate email's outbox row.
+    """
+    seminar = attendance.seminar
+    render_started = time.perf_counter()
+
+    template = seminar_template(seminar)
+    img = load_template_image(template_image_url(template))
+    certificate_bytes = render_certificate(img, seminar, template, _full_name(attendance.user))
+    CERTIFICATE_RENDER_SECONDS.observe(time.perf_counter() - render_started)
+    CERTIFICATE_RENDER_BYTES.observe(len(certificate_bytes))
+
+    return _deliver_certificate(attendance, certificate_bytes, dedupe_key)
+
+
+async def agenerate_certificate(attendance, dedupe_key=None):
+    """
+    generate_certificate() for async views: the template download goes
+    through the async client, drawing runs on a thread so the event loop
+    stays free, and only the ORM work is wrapped in sync_to_async.
+    """
+    seminar = attendance.seminar
+    render_started = time.perf_counter()
+
+    template = await sync_to_async(seminar_template)(seminar)
+    img = await aload_template_image(template_image_url(template))
+    certificate_bytes = await asyncio.to_thread(
+        render_certificate, img, seminar, template, _full_name(attendance.user),
+    )
+    CERTIFICATE_RENDER_SECONDS.observe(time.perf_counter() - render_started)
+    CERTIFICATE_RENDER_BYTES.observe(len(certificate_bytes))
+
+    return await sync_to_async(_deliver_certificate)(attendance, certificate_bytes, dedupe_key)
+
+
+
+def _certificate_email_html(user, seminar, message_html):
+    return f"""
     <!DOCTYPE html>
     <html>
     <head>
@@ -211,6 +266,7 @@ def send_certificate_email(user, seminar, certificate_bytes):
             .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
             .header {{ background: linear-gradient(135deg, #800000, #ff0000, #800000); padding: 30px; text-align: center; color: white; }}
             .content {{ padding: 30px; background: #f9f9f9; }}
+            .button {{ display: inline-block; padding: 12px 24px; background: #800000; color: #FFFFFF; text-decoration: none; border-radius: 6px; }}
             .footer {{ padding: 20px; text-align: center; font-size: 12px; color: #666; }}
         </style>
     </head>
@@ -222,7 +278,7 @@ def send_certificate_email(user, seminar, certificate_bytes):
             <div class="content">
                 <p>Good day {user.first_name or user.username},</p>
                 <p>Congratulations! 🎉</p>
-                <p>Your certificate for attending <strong>"{seminar.title}"</strong> is now ready and attached to this email.</p>
+                {message_html}
                 <p>Thank you for your participation!</p>
             </div>
             <div class="footer">
@@ -233,6 +289,25 @@ def send_certificate_email(user, seminar, certificate_bytes):
     </body>
     </html>
     """
+
+
+def send_certificate_email(user, seminar, certificate_bytes, dedupe_key=None):
+    """
+    Queue the generated certificate for delivery by the mail worker.
+    In "link" delivery mode the PNG is stored once and the email links to it.
+    """
+    if links_enabled():
+        certificate = store_certificate(seminar, user, certificate_bytes)
+        return send_certificate_link_email(user, seminar, certificate, dedupe_key=dedupe_key)
+
+    # Convert bytes to base64 for Brevo API
+    certificate_base64 = base64.b64encode(certificate_bytes).decode('utf-8')
+    
+    html_content = _certificate_email_html(
+        user,
+        seminar,
+        f'<p>Your certificate for attending <strong>"{seminar.title}"</strong> is now ready and attached to this email.</p>',
+    )
     
     # Attachment
     attachment = [{
@@ -240,22 +315,33 @@ def send_certificate_email(user, seminar, certificate_bytes):
         "name": f"{seminar.title}_Certificate.png"
     }]
     
-    send_smtp_email = sib_api_v3_sdk.SendSmtpEmail(
-        to=to,
-        sender=sender,
-        subject=subject,
+    return enqueue_email(
+        kind=OutboxEmail.KIND_CERTIFICATE,
+        to_email=user.email,
+        to_name=f"{user.first_name} {user.last_name}".strip() or user.username,
+        subject=f"Your Certificate for {seminar.title}",
         html_content=html_content,
-        attachment=attachment
+        attachments=attachment,
+        dedupe_key=dedupe_key,
+    )
+
+
+def send_certificate_link_email(user, seminar, certificate, dedupe_key=None):
+    """Queue an email with a signed, expiring download link to a stored certificate."""
+    days = max(link_max_age() // 86400, 1)
+    html_content = _certificate_email_html(
+        user,
+        seminar,
+        f"""<p>Your certificate for attending <strong>"{seminar.title}"</strong> is now ready.</p>
+                <p><a class="button" href="{certificate_download_url(certificate)}">Download your certificate</a></p>
+                <p>This link is valid for {days} days.</p>""",
+    )
+
+    return enqueue_email(
+        kind=OutboxEmail.KIND_CERTIFICATE,
+        to_email=user.email,
+        to_name=f"{user.first_name} {user.last_name}".strip() or user.username,
+        subject=f"Your Certificate for {seminar.title}",
+        html_content=html_content,
+        dedupe_key=dedupe_key,
     )
-    
-    try:
-        api_response = api_instance.send_transac_email(send_smtp_email)
-        print(f"   Certificate email sent successfully to {user.email}")
-        print(f"   Brevo Message ID: {api_response.message_id}")
-    except ApiException as e:
-        print(f"   Failed to send certificate email to {user.email}")
-        print(f"   Error: {e}")
-        print(f"   Status: {e.status}")
-        print(f"   Reason: {e.reason}")
-        print(f"   Body: {e.body}")
-        raise
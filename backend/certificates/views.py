@@ -1,39 +1,62 @@
 
 # certificates/views.py
-from rest_framework import viewsets, status
-from rest_framework.decorators import action
-from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
-from django.conf import settings
-from PIL import Image
+import logging
+import os
 from io import BytesIO
-import requests
-import cloudinary.uploader
-
-from .models import CertificateTemplate
-from .serializers import CertificateTemplateSerializer
-from seminars.models import Seminar
-
 
-# certificates/views.py
+import requests
+from django.conf import settings
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.conf import settings
-from PIL import Image, ImageFont
-from io import BytesIO
-import requests
-import cloudinary.uploader
 
+from api.conditional import conditional_get, seminar_rows
+from api.dashboard import invalidate_all_dashboards
 from .models import CertificateTemplate
 from .serializers import CertificateTemplateSerializer
+from .utils import image_size
 from seminars.models import Seminar
-import os
+
+logger = logging.getLogger(__name__)
 
 FONT_DIR = os.path.join(settings.BASE_DIR, "certificates", "fonts")
 
+# Used when the default template's size can't be read
+DEFAULT_TEMPLATE_SIZE = (2000, 1414)
+
+
+def default_template_config(template_url, width, height):
+    """Layout the editor starts from for a seminar without a template."""
+    return {
+        "template_url": template_url,
+        "template_width": width,
+        "template_height": height,
+        "name_x_percent": 50.0,
+        "name_y_percent": 38.9,
+        "name_font_size": 128,
+        "name_font": "Arial.ttf",
+        "name_color": "#000000",
+        "title_x_percent": 50.0,
+        "title_y_percent": 28.3,
+        "title_font_size": 80,
+        "title_font": "Arial.ttf",
+        "title_color": "#1a1a1a",
+        "show_title": True,
+    }
+
+
+def template_sources(view, request):
+    """What by_seminar reads; nothing to validate until the view rejects a missing id."""
+    seminar_id = request.query_params.get("seminar_id")
+    if not seminar_id:
+        return []
+    return [seminar_rows().filter(id=seminar_id), CertificateTemplate.objects.filter(seminar_id=seminar_id)]
+
+
 def load_font(font_name, size):
+    from PIL import ImageFont
+
     try:
         return ImageFont.truetype(os.path.join(FONT_DIR, font_name), size)
     except Exception as e:
@@ -41,7 +64,7 @@ def load_font(font_name, size):
         return ImageFont.load_default()
 
 class CertificateTemplateViewSet(viewsets.ModelViewSet):
-    queryset = CertificateTemplate.objects.all()
+    queryset = CertificateTemplate.objects.select_related("seminar")
     serializer_class = CertificateTemplateSerializer
     permission_classes = [IsAuthenticated]
 
@@ -52,6 +75,8 @@ class CertificateTemplateViewSet(viewsets.ModelViewSet):
                 # Extract public_id from Cloudinary URL
                 # CloudinaryField has a public_id attribute
                 if hasattr(template.template_image, 'public_id'):
+                    import cloudinary.uploader
+
                     public_id = template.template_image.public_id
                     result = cloudinary.uploader.destroy(public_id)
                     print(f"Deleted old image from Cloudinary: {public_id}")
@@ -105,6 +130,7 @@ class CertificateTemplateViewSet(viewsets.ModelViewSet):
                 # Download and read image dimensions (into memory only)
                 response = requests.get(image_url)
                 response.raise_for_status()
+                from PIL import Image
                 img = Image.open(BytesIO(response.content))
                 
                 template.template_width = img.width
@@ -126,43 +152,6 @@ class CertificateTemplateViewSet(viewsets.ModelViewSet):
             status=status.HTTP_201_CREATED
         )
 
-    def update(self, request, *args, **kwargs):
-        """Update existing template"""
-        partial = kwargs.pop('partial', True)
-        instance = self.get_object()
-        
-        # ✅ If new image is being uploaded, delete the old one from Cloudinary
-        if 'template_image' in request.FILES and instance.template_image:
-            self._delete_old_cloudinary_image(instance)
-        
-        serializer = self.get_serializer(
-            instance,
-            data=request.data,
-            partial=partial
-        )
-        serializer.is_valid(raise_exception=True)
-        template = serializer.save()
-
-        # ✅ If new image uploaded, update dimensions
-        if 'template_image' in request.FILES or template.template_image:
-            try:
-                image_url = template.template_image.url
-                response = requests.get(image_url)
-                response.raise_for_status()
-                img = Image.open(BytesIO(response.content))
-                
-                template.template_width = img.width
-                template.template_height = img.height
-                template.default_used = False
-                template.save(update_fields=['template_width', 'template_height', 'default_used'])
-                
-                print(f"✅ Image updated in Cloudinary: {image_url}")
-                print(f"✅ Dimensions: {img.width}x{img.height}px")
-            except Exception as e:
-                print(f"❌ Error reading image dimensions: {e}")
-
-        return Response(serializer.data)
-
     def destroy(self, request, *args, **kwargs):
         """Delete template and its Cloudinary image"""
         instance = self.get_object()
@@ -170,62 +159,10 @@ class CertificateTemplateViewSet(viewsets.ModelViewSet):
         # ✅ Delete image from Cloudinary before deleting template
         self._delete_old_cloudinary_image(instance)
         
-        return super().destroy(request, *args, **kwargs)
-
-    @action(detail=False, methods=['get'])
-    def default_config(self, request):
-        """Return default template configuration"""
-        # Get dimensions of default template
-        default_url = settings.DEFAULT_CERTIFICATE_TEMPLATE_URL
-        try:
-            response = requests.get(default_url)
-            img = Image.open(BytesIO(response.content))
-            width, height = img.size
-        except:
-            width, height = 2000, 1414
-
-        return Response({
-            "template_url": default_url,
-            "template_width": width,
-            "template_height": height,
-            "name_x_percent": 50.0,
-            "name_y_percent": 38.9,
-            "name_font_size": 128,
-            "name_font": "Arial.ttf",
-            "name_color": "#000000",
-            "title_x_percent": 50.0,
-            "title_y_percent": 28.3,
-            "title_font_size": 80,
-            "title_font": "Arial.ttf",
-            "title_color": "#1a1a1a",
-            "show_title": True,
-        })
-
-    @action(detail=False, methods=['get'])
-    def by_seminar(self, request):
-        """Get template by seminar ID"""
-        seminar_id = request.query_params.get('seminar_id')
-        
-        if not seminar_id:
-            return Response(
-                {"error": "seminar_id parameter is required"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        try:
-            seminar = Seminar.objects.get(id=seminar_id)
-            template = seminar.certificate_template
-            serializer = self.get_serializer(template)
-            return Response(serializer.data)
-        except Seminar.DoesNotExist:
-            return Response(
-                {"error": "Seminar not found"},
-                status=status.HTTP_404_NOT_FOUND
-            )
-        except CertificateTemplate.DoesNotExist:
-            # Return default config if no template exists
-            return self.default_config(request)
-
+        response = super().destroy(request, *args, **kwargs)
+        # No post_delete receiver for templates (api.signals)
+        invalidate_all_dashboards()
+        return response
 
     def update(self, request, *args, **kwargs):
         """Update existing template"""
@@ -243,20 +180,19 @@ class CertificateTemplateViewSet(viewsets.ModelViewSet):
         # ✅ If new image uploaded, update dimensions
         if 'template_image' in request.FILES or template.template_image:
             try:
-                image_url = template.template_image.url
-                response = requests.get(image_url)
+                response = requests.get(
+                    template.template_image.url,
+                    timeout=getattr(settings, "CERTIFICATE_TEMPLATE_TIMEOUT", 30),
+                )
                 response.raise_for_status()
-                img = Image.open(BytesIO(response.content))
-                
-                template.template_width = img.width
-                template.template_height = img.height
+                width, height = image_size(response.content)
+
+                template.template_width = width
+                template.template_height = height
                 template.default_used = False
                 template.save(update_fields=['template_width', 'template_height', 'default_used'])
-                
-                print(f"✅ Image updated in Cloudinary: {image_url}")
-                print(f"✅ Dimensions: {img.width}x{img.height}px")
-            except Exception as e:
-                print(f"❌ Error reading image dimensions: {e}")
+            except Exception:
+                logger.warning("Could not read the dimensions of template %s", template.id, exc_info=True)
 
         return Response(serializer.data)
 
@@ -266,30 +202,17 @@ class CertificateTemplateViewSet(viewsets.ModelViewSet):
         # Get dimensions of default template
         default_url = settings.DEFAULT_CERTIFICATE_TEMPLATE_URL
         try:
-            response = requests.get(default_url)
-            img = Image.open(BytesIO(response.content))
-            width, height = img.size
-        except:
-            width, height = 2000, 1414
+            response = requests.get(default_url, timeout=getattr(settings, "CERTIFICATE_TEMPLATE_TIMEOUT", 30))
+            response.raise_for_status()
+            width, height = image_size(response.content)
+        except Exception:
+            logger.warning("Could not read the default template's size", exc_info=True)
+            width, height = DEFAULT_TEMPLATE_SIZE
 
-        return Response({
-            "template_url": default_url,
-            "template_width": width,
-            "template_height": height,
-            "name_x_percent": 50.0,
-            "name_y_percent": 38.9,
-            "name_font_size": 128,
-            "name_font": "Arial.ttf",
-            "name_color": "#000000",
-            "title_x_percent": 50.0,
-            "title_y_percent": 28.3,
-            "title_font_size": 80,
-            "title_font": "Arial.ttf",
-            "title_color": "#1a1a1a",
-            "show_title": True,
-        })
+        return Response(default_template_config(default_url, width, height))
 
     @action(detail=False, methods=['get'])
+    @conditional_get(template_sources)
     def by_seminar(self, request):
         """Get template by seminar ID"""
         seminar_id = request.query_params.get('seminar_id')
@@ -333,6 +256,15 @@ from certificates.services import CertificateService  # you will create this
 from attendance.models import Attendance
 from evaluation.models import Evaluation
 from certificates.services import CertificateService
+from django.shortcuts import get_object_or_404
+from django.core.files.storage import default_storage
+from django.core.signing import BadSignature, SignatureExpired
+from django.http import FileResponse, HttpResponseRedirect
+from rest_framework.permissions import AllowAny
+from .links import certificate_download_url, certificate_from_token, get_stored_certificate, links_enabled
+from .models import Certificate, CertificateDelivery
+from .serializers import CertificateDeliverySerializer
+from .utils import send_certificate_link_email
 
 
 class ResendCertificateAPIView(APIView):
@@ -340,7 +272,7 @@ class ResendCertificateAPIView(APIView):
 
     def post(self, request, seminar_id, user_id):
         try:
-            attendance = Attendance.objects.get(seminar_id=seminar_id, user_id=user_id)
+            attendance = Attendance.objects.select_related("user", "seminar").get(seminar_id=seminar_id, user_id=user_id)
         except Attendance.DoesNotExist:
             return Response(
                 {"status": "error", "message": "Attendance not found"},
@@ -362,6 +294,17 @@ class ResendCertificateAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        if links_enabled():
+            certificate = get_stored_certificate(seminar_id, user_id)
+            if certificate is not None:
+                # Already hosted: email a fresh link instead of re-rendering
+                send_certificate_link_email(attendance.user, attendance.seminar, certificate)
+                return Response({
+                    "status": "success",
+                    "message": f"Certificate sent to {attendance.user.email}",
+                    "certificate_url": certificate_download_url(certificate),
+                })
+
         # Generate certificate (automatically sends email)
         cert = CertificateService.generate(attendance)
 
@@ -369,4 +312,53 @@ class ResendCertificateAPIView(APIView):
             "status": "success",
             "message": f"Certificate sent to {attendance.user.email}",
             "certificate_base64": cert["base64"],
-        })
\ No newline at end of file
+        })
+
+
+class CertificateDownloadAPIView(APIView):
+    """
+    Download a hosted certificate through the signed link from its email
+    GET /api/certificates/certificate-download/{token}/
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request, token):
+        try:
+            certificate = certificate_from_token(token)
+        except SignatureExpired:
+            return Response(
+                {"error": "This download link has expired. Please ask for your certificate to be resent."},
+                status=status.HTTP_410_GONE
+            )
+        except (BadSignature, ValueError, Certificate.DoesNotExist):
+            return Response({"error": "Invalid download link."}, status=status.HTTP_404_NOT_FOUND)
+
+        if certificate.file_path and default_storage.exists(certificate.file_path):
+            return FileResponse(
+                default_storage.open(certificate.file_path, "rb"),
+                as_attachment=True,
+                filename=f"{certificate.seminar.title}_Certificate.png",
+                content_type="image/png",
+            )
+        if certificate.file:
+            return HttpResponseRedirect(certificate.file.build_url(secure=True))
+
+        return Response({"error": "Certificate file not found."}, status=status.HTTP_404_NOT_FOUND)
+
+
+class CertificateDeliveryStatusAPIView(APIView):
+    """
+    Poll the progress of a background certificate delivery
+    GET /api/certificates/certificate-status/{id}/
+    Status is one of: queued, rendering, queued_for_email, sent, failed
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        deliveries = CertificateDelivery.objects.select_related("email")
+        if request.user.role != "admin":
+            deliveries = deliveries.filter(user=request.user)
+
+        delivery = get_object_or_404(deliveries, pk=pk)
+        return Response(CertificateDeliverySerializer(delivery).data)
@@ -54,6 +54,8 @@ ALLOWED_HOSTS = [
 # ]
 
 BASE_URL = "https://hcdc-podium.vercel.app"
+# Public URL of this API, for links in emails built off the request path
+API_BASE_URL = os.getenv("API_BASE_URL", "https://thepodium.onrender.com")
 
 # settings.py
 MEDIA_URL = '/media/'  # URL to access media files
@@ -87,6 +89,7 @@ INSTALLED_APPS = [
     'certificates',
     'evaluation',
     'seminars.apps.SeminarsConfig',
+    'mailer',
 
     'cloudinary',
     'cloudinary_storage',
@@ -96,9 +99,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover every other middleware too
+    'api.instrumentation.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # WhiteNoiseMiddleware that can also run async under ASGI
+    'api.middleware.AsyncWhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     # 'django.middleware.csrf.CsrfViewMiddleware',
@@ -108,6 +114,61 @@ MIDDLEWARE = [
     'allauth.account.middleware.AccountMiddleware',
 ]
 
+# api.instrumentation: Server-Timing header plus a rolling per-route
+# histogram (REQUEST_METRICS_WINDOWS windows of WINDOW_SECONDS each)
+REQUEST_METRICS_SERVER_TIMING = os.getenv("REQUEST_METRICS_SERVER_TIMING", "True") == "True"
+REQUEST_METRICS_WINDOW_SECONDS = 60
+REQUEST_METRICS_WINDOWS = 15
+REQUEST_METRICS_HTTP_SERVICES = {
+    "brevo": ("brevo.com", "sendinblue.com"),
+    "cloudinary": ("cloudinary.com",),
+}
+
+# Prometheus metrics (api.metrics). With PROMETHEUS_MULTIPROC_DIR set in a
+# process's environment, it writes its values under that directory and
+# /metrics adds them up; unset, each process reports its own. prometheus_client
+# reads the variable on import, so it comes from the process environment:
+# gunicorn.conf.py sets and creates it for the web workers, the Procfile for
+# the mail worker. /metrics needs "Authorization: Bearer <METRICS_TOKEN>";
+# with no token set it answers nobody.
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR", "")
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Worker cold start (api.importtime, `manage.py check_startup_imports`).
+# Booting a worker must stay under STARTUP_IMPORT_BUDGET_MS of imports and
+# must not load STARTUP_DEFERRED_MODULES, which only a few views need and
+# import on first use
+STARTUP_IMPORT_BUDGET_MS = int(os.getenv("STARTUP_IMPORT_BUDGET_MS", "1000"))
+STARTUP_DEFERRED_MODULES = ("PIL", "qrcode", "sib_api_v3_sdk", "httpx")
+
+# ASYNC_VIEWS serves the async variants of the certificate endpoints that
+# wait on Cloudinary (certificates.async_views). Only worth it under an ASGI
+# server, e.g. `uvicorn config.asgi:application --workers 2`; under WSGI
+# each async view gets an event loop of its own. Those views and the async
+# mail worker share a pooled httpx client per event loop (api.http)
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "False") == "True"
+ASYNC_HTTP_MAX_CONNECTIONS = int(os.getenv("ASYNC_HTTP_MAX_CONNECTIONS", "100"))
+ASYNC_HTTP_MAX_KEEPALIVE = int(os.getenv("ASYNC_HTTP_MAX_KEEPALIVE", "20"))
+ASYNC_HTTP_CONNECT_TIMEOUT = 5
+ASYNC_HTTP_TIMEOUT = 30
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "simple": {"format": "%(asctime)s %(levelname)s %(name)s: %(message)s"},
+    },
+    "handlers": {
+        "console": {"class": "logging.StreamHandler", "formatter": "simple"},
+    },
+    "root": {"handlers": ["console"], "level": os.getenv("LOG_LEVEL", "INFO")},
+    "loggers": {
+        # Keep Django's own request/SQL chatter at its usual level
+        "django": {"handlers": ["console"], "level": os.getenv("DJANGO_LOG_LEVEL", "INFO"), "propagate": False},
+        # httpx logs every request at INFO
+        "httpx": {"level": "WARNING"},
+    },
+}
 
 ROOT_URLCONF = 'config.urls'
 
@@ -116,13 +177,25 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         # 'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
+        'users.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
+    # Token buckets (api.throttling): N requests of burst, refilled at N per period
+    'DEFAULT_THROTTLE_RATES': {
+        'password_reset_ip': '10/hour',
+        'password_reset_email': '3/hour',
+        'email_change_user': '1/min',
+        'email_change_email': '5/hour',
+    },
 }
 
+# Cache alias holding throttle buckets. The default LocMem cache is per
+# process, so each worker enforces the rates above on its own; set a shared
+# cache alias to hold them across all workers
+THROTTLE_CACHE = os.getenv("THROTTLE_CACHE", "default")
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -168,6 +241,25 @@ DATABASES = {
         )
     }
 
+# Read replica for analytics and exports (api.replica). Views marked
+# @use_replica read from it while it is at most REPLICA_MAX_LAG_SECONDS
+# behind and reachable, else from the primary; health is checked at most
+# every REPLICA_CHECK_INTERVAL seconds per worker. Without
+# DATABASE_REPLICA_URL everything uses the primary. Tests mirror it onto
+# the test database
+REPLICA_DATABASE = "replica"
+if os.getenv("DATABASE_REPLICA_URL"):
+    DATABASES[REPLICA_DATABASE] = dj_database_url.config(
+        env="DATABASE_REPLICA_URL",
+        conn_max_age=600,
+        conn_health_checks=True,
+        ssl_require=True,
+    )
+    DATABASES[REPLICA_DATABASE]["TEST"] = {"MIRROR": "default"}
+DATABASE_ROUTERS = ["api.replica.ReadReplicaRouter"]
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "30"))
+REPLICA_CHECK_INTERVAL = float(os.getenv("REPLICA_CHECK_INTERVAL", "10"))
+
 # DATABASES['default'] = dj_database_url.config(conn_max_age=600, ssl_require=True)
 
 
@@ -191,11 +283,39 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 AUTHENTICATION_BACKENDS = [
-    'django.contrib.auth.backends.ModelBackend',
+    # ModelBackend that also accepts a case-insensitive email
+    'users.backends.EmailOrUsernameBackend',
     'allauth.account.auth_backends.AuthenticationBackend',
 ]
 print("Loaded settings.py")
 
+# Token -> user cache for CachedTokenAuthentication. Must be a CACHES alias
+# every worker process shares: logout, password changes and deactivation
+# are only invalidated there. Unset, tokens are looked up on every request
+TOKEN_AUTH_CACHE = os.getenv("TOKEN_AUTH_CACHE") or None
+TOKEN_AUTH_CACHE_TTL = 30
+
+# Participant dashboard (api.dashboard), cached per user in DASHBOARD_CACHE.
+# Entries are dropped when the user's rows change; with more than one
+# worker process use a shared cache alias so every process sees that
+DASHBOARD_CACHE = os.getenv("DASHBOARD_CACHE", "default")
+DASHBOARD_CACHE_SECONDS = 300
+
+# CSV participant imports (users.importer). Workers hash passwords in
+# separate processes; None means one per CPU
+PARTICIPANT_IMPORT_WORKERS = int(os.getenv("PARTICIPANT_IMPORT_WORKERS", "0")) or None
+PARTICIPANT_IMPORT_BATCH_SIZE = 1000
+PARTICIPANT_IMPORT_MAX_BYTES = 20 * 1024 * 1024
+# Seconds without progress before the mail worker queues a running import
+# again (its worker was killed), and how many claims before it is failed
+PARTICIPANT_IMPORT_CLAIM_TIMEOUT = 600
+PARTICIPANT_IMPORT_MAX_ATTEMPTS = 3
+
+# Seconds between the mail worker's sweeps of used and expired email change
+# requests (users.cleanup), and the most 1000-row DELETEs one round runs
+EMAIL_CHANGE_SWEEP_INTERVAL = 3600
+EMAIL_CHANGE_SWEEP_MAX_BATCHES = 10
+
 REST_AUTH = {
     'REGISTER_SERIALIZER': 'users.serializers.CustomRegisterSerializer',
     'USER_DETAILS_SERIALIZER': 'users.serializers.UserSerializer',
@@ -299,6 +419,40 @@ BREVO_API_KEY = os.getenv("BREVO_API_KEY")
 BREVO_SENDER_EMAIL = "hans.amoguis@hcdc.edu.ph"
 BREVO_SENDER_NAME = "HCDC The Podium"
 
+# Recipients per Brevo batch request (messageVersions) for new-seminar notifications
+SEMINAR_NOTIFICATION_BATCH_SIZE = int(os.getenv("SEMINAR_NOTIFICATION_BATCH_SIZE", "500"))
+# A seminar whose notifications fail to queue is retried after
+# SEMINAR_NOTIFICATION_RETRY_DELAY seconds, doubling each time, and left
+# alone after SEMINAR_NOTIFICATION_MAX_ATTEMPTS failures
+SEMINAR_NOTIFICATION_RETRY_DELAY = 60
+SEMINAR_NOTIFICATION_MAX_ATTEMPTS = 5
+
+# Outbox worker (python manage.py run_mail_worker)
+# Keep the request rate within the Brevo plan's API limit
+BREVO_RATE_LIMIT_PER_SECOND = float(os.getenv("BREVO_RATE_LIMIT_PER_SECOND", "10"))
+BREVO_RATE_LIMIT_BURST = int(os.getenv("BREVO_RATE_LIMIT_BURST", "20"))
+MAIL_WORKER_THREADS = int(os.getenv("MAIL_WORKER_THREADS", "4"))
+# Requests in flight at once for `run_mail_worker --async`
+MAIL_WORKER_CONCURRENCY = int(os.getenv("MAIL_WORKER_CONCURRENCY", "32"))
+# Shared Brevo client: keep-alive connections per process (at least one per
+# worker thread) and per-request (connect, read) timeouts in seconds
+BREVO_CONNECTION_POOL_SIZE = int(os.getenv("BREVO_CONNECTION_POOL_SIZE", str(MAIL_WORKER_THREADS)))
+BREVO_CONNECT_TIMEOUT = 5
+BREVO_READ_TIMEOUT = 30
+# Set to a local stand-in (manage.py run_brevo_standin) for load tests
+BREVO_API_HOST = os.getenv("BREVO_API_HOST") or None
+MAIL_TRANSPORT = os.getenv("MAIL_TRANSPORT", "mailer.transports.BrevoTransport")
+MAIL_WORKER_CLAIM_SIZE = 500
+MAIL_WORKER_POLL_INTERVAL = 2
+MAIL_MAX_ATTEMPTS = 6
+MAIL_RETRY_BASE_DELAY = 5
+MAIL_RETRY_MAX_DELAY = 900
+# Sent and failed outbox rows are deleted after MAIL_RETENTION_DAYS, at most
+# MAIL_PURGE_MAX_BATCHES 1000-row DELETEs every MAIL_PURGE_INTERVAL seconds
+MAIL_RETENTION_DAYS = int(os.getenv("MAIL_RETENTION_DAYS", "30"))
+MAIL_PURGE_INTERVAL = 3600
+MAIL_PURGE_MAX_BATCHES = 10
+
 REST_USE_JWT = False
 
 # Use secure cookie (only for HTTPS in production)
@@ -322,7 +476,35 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-DEFAULT_CERTIFICATE_TEMPLATE_URL = "https://res.cloudinary.com/dcoc9jepl/image/upload/v1761304008/default_certificate_h09vbq.png"
+# Overridable so benchmarks can point it at a local stand-in (mailer.standin)
+DEFAULT_CERTIFICATE_TEMPLATE_URL = os.getenv(
+    "DEFAULT_CERTIFICATE_TEMPLATE_URL",
+    "https://res.cloudinary.com/dcoc9jepl/image/upload/v1761304008/default_certificate_h09vbq.png",
+)
+
+# Threads the mail worker renders certificates on, seconds before a delivery
+# left in "rendering" (the worker was killed) is queued again, and how many
+# times one is claimed before it is marked failed
+CERTIFICATE_WORKERS = int(os.getenv("CERTIFICATE_WORKERS", "2"))
+CERTIFICATE_CLAIM_TIMEOUT = 600
+CERTIFICATE_MAX_ATTEMPTS = 3
+# Seconds to wait for a template image download
+CERTIFICATE_TEMPLATE_TIMEOUT = 30
+
+# "attachment": the PNG is attached to every certificate email
+# "link": the PNG is stored once and the email carries a signed download link
+CERTIFICATE_DELIVERY_MODE = os.getenv("CERTIFICATE_DELIVERY_MODE", "attachment")
+# Where "link" mode stores certificates: "cloudinary" or "local" (MEDIA_ROOT)
+CERTIFICATE_STORAGE = os.getenv("CERTIFICATE_STORAGE", "cloudinary")
+# How long download links stay valid, in seconds
+CERTIFICATE_LINK_MAX_AGE = 60 * 60 * 24 * 30
+
+# Upper bound on how long cross-seminar evaluation analytics stay cached
+# (entries are also keyed by data version, so new evaluations show up immediately)
+EVALUATION_ANALYTICS_CACHE_SECONDS = 600
+# Category and site-wide suggestion term totals (evaluation.keywords.top_terms)
+# are summed over every seminar's terms and cached this long
+SUGGESTION_TERMS_CACHE_SECONDS = 300
 
 
 # CLOUDINARY CONFIGURATION
@@ -19,12 +19,13 @@ from django.urls import path, include
 from django.urls import re_path
 from dj_rest_auth.registration.views import VerifyEmailView
 from django.views.generic import RedirectView
-from api.views import CurrentUserView
+from api.views import CurrentUserView, prometheus_metrics
 
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
+    path('metrics', prometheus_metrics, name='prometheus-metrics'),
     path('dj-rest-auth/', include('dj_rest_auth.urls')),
 
     path('dj-rest-auth/registration/', include('dj_rest_auth.registration.urls')),
@@ -0,0 +1,150 @@
+# evaluation/analytics.py
+"""
+Cross-seminar evaluation analytics.
+
+Works from EvaluationSummary rows (one per seminar) instead of raw
+evaluations: each row's 1-5 histograms are sufficient statistics for
+means, variances and distributions, so grouping cost depends on the
+number of seminars, not the number of evaluations.
+"""
+import math
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from seminars.models import Category, Seminar
+
+from .models import EvaluationSummary, RATING_FIELDS
+
+GROUP_BY_CHOICES = ("speaker", "category", "month")
+
+# z-score for a two-sided 95% confidence interval
+Z_95 = 1.96
+
+
+class _Group:
+    """Running 1-5 histogram per question for one group."""
+
+    def __init__(self, key):
+        self.key = key
+        self.responses = 0
+        self.seminars = 0
+        self.histograms = {field: [0] * 5 for field in RATING_FIELDS}
+
+    def add(self, total_responses, distributions):
+        self.responses += total_responses
+        self.seminars += 1
+        for field in RATING_FIELDS:
+            counts = distributions.get(field) or [0] * 5
+            hist = self.histograms[field]
+            for i in range(5):
+                hist[i] += counts[i]
+
+    def to_dict(self):
+        questions = {field: _describe(self.histograms[field]) for field in RATING_FIELDS}
+        means = [q["mean"] for q in questions.values() if q["mean"] is not None]
+        return {
+            "key": self.key,
+            "seminars": self.seminars,
+            "responses": self.responses,
+            "overall_mean": round(sum(means) / len(means), 3) if means else None,
+            "questions": questions,
+        }
+
+
+def _describe(histogram):
+    """Mean, sample std dev, 95% CI and distribution from a 1-5 histogram."""
+    n = sum(histogram)
+    distribution = {str(rating): count for rating, count in enumerate(histogram, start=1)}
+    if not n:
+        return {"n": 0, "mean": None, "std": None, "ci95": None, "distribution": distribution}
+
+    total = sum(rating * count for rating, count in enumerate(histogram, start=1))
+    total_sq = sum(rating * rating * count for rating, count in enumerate(histogram, start=1))
+    mean = total / n
+    variance = (total_sq - n * mean * mean) / (n - 1) if n > 1 else 0.0
+    std = math.sqrt(max(variance, 0.0))
+    margin = Z_95 * std / math.sqrt(n)
+
+    return {
+        "n": n,
+        "mean": round(mean, 3),
+        "std": round(std, 3),
+        "ci95": [round(mean - margin, 3), round(mean + margin, 3)],
+        "distribution": distribution,
+    }
+
+
+def _group_key(group_by, speaker, category, date_start):
+    if group_by == "speaker":
+        return (speaker or "").strip() or "Unknown"
+    if group_by == "category":
+        return category or "Uncategorized"
+    return timezone.localtime(date_start).strftime("%Y-%m")
+
+
+def data_version():
+    """
+    Changes whenever a summary, seminar or category row is created, saved or
+    deleted: groups depend on the seminars' speaker, date and category name.
+    """
+    parts = []
+    # _base_manager: Seminar.objects would run SeminarManager's UPDATE on a read
+    for queryset in (EvaluationSummary.objects, Seminar._base_manager, Category.objects):
+        state = queryset.aggregate(count=Count("id"), latest=Max("updated_at"))
+        latest = state["latest"].timestamp() if state["latest"] else 0
+        parts.append(f"{state['count']}:{latest}")
+    return "-".join(parts)
+
+
+def compute_group_stats(group_by):
+    """Group completed-evaluation statistics by speaker, category or month."""
+    if group_by not in GROUP_BY_CHOICES:
+        raise ValueError(f"group_by must be one of {', '.join(GROUP_BY_CHOICES)}")
+
+    rows = (
+        EvaluationSummary.objects.filter(total_responses__gt=0)
+        .values_list(
+            "seminar__speaker",
+            "seminar__category__name",
+            "seminar__date_start",
+            "total_responses",
+            "distributions",
+        )
+    )
+
+    groups = {}
+    overall = _Group("all")
+    for speaker, category, date_start, total_responses, distributions in rows.iterator():
+        key = _group_key(group_by, speaker, category, date_start)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = _Group(key)
+        group.add(total_responses, distributions)
+        overall.add(total_responses, distributions)
+
+    if group_by == "month":
+        # Trend: chronological order
+        ordered = sorted(groups.values(), key=lambda g: g.key)
+    else:
+        ordered = sorted(groups.values(), key=lambda g: -g.responses)
+
+    return {
+        "group_by": group_by,
+        "overall": overall.to_dict(),
+        "groups": [group.to_dict() for group in ordered],
+    }
+
+
+def get_group_stats(group_by):
+    """compute_group_stats() cached until the underlying summaries change."""
+    version = data_version()
+    cache_key = f"evaluation-analytics:{group_by}:{version}"
+    result = cache.get(cache_key)
+    if result is None:
+        result = compute_group_stats(group_by)
+        result["data_version"] = version
+        cache.set(cache_key, result, getattr(settings, "EVALUATION_ANALYTICS_CACHE_SECONDS", 600))
+    return result
@@ -0,0 +1,250 @@
+# evaluation/keywords.py
+"""
+Keyword index over Evaluation.suggestions.
+
+SuggestionTerm counts how many suggestions per seminar mention each word
+and two-word phrase; SuggestionPosting maps each term back to the
+evaluations that contain it, so keyword search never scans the raw text.
+"""
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+from .models import SNAPSHOT_UNKNOWN, Evaluation, SuggestionPosting, SuggestionTerm
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+# Keep the index small: very long comments only contribute their first terms
+MAX_TERM_LENGTH = 40
+MAX_TERMS_PER_SUGGESTION = 200
+
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been
+before being below between both but by can could did do does doing down during
+each few for from further had has have having he her here hers him his how i if
+in into is it its itself just me more most my no nor not now of off on once only
+or other our ours out over own same she should so some such than that the their
+theirs them then there these they this those through to too under until up very
+was we were what when where which while who whom why will with would you your
+yours im i'm it's its dont don't
+""".split())
+
+
+def _is_term(token):
+    return 1 < len(token) <= MAX_TERM_LENGTH and token not in STOPWORDS
+
+
+def tokenize(text):
+    """Lowercased words with stopwords and noise removed, in order."""
+    return [token for token in TOKEN_RE.findall((text or "").lower()) if _is_term(token)]
+
+
+def phrases(text):
+    """
+    Word pairs that are adjacent in text itself. Pairs are taken before
+    stopwords are dropped, and any pair with a stopword is skipped, so
+    "not clear, good slides" gives "good slides" but never "clear good".
+    """
+    tokens = TOKEN_RE.findall((text or "").lower())
+    return [
+        f"{first} {second}" for first, second in zip(tokens, tokens[1:])
+        if _is_term(first) and _is_term(second)
+    ]
+
+
+def extract_terms(text):
+    """{term: is_bigram} for the distinct words and adjacent word pairs in text."""
+    terms = {}
+    for token in tokenize(text):
+        terms.setdefault(token, False)
+    for phrase in phrases(text):
+        if len(terms) >= MAX_TERMS_PER_SUGGESTION:
+            break
+        terms.setdefault(phrase, True)
+    return dict(list(terms.items())[:MAX_TERMS_PER_SUGGESTION])
+
+
+def _add_terms(seminar_id, evaluation_id, terms):
+    if not terms:
+        return
+    # Create missing rows at 0, then increment in SQL so concurrent
+    # submissions can't overwrite each other's counts
+    SuggestionTerm.objects.bulk_create(
+        [SuggestionTerm(seminar_id=seminar_id, term=term, is_bigram=is_bigram) for term, is_bigram in terms.items()],
+        ignore_conflicts=True,
+    )
+    SuggestionTerm.objects.filter(seminar_id=seminar_id, term__in=list(terms)).update(count=F("count") + 1)
+    SuggestionPosting.objects.bulk_create(
+        [SuggestionPosting(term=term, evaluation_id=evaluation_id, seminar_id=seminar_id) for term in terms],
+        ignore_conflicts=True,
+    )
+
+
+def _remove_terms(seminar_id, evaluation_id, terms):
+    if not terms:
+        return
+    SuggestionTerm.objects.filter(seminar_id=seminar_id, term__in=list(terms)).update(count=F("count") - 1)
+    SuggestionTerm.objects.filter(seminar_id=seminar_id, term__in=list(terms), count__lte=0).delete()
+    SuggestionPosting.objects.filter(evaluation_id=evaluation_id, term__in=list(terms)).delete()
+
+
+def _indexed_terms(evaluation_id):
+    """(seminar_id, terms) the index holds for an evaluation, read back from its postings."""
+    postings = list(SuggestionPosting.objects.filter(evaluation_id=evaluation_id).values_list("seminar_id", "term"))
+    if not postings:
+        return None, {}
+    return postings[0][0], {term: " " in term for _, term in postings}
+
+
+def _stored_snapshot(evaluation_id):
+    row = Evaluation.objects.filter(pk=evaluation_id).values("seminar_id", "is_completed", "suggestions").first()
+    if row is None or not row["is_completed"] or not row["suggestions"]:
+        return None
+    return (row["seminar_id"], row["suggestions"])
+
+
+def sync_suggestion_index(evaluation_id, old_snapshot, new_snapshot):
+    """
+    Apply the change between two Evaluation.suggestions_snapshot() values.
+    SNAPSHOT_UNKNOWN (fields were deferred) is resolved from the postings
+    for the old side and from the saved row for the new one.
+    """
+    if new_snapshot is SNAPSHOT_UNKNOWN:
+        new_snapshot = _stored_snapshot(evaluation_id)
+    if old_snapshot is SNAPSHOT_UNKNOWN:
+        old_seminar, old_terms = _indexed_terms(evaluation_id)
+        old_snapshot = (old_seminar, None) if old_terms else None
+    elif old_snapshot == new_snapshot:
+        return
+    else:
+        old_seminar, old_terms = (old_snapshot[0], extract_terms(old_snapshot[1])) if old_snapshot else (None, {})
+    new_seminar, new_terms = (new_snapshot[0], extract_terms(new_snapshot[1])) if new_snapshot else (None, {})
+
+    with transaction.atomic():
+        if old_seminar == new_seminar:
+            # Only touch the terms that actually changed
+            _remove_terms(old_seminar, evaluation_id, {t: b for t, b in old_terms.items() if t not in new_terms})
+            _add_terms(new_seminar, evaluation_id, {t: b for t, b in new_terms.items() if t not in old_terms})
+        else:
+            if old_snapshot:
+                _remove_terms(old_seminar, evaluation_id, old_terms)
+            if new_snapshot:
+                _add_terms(new_seminar, evaluation_id, new_terms)
+
+
+def top_terms(seminar_id=None, category_id=None, bigrams=False, limit=20):
+    """
+    Most mentioned terms for one seminar, one category, or everything.
+    A seminar's terms come straight off the (seminar, is_bigram, -count)
+    index. Category and site-wide totals group every matching row, so they
+    are cached for SUGGESTION_TERMS_CACHE_SECONDS.
+    """
+    terms = SuggestionTerm.objects.filter(is_bigram=bigrams)
+    if seminar_id:
+        return list(
+            terms.filter(seminar_id=seminar_id)
+            .order_by("-count", "term")
+            .values("term", "count")[:limit]
+        )
+
+    # Ints, so "5" and 5 share an entry and nothing unparsed ends up in the key
+    category_id = int(category_id) if category_id else None
+    cache_key = f"suggestion-terms:{category_id or 'all'}:{int(bigrams)}:{int(limit)}"
+    result = cache.get(cache_key)
+    if result is None:
+        if category_id:
+            terms = terms.filter(seminar__category_id=category_id)
+        result = list(
+            terms.values("term")
+            .annotate(count=Sum("count"))
+            .order_by("-count", "term")[:limit]
+        )
+        cache.set(cache_key, result, getattr(settings, "SUGGESTION_TERMS_CACHE_SECONDS", 300))
+    return result
+
+
+def search_evaluations(query, seminar_id=None, category_id=None):
+    """
+    Completed evaluations whose suggestions contain every keyword in query.
+    Returns an Evaluation queryset (newest first), resolved through the postings.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return Evaluation.objects.none()
+
+    # Adjacent pairs in the query match as phrases, the other words on their own
+    pairs = set(phrases(query))
+    paired = {word for pair in pairs for word in pair.split(" ")}
+    terms = pairs | {token for token in tokens if token not in paired}
+
+    postings = SuggestionPosting.objects.filter(term__in=terms)
+    if seminar_id:
+        postings = postings.filter(seminar_id=seminar_id)
+    if category_id:
+        postings = postings.filter(seminar__category_id=category_id)
+
+    matching_ids = (
+        postings.values("evaluation_id")
+        .annotate(matched=Count("term"))
+        .filter(matched=len(terms))
+        .values("evaluation_id")
+    )
+    return Evaluation.objects.filter(id__in=matching_ids).order_by("-created_at", "-id")
+
+
+def rebuild_suggestion_index(batch_size=2000):
+    """
+    Rebuild the whole index from raw suggestions.
+    Streams evaluations one seminar at a time so memory stays bounded by a
+    single seminar's vocabulary plus one batch of postings.
+    """
+    SuggestionPosting.objects.all().delete()
+    SuggestionTerm.objects.all().delete()
+
+    evaluations = (
+        Evaluation.objects.filter(is_completed=True)
+        .exclude(suggestions="")
+        .order_by("seminar_id", "id")
+        .values_list("id", "seminar_id", "suggestions")
+    )
+
+    current_seminar = None
+    counts = {}
+    postings = []
+    indexed = 0
+
+    def flush_terms():
+        SuggestionTerm.objects.bulk_create(
+            [
+                SuggestionTerm(seminar_id=current_seminar, term=term, is_bigram=is_bigram, count=count)
+                for term, (is_bigram, count) in counts.items()
+            ],
+            batch_size=batch_size,
+        )
+        counts.clear()
+
+    for evaluation_id, seminar_id, suggestions in evaluations.iterator(chunk_size=batch_size):
+        if seminar_id != current_seminar:
+            if counts:
+                flush_terms()
+            current_seminar = seminar_id
+
+        for term, is_bigram in extract_terms(suggestions).items():
+            previous = counts.get(term)
+            counts[term] = (is_bigram, previous[1] + 1 if previous else 1)
+            postings.append(SuggestionPosting(term=term, evaluation_id=evaluation_id, seminar_id=seminar_id))
+
+        if len(postings) >= batch_size:
+            SuggestionPosting.objects.bulk_create(postings, batch_size=batch_size)
+            postings = []
+        indexed += 1
+
+    if counts:
+        flush_terms()
+    if postings:
+        SuggestionPosting.objects.bulk_create(postings, batch_size=batch_size)
+
+    return indexed
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from evaluation.keywords import rebuild_suggestion_index
+from evaluation.services import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = "Rebuild evaluation summaries and the suggestion keyword index from raw evaluations"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--skip-summaries", action="store_true")
+        parser.add_argument("--skip-keywords", action="store_true")
+
+    def handle(self, *args, **options):
+        if not options["skip_summaries"]:
+            rebuild_summaries()
+            self.stdout.write(self.style.SUCCESS("Rebuilt evaluation summaries"))
+
+        if not options["skip_keywords"]:
+            indexed = rebuild_suggestion_index(batch_size=options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"Indexed suggestions from {indexed} evaluations"))
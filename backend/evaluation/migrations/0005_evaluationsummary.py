@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluation', '0004_alter_evaluation_options_and_more'),
+        ('seminars', '0006_assign_other_category'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EvaluationSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_responses', models.PositiveIntegerField(default=0)),
+                ('totals', models.JSONField(default=dict)),
+                ('distributions', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('seminar', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='evaluation_summary', to='seminars.seminar')),
+            ],
+            options={
+                'verbose_name': 'Evaluation Summary',
+                'verbose_name_plural': 'Evaluation Summaries',
+            },
+        ),
+    ]
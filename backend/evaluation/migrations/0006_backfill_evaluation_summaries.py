@@ -0,0 +1,54 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:15
+
+from django.db import migrations
+from django.db.models import Count, Q, Sum
+
+RATING_FIELDS = [
+    "content_and_relevance",
+    "presenters_effectiveness",
+    "organization_and_structure",
+    "materials_usefulness",
+    "overall_satisfaction",
+]
+
+
+def backfill_summaries(apps, schema_editor):
+    Evaluation = apps.get_model("evaluation", "Evaluation")
+    EvaluationSummary = apps.get_model("evaluation", "EvaluationSummary")
+
+    aggregates = {"total": Count("id")}
+    for field in RATING_FIELDS:
+        aggregates[f"{field}__sum"] = Sum(field)
+        for rating in range(1, 6):
+            aggregates[f"{field}__{rating}"] = Count("id", filter=Q(**{field: rating}))
+
+    rows = (
+        Evaluation.objects.filter(is_completed=True)
+        .order_by()
+        .values("seminar_id")
+        .annotate(**aggregates)
+    )
+
+    EvaluationSummary.objects.bulk_create([
+        EvaluationSummary(
+            seminar_id=row["seminar_id"],
+            total_responses=row["total"],
+            totals={field: row[f"{field}__sum"] or 0 for field in RATING_FIELDS},
+            distributions={
+                field: [row[f"{field}__{rating}"] for rating in range(1, 6)]
+                for field in RATING_FIELDS
+            },
+        )
+        for row in rows
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluation', '0005_evaluationsummary'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop)
+    ]
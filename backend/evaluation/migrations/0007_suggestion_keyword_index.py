@@ -0,0 +1,42 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluation', '0006_backfill_evaluation_summaries'),
+        ('seminars', '0006_assign_other_category'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SuggestionPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=100)),
+                ('evaluation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='suggestion_postings', to='evaluation.evaluation')),
+                ('seminar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='seminars.seminar')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['term', 'seminar'], name='evaluation__term_04bf78_idx')],
+                'unique_together': {('term', 'evaluation')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SuggestionTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=100)),
+                ('is_bigram', models.BooleanField(default=False)),
+                ('count', models.IntegerField(default=0)),
+                ('seminar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='suggestion_terms', to='seminars.seminar')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['seminar', 'is_bigram', '-count'], name='evaluation__seminar_87ce0e_idx')],
+                'unique_together': {('seminar', 'term')},
+            },
+        ),
+    ]
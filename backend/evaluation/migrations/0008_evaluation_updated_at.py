@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluation', '0007_suggestion_keyword_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evaluation',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.6 on 2026-10-20 09:12
+
+from django.db import migrations
+
+# Pure text processing, shared with the signals so the backfill and live
+# updates index suggestions the same way
+from evaluation.keywords import extract_terms
+
+
+def rebuild_suggestion_index(apps, schema_editor):
+    """
+    Index every completed evaluation's suggestions: those completed before
+    0007 were never indexed, and earlier rows hold phrases joined across
+    removed stopwords.
+    """
+    Evaluation = apps.get_model("evaluation", "Evaluation")
+    SuggestionTerm = apps.get_model("evaluation", "SuggestionTerm")
+    SuggestionPosting = apps.get_model("evaluation", "SuggestionPosting")
+
+    SuggestionPosting.objects.all().delete()
+    SuggestionTerm.objects.all().delete()
+
+    evaluations = (
+        Evaluation.objects.filter(is_completed=True)
+        .exclude(suggestions="")
+        .order_by("seminar_id", "id")
+        .values_list("id", "seminar_id", "suggestions")
+    )
+
+    current_seminar = None
+    counts = {}
+    postings = []
+
+    def flush_terms():
+        SuggestionTerm.objects.bulk_create(
+            [
+                SuggestionTerm(seminar_id=current_seminar, term=term, is_bigram=is_bigram, count=count)
+                for term, (is_bigram, count) in counts.items()
+            ],
+            batch_size=2000,
+        )
+        counts.clear()
+
+    for evaluation_id, seminar_id, suggestions in evaluations.iterator(chunk_size=2000):
+        if seminar_id != current_seminar:
+            if counts:
+                flush_terms()
+            current_seminar = seminar_id
+
+        for term, is_bigram in extract_terms(suggestions).items():
+            previous = counts.get(term)
+            counts[term] = (is_bigram, previous[1] + 1 if previous else 1)
+            postings.append(SuggestionPosting(term=term, evaluation_id=evaluation_id, seminar_id=seminar_id))
+
+        if len(postings) >= 2000:
+            SuggestionPosting.objects.bulk_create(postings)
+            postings = []
+
+    if counts:
+        flush_terms()
+    SuggestionPosting.objects.bulk_create(postings)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluation', '0008_evaluation_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_suggestion_index, migrations.RunPython.noop)
+    ]
@@ -3,6 +3,22 @@ from django.conf import settings
 
 User = settings.AUTH_USER_MODEL
 
+# Rating questions, in the order they appear on the evaluation form
+RATING_FIELDS = [
+    "content_and_relevance",
+    "presenters_effectiveness",
+    "organization_and_structure",
+    "materials_usefulness",
+    "overall_satisfaction",
+]
+
+# Stands in for a snapshot whose fields were deferred (.only()/.defer());
+# the signals then recount from the database instead of diffing
+SNAPSHOT_UNKNOWN = object()
+SUMMARY_FIELDS = frozenset(["seminar_id", "is_completed", *RATING_FIELDS])
+SUGGESTIONS_FIELDS = frozenset(["seminar_id", "is_completed", "suggestions"])
+
+
 class Evaluation(models.Model):
     RATING_CHOICES = [(i, str(i)) for i in range(1, 6)]  # 1..5
 
@@ -22,6 +38,7 @@ class Evaluation(models.Model):
     # Completion flag and timestamp
     is_completed = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ("seminar", "user")
@@ -29,3 +46,122 @@ class Evaluation(models.Model):
 
     def __str__(self):
         return f"Evaluation: {self.user} — {self.seminar} (completed={self.is_completed})"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what this row contributed to the summary and keyword index
+        # when it was loaded, so signals can apply the difference after an
+        # edit or delete.
+        instance.take_snapshots()
+        return instance
+
+    def take_snapshots(self):
+        self._summary_snapshot = self.current_summary_snapshot()
+        self._suggestions_snapshot = self.current_suggestions_snapshot()
+        self._loaded_seminar_id = self.__dict__.get("seminar_id")
+
+    # SNAPSHOT_UNKNOWN when a field is deferred: reading it would cost a query per field per row
+    def current_summary_snapshot(self):
+        return SNAPSHOT_UNKNOWN if SUMMARY_FIELDS & self.get_deferred_fields() else self.summary_snapshot()
+
+    def current_suggestions_snapshot(self):
+        return SNAPSHOT_UNKNOWN if SUGGESTIONS_FIELDS & self.get_deferred_fields() else self.suggestions_snapshot()
+
+    def summary_snapshot(self):
+        """(seminar_id, ratings) if this evaluation counts towards the summary, else None."""
+        if not self.is_completed:
+            return None
+        ratings = tuple(getattr(self, field, None) for field in RATING_FIELDS)
+        if any(r is None for r in ratings):
+            return None
+        return (self.seminar_id, ratings)
+
+    def suggestions_snapshot(self):
+        """(seminar_id, suggestions) if this evaluation belongs in the keyword index, else None."""
+        if not self.is_completed or not self.suggestions:
+            return None
+        return (self.seminar_id, self.suggestions)
+
+
+class EvaluationSummary(models.Model):
+    """
+    Per-seminar rollup of completed evaluations.
+    Updated incrementally by evaluation.signals so analytics never scan raw rows.
+    """
+    seminar = models.OneToOneField(
+        "seminars.Seminar",
+        on_delete=models.CASCADE,
+        related_name="evaluation_summary"
+    )
+    total_responses = models.PositiveIntegerField(default=0)
+
+    # {question: sum of ratings}
+    totals = models.JSONField(default=dict)
+    # {question: [count of 1s, 2s, 3s, 4s, 5s]}
+    distributions = models.JSONField(default=dict)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Evaluation Summary"
+        verbose_name_plural = "Evaluation Summaries"
+
+    def __str__(self):
+        return f"Evaluation summary for seminar {self.seminar_id} ({self.total_responses} responses)"
+
+    def get_averages(self):
+        """Average rating per question, keyed like the old Avg() aggregate."""
+        return {
+            f"avg_{field}": (
+                self.totals.get(field, 0) / self.total_responses
+                if self.total_responses else None
+            )
+            for field in RATING_FIELDS
+        }
+
+    def get_distributions(self):
+        """Count of each 1-5 rating per question."""
+        return {
+            field: {
+                str(rating): count
+                for rating, count in enumerate(self.distributions.get(field, [0] * 5), start=1)
+            }
+            for field in RATING_FIELDS
+        }
+
+
+class SuggestionTerm(models.Model):
+    """
+    How many completed evaluations of a seminar mention a word or two-word phrase
+    in their suggestions. Category totals are summed from these rows.
+    """
+    seminar = models.ForeignKey("seminars.Seminar", on_delete=models.CASCADE, related_name="suggestion_terms")
+    term = models.CharField(max_length=100)
+    is_bigram = models.BooleanField(default=False)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("seminar", "term")
+        indexes = [
+            models.Index(fields=["seminar", "is_bigram", "-count"]),
+        ]
+
+    def __str__(self):
+        return f"{self.term} ({self.count}) — seminar {self.seminar_id}"
+
+
+class SuggestionPosting(models.Model):
+    """Inverted index entry: this evaluation's suggestions contain this term."""
+    term = models.CharField(max_length=100)
+    evaluation = models.ForeignKey(Evaluation, on_delete=models.CASCADE, related_name="suggestion_postings")
+    seminar = models.ForeignKey("seminars.Seminar", on_delete=models.CASCADE, related_name="+")
+
+    class Meta:
+        unique_together = ("term", "evaluation")
+        indexes = [
+            models.Index(fields=["term", "seminar"]),
+        ]
+
+    def __str__(self):
+        return f"{self.term} -> evaluation {self.evaluation_id}"
@@ -3,14 +3,27 @@ from .models import Evaluation
 from seminars.serializers import SeminarSerializer
 from users.serializers import UserSerializer
 from seminars.models import Seminar
+from django.db.models import OuterRef, Q, Subquery
+
+from certificates.links import certificate_download_url, get_stored_certificate
 from certificates.models import Certificate
 
 
+def stored_certificate_id():
+    """Annotation: id of the evaluator's hosted certificate for the seminar, or NULL."""
+    return Subquery(
+        Certificate.objects.filter(user=OuterRef("user_id"), seminar=OuterRef("seminar_id"))
+        .filter(Q(file_path__gt="") | Q(file__isnull=False))
+        .values("id")[:1]
+    )
+
+
 class EvaluationSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     seminar = SeminarSerializer(read_only=True)
     seminar_id = serializers.PrimaryKeyRelatedField(
-        queryset=Seminar.objects.all(),
+        # _base_manager: Seminar.objects runs SeminarManager's UPDATE, here at import time
+        queryset=Seminar._base_manager.all(),
         write_only=True,
         source="seminar"
     )
@@ -36,9 +49,14 @@ class EvaluationSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "user", "seminar", "created_at", "certificate_url"]
 
     def get_certificate_url(self, obj):
-        """Return the Cloudinary certificate URL if it exists."""
-        cert = Certificate.objects.filter(user=obj.user, seminar=obj.seminar).first()
-        return cert.file if cert else None
+        """Signed download link for the hosted certificate, if one was stored."""
+        if hasattr(obj, "stored_certificate_id"):
+            # Annotated by EvaluationViewSet, so lists don't query per row
+            certificate_id = obj.stored_certificate_id
+        else:
+            certificate = get_stored_certificate(obj.seminar_id, obj.user_id)
+            certificate_id = certificate.pk if certificate else None
+        return certificate_download_url(certificate_id) if certificate_id else None
 
     def validate(self, attrs):
         """Ensure all rating fields are between 1 and 5."""
@@ -61,3 +79,23 @@ class EvaluationSerializer(serializers.ModelSerializer):
         request = self.context.get("request")
         validated_data["user"] = request.user
         return super().create(validated_data)
+
+
+class EvaluationResponseSerializer(serializers.ModelSerializer):
+    """Lean read-only row for analytics: evaluator + answers, no nested seminar."""
+    user = UserSerializer(read_only=True)
+
+    class Meta:
+        model = Evaluation
+        fields = [
+            "id",
+            "user",
+            "content_and_relevance",
+            "presenters_effectiveness",
+            "organization_and_structure",
+            "materials_usefulness",
+            "overall_satisfaction",
+            "suggestions",
+            "created_at",
+        ]
+        read_only_fields = fields
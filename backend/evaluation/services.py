@@ -0,0 +1,95 @@
+# evaluation/services.py
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from .models import Evaluation, EvaluationSummary, RATING_FIELDS, SNAPSHOT_UNKNOWN
+
+
+def _empty_distributions():
+    return {field: [0, 0, 0, 0, 0] for field in RATING_FIELDS}
+
+
+def apply_to_summary(seminar_id, ratings, sign=1):
+    """
+    Add (sign=1) or remove (sign=-1) one evaluation's ratings from the
+    seminar's summary row. The row is locked so concurrent submits can't
+    lose an update.
+    """
+    with transaction.atomic():
+        summaries = EvaluationSummary.objects.select_for_update()
+        if sign > 0:
+            summary, _ = summaries.get_or_create(
+                seminar_id=seminar_id,
+                defaults={"distributions": _empty_distributions()},
+            )
+        else:
+            # Nothing to remove from (e.g. the seminar itself is being deleted)
+            summary = summaries.filter(seminar_id=seminar_id).first()
+            if summary is None:
+                return
+
+        distributions = summary.distributions or _empty_distributions()
+        totals = summary.totals or {}
+
+        for field, rating in zip(RATING_FIELDS, ratings):
+            totals[field] = totals.get(field, 0) + sign * rating
+            counts = distributions.setdefault(field, [0, 0, 0, 0, 0])
+            counts[rating - 1] += sign
+
+        summary.total_responses = max(summary.total_responses + sign, 0)
+        summary.totals = totals
+        summary.distributions = distributions
+        summary.save(update_fields=["total_responses", "totals", "distributions", "updated_at"])
+
+
+def sync_summary(old_snapshot, new_snapshot, seminar_ids=()):
+    """
+    Apply the change between two Evaluation.summary_snapshot() values. If
+    either is SNAPSHOT_UNKNOWN, recount seminar_ids from the raw rows instead.
+    """
+    if SNAPSHOT_UNKNOWN in (old_snapshot, new_snapshot):
+        rebuild_summaries(seminar_ids)
+        return
+    if old_snapshot == new_snapshot:
+        return
+    if old_snapshot:
+        apply_to_summary(*old_snapshot, sign=-1)
+    if new_snapshot:
+        apply_to_summary(*new_snapshot, sign=1)
+
+
+def rebuild_summaries(seminar_ids=None):
+    """
+    Recompute summaries from the raw evaluations in one grouped query.
+    Use after bulk imports or .update() calls, which bypass the signals.
+    """
+    evaluations = Evaluation.objects.filter(is_completed=True)
+    if seminar_ids is not None:
+        evaluations = evaluations.filter(seminar_id__in=seminar_ids)
+
+    aggregates = {"total": Count("id")}
+    for field in RATING_FIELDS:
+        aggregates[f"{field}__sum"] = Sum(field)
+        for rating in range(1, 6):
+            aggregates[f"{field}__{rating}"] = Count("id", filter=Q(**{field: rating}))
+
+    rows = evaluations.order_by().values("seminar_id").annotate(**aggregates)
+
+    with transaction.atomic():
+        stale = EvaluationSummary.objects.all()
+        if seminar_ids is not None:
+            stale = stale.filter(seminar_id__in=seminar_ids)
+        stale.delete()
+
+        EvaluationSummary.objects.bulk_create([
+            EvaluationSummary(
+                seminar_id=row["seminar_id"],
+                total_responses=row["total"],
+                totals={field: row[f"{field}__sum"] or 0 for field in RATING_FIELDS},
+                distributions={
+                    field: [row[f"{field}__{rating}"] for rating in range(1, 6)]
+                    for field in RATING_FIELDS
+                },
+            )
+            for row in rows
+        ])
@@ -13,9 +13,11 @@
 #         pass
 
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, pre_delete
 from django.dispatch import receiver
-from .models import Evaluation
+from .models import SNAPSHOT_UNKNOWN, SUGGESTIONS_FIELDS, SUMMARY_FIELDS, Evaluation
+from .services import sync_summary
+from .keywords import sync_suggestion_index
 from seminars.models import PlannedSeminar
 
 @receiver(post_save, sender=Evaluation)
@@ -28,3 +30,44 @@ def evaluation_post_save(sender, instance: Evaluation, created, **kwargs):
 
         # (Optional) trigger certificate generation, email, etc.
         # generate_and_email_certificate.delay(instance.seminar.id, instance.user.id)
+
+
+@receiver(post_save, sender=Evaluation)
+def update_evaluation_summary(sender, instance: Evaluation, created, **kwargs):
+    """
+    Keep the seminar's EvaluationSummary in step with this evaluation.
+    Handles first completion as well as later edits to a completed evaluation.
+    """
+    new_snapshot = instance.current_summary_snapshot()
+    seminar_ids = {getattr(instance, "_loaded_seminar_id", None), instance.seminar_id} - {None}
+    sync_summary(getattr(instance, "_summary_snapshot", None), new_snapshot, seminar_ids)
+    instance._summary_snapshot = new_snapshot
+    instance._loaded_seminar_id = instance.seminar_id
+
+
+@receiver(post_save, sender=Evaluation)
+def update_suggestion_index(sender, instance: Evaluation, created, **kwargs):
+    """Re-index the suggestion terms that changed since the evaluation was loaded."""
+    new_snapshot = instance.current_suggestions_snapshot()
+    sync_suggestion_index(instance.id, getattr(instance, "_suggestions_snapshot", None), new_snapshot)
+    instance._suggestions_snapshot = new_snapshot
+
+
+@receiver(pre_delete, sender=Evaluation)
+def snapshot_before_delete(sender, instance: Evaluation, **kwargs):
+    """
+    An instance loaded with deferred fields has unknown snapshots; read them
+    now, while its postings still say what it contributed to the index.
+    """
+    snapshots = (getattr(instance, "_summary_snapshot", None), getattr(instance, "_suggestions_snapshot", None))
+    if SNAPSHOT_UNKNOWN in snapshots:
+        instance.refresh_from_db(fields=sorted((SUMMARY_FIELDS | SUGGESTIONS_FIELDS) & instance.get_deferred_fields()))
+        instance.take_snapshots()
+
+
+@receiver(post_delete, sender=Evaluation)
+def evaluation_post_delete(sender, instance: Evaluation, **kwargs):
+    """Take a deleted evaluation back out of the summary and keyword index."""
+    seminar_ids = {getattr(instance, "_loaded_seminar_id", None), instance.seminar_id} - {None}
+    sync_summary(getattr(instance, "_summary_snapshot", None), None, seminar_ids)
+    sync_suggestion_index(instance.id, getattr(instance, "_suggestions_snapshot", None), None)
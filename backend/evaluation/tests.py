@@ -1,3 +1,338 @@
+# evaluation/tests.py
+from datetime import timedelta
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.testing import QueryBudgetTestCase
+from attendance.models import Attendance
+from evaluation.keywords import extract_terms, rebuild_suggestion_index, search_evaluations, top_terms
+from evaluation.models import RATING_FIELDS, Evaluation, EvaluationSummary, SuggestionPosting, SuggestionTerm
+from evaluation.services import rebuild_summaries
+from seminars.models import Category, Seminar
+from users.models import CustomUser
+
+
+class EvaluationRouteBudgetTests(QueryBudgetTestCase):
+
+    def test_evaluation_list(self):
+        self.assertBudget("GET", "/api/evaluations/", 1, user=self.data.participant)
+
+    def test_evaluation_detail(self):
+        evaluation = self.data.participant.evaluations.first()
+        self.assertBudget("GET", f"/api/evaluations/{evaluation.id}/", 1, user=self.data.participant)
+
+    def test_available_evaluations(self):
+        self.assertBudget("GET", "/api/evaluations/available-evaluations/", 2, user=self.data.participant)
+
+    def test_seminar_analytics(self):
+        seminar = self.data.finished[0]
+        self.assertBudget("GET", f"/api/evaluations/seminar/{seminar.id}/analytics/", 3, user=self.data.admin)
+
+    def test_analytics(self):
+        # Cached: only the data version (summaries, seminars, categories) is read
+        self.assertBudget("GET", "/api/evaluations/analytics/?group_by=speaker", 3, user=self.data.admin)
+
+    def test_suggestion_terms(self):
+        self.assertBudget("GET", "/api/evaluations/suggestions/terms/", 1, user=self.data.admin)
+
+    def test_suggestion_search(self):
+        self.assertBudget("GET", "/api/evaluations/suggestions/search/?q=session", 2, user=self.data.admin)
+
+    def test_submit_evaluation(self):
+        participant = self.data.participant
+        attended = set(participant.attendances.values_list("seminar_id", flat=True))
+        seminar = next(s for s in self.data.finished if s.id not in attended)
+        Attendance.objects.create(user=participant, seminar=seminar, check_in=seminar.date_start,
+                                  check_out=seminar.date_end, is_present=True)
+        self.assertBudget("POST", "/api/evaluations/", 18, user=participant, status=201, data={
+            "seminar_id": seminar.id, "suggestions": "Clear and useful",
+            **{field: 4 for field in RATING_FIELDS},
+        })
+
+
+class AnalyticsCacheTests(QueryBudgetTestCase):
+    """Cached cross-seminar analytics are recomputed when a seminar or category changes."""
+    seed_kwargs = {"participants": 4, "seminars": 6, "attendances_per_user": 3, "plans_per_user": 1}
+
+    def group_keys(self, group_by):
+        client = APIClient()
+        client.force_authenticate(self.data.admin)
+        response = client.get(f"/api/evaluations/analytics/?group_by={group_by}")
+        return {group["key"] for group in response.data["groups"]}
+
+    def evaluated_seminar(self):
+        return Seminar._base_manager.filter(
+            evaluation_summary__total_responses__gt=0, category__isnull=False,
+        ).first()
+
+    def test_speaker_change(self):
+        seminar = self.evaluated_seminar()
+        self.group_keys("speaker")
+        seminar.speaker = "Someone New"
+        seminar.save()
+        self.assertIn("Someone New", self.group_keys("speaker"))
+
+    def test_category_rename(self):
+        category = self.evaluated_seminar().category
+        self.group_keys("category")
+        category.name = "Renamed"
+        category.save()
+        self.assertIn("Renamed", self.group_keys("category"))
+
+
+class EvaluationSignalTestCase(TestCase):
+    """Two finished seminars and three participants to evaluate them."""
+
+    @classmethod
+    def setUpTestData(cls):
+        start = timezone.now() - timedelta(days=2)
+        category = Category.objects.create(name="Science")
+        cls.seminars = [
+            Seminar.objects.create(title=f"Seminar {i}", date_start=start, date_end=start + timedelta(hours=2),
+                                   category=category)
+            for i in range(2)
+        ]
+        cls.users = [
+            CustomUser.objects.create_user(f"rater{i}", f"rater{i}@example.com", "Passw0rd!") for i in range(3)
+        ]
+
+    def evaluate(self, user, seminar, rating=4, is_completed=True, suggestions=""):
+        return Evaluation.objects.create(
+            user=user, seminar=seminar, is_completed=is_completed, suggestions=suggestions,
+            **{field: rating for field in RATING_FIELDS}
+        )
+
+
+class EvaluationSummarySignalTests(EvaluationSignalTestCase):
+    """The incrementally kept summaries match what rebuild_summaries() computes from the raw rows."""
+
+    def summaries(self):
+        # Rows emptied by the signals stay behind with zero responses; a rebuild drops them
+        return {
+            s.seminar_id: (s.total_responses, s.totals, s.distributions)
+            for s in EvaluationSummary.objects.all()
+            if s.total_responses
+        }
+
+    def assertMatchesRebuild(self):
+        incremental = self.summaries()
+        rebuild_summaries()
+        self.assertEqual(incremental, self.summaries())
+
+    def test_create(self):
+        for i, user in enumerate(self.users):
+            self.evaluate(user, self.seminars[0], rating=i + 2)
+        self.evaluate(self.users[0], self.seminars[1], rating=5)
+        self.evaluate(self.users[1], self.seminars[1], rating=1, is_completed=False)
+
+        summary = EvaluationSummary.objects.get(seminar=self.seminars[0])
+        self.assertEqual(summary.total_responses, 3)
+        self.assertEqual(summary.distributions["overall_satisfaction"], [0, 1, 1, 1, 0])
+        self.assertEqual(EvaluationSummary.objects.get(seminar=self.seminars[1]).total_responses, 1)
+        self.assertMatchesRebuild()
+
+    def test_edit(self):
+        self.evaluate(self.users[0], self.seminars[0], rating=3)
+        evaluation = Evaluation.objects.get(user=self.users[0])
+        evaluation.overall_satisfaction = 5
+        evaluation.save()
+        # Edited again through the same instance
+        evaluation.content_and_relevance = 1
+        evaluation.save()
+
+        summary = EvaluationSummary.objects.get(seminar=self.seminars[0])
+        self.assertEqual(summary.total_responses, 1)
+        self.assertEqual(summary.totals["overall_satisfaction"], 5)
+        self.assertEqual(summary.distributions["content_and_relevance"], [1, 0, 0, 0, 0])
+        self.assertMatchesRebuild()
+
+    def test_complete_and_uncomplete(self):
+        draft = self.evaluate(self.users[0], self.seminars[0], rating=4, is_completed=False)
+        self.assertFalse(self.summaries())
+        draft.is_completed = True
+        draft.save()
+        self.assertEqual(EvaluationSummary.objects.get(seminar=self.seminars[0]).total_responses, 1)
+
+        self.evaluate(self.users[1], self.seminars[0], rating=2)
+        evaluation = Evaluation.objects.get(pk=draft.pk)
+        evaluation.is_completed = False
+        evaluation.save()
+
+        summary = EvaluationSummary.objects.get(seminar=self.seminars[0])
+        self.assertEqual((summary.total_responses, summary.totals["overall_satisfaction"]), (1, 2))
+        self.assertMatchesRebuild()
+
+    def test_delete(self):
+        for i, user in enumerate(self.users):
+            self.evaluate(user, self.seminars[0], rating=i + 1)
+        Evaluation.objects.get(user=self.users[2]).delete()
+        self.evaluate(self.users[0], self.seminars[1], rating=3).delete()
+
+        summary = EvaluationSummary.objects.get(seminar=self.seminars[0])
+        self.assertEqual(summary.total_responses, 2)
+        self.assertEqual(summary.distributions["overall_satisfaction"], [1, 1, 0, 0, 0])
+        self.assertEqual(EvaluationSummary.objects.get(seminar=self.seminars[1]).total_responses, 0)
+        self.assertMatchesRebuild()
+
+    def test_seminar_move(self):
+        evaluation = self.evaluate(self.users[0], self.seminars[0], rating=4)
+        evaluation.seminar = self.seminars[1]
+        evaluation.save()
+
+        self.assertEqual(EvaluationSummary.objects.get(seminar=self.seminars[0]).total_responses, 0)
+        self.assertEqual(EvaluationSummary.objects.get(seminar=self.seminars[1]).total_responses, 1)
+        self.assertMatchesRebuild()
+
+
+class DeferredEvaluationTests(EvaluationSignalTestCase):
+    """Rows loaded with .only()/.defer() aren't snapshotted on load, and their saves still keep both rollups right."""
+
+    def setUp(self):
+        self.evaluate(self.users[0], self.seminars[0], rating=2, suggestions="good slides")
+        self.evaluate(self.users[1], self.seminars[0], rating=5, suggestions="good pacing")
+
+    def rollups(self):
+        summaries = {
+            s.seminar_id: (s.total_responses, s.totals, s.distributions)
+            for s in EvaluationSummary.objects.all()
+            if s.total_responses
+        }
+        terms = {(t.seminar_id, t.term): t.count for t in SuggestionTerm.objects.all()}
+        return summaries, terms, set(SuggestionPosting.objects.values_list("term", "evaluation_id"))
+
+    def assertMatchesRebuild(self):
+        incremental = self.rollups()
+        rebuild_summaries()
+        rebuild_suggestion_index()
+        self.assertEqual(incremental, self.rollups())
+
+    def test_load_reads_no_deferred_fields(self):
+        with self.assertNumQueries(1):
+            evaluations = list(Evaluation.objects.only("id", "user_id"))
+        self.assertEqual(len(evaluations), 2)
+
+    def test_edit(self):
+        evaluation = Evaluation.objects.only("id", "is_completed").get(user=self.users[0])
+        evaluation.is_completed = False
+        evaluation.save()
+        self.assertFalse(SuggestionPosting.objects.filter(evaluation=evaluation).exists())
+        self.assertEqual(EvaluationSummary.objects.get(seminar=self.seminars[0]).total_responses, 1)
+        self.assertMatchesRebuild()
+
+    def test_edit_other_fields(self):
+        evaluation = Evaluation.objects.defer("suggestions").get(user=self.users[1])
+        evaluation.overall_satisfaction = 1
+        evaluation.seminar = self.seminars[1]
+        evaluation.save()
+        self.assertEqual(
+            set(SuggestionTerm.objects.filter(term="good").values_list("seminar_id", "count")),
+            {(self.seminars[0].id, 1), (self.seminars[1].id, 1)},
+        )
+        self.assertMatchesRebuild()
+
+    def test_delete(self):
+        Evaluation.objects.only("id", "user_id").get(user=self.users[0]).delete()
+        self.assertEqual(dict(SuggestionTerm.objects.values_list("term", "count")), {"good": 1, "pacing": 1,
+                                                                                      "good pacing": 1})
+        self.assertMatchesRebuild()
+
+
+class SuggestionIndexTests(EvaluationSignalTestCase):
+    """The keyword index follows evaluation saves and deletes, and matches a full rebuild."""
+
+    def setUp(self):
+        cache.clear()
+
+    def index(self):
+        terms = {(t.seminar_id, t.term): (t.is_bigram, t.count) for t in SuggestionTerm.objects.all()}
+        postings = set(SuggestionPosting.objects.values_list("term", "evaluation_id"))
+        return terms, postings
+
+    def assertMatchesRebuild(self):
+        incremental = self.index()
+        rebuild_suggestion_index()
+        self.assertEqual(incremental, self.index())
+
+    def test_phrases_skip_stopwords(self):
+        terms = extract_terms("Not clear, but good slides!")
+        self.assertEqual({t for t, is_bigram in terms.items() if is_bigram}, {"good slides"})
+        self.assertEqual({t for t, is_bigram in terms.items() if not is_bigram}, {"clear", "good", "slides"})
+
+    def test_create(self):
+        seminar = self.seminars[0]
+        first = self.evaluate(self.users[0], seminar, suggestions="Good slides, more examples")
+        self.evaluate(self.users[1], seminar, suggestions="good slides")
+        self.evaluate(self.users[2], seminar, is_completed=False, suggestions="good slides")
+
+        self.assertEqual(SuggestionTerm.objects.get(seminar=seminar, term="good slides").count, 2)
+        self.assertTrue(SuggestionPosting.objects.filter(evaluation=first, term="examples").exists())
+        self.assertEqual(list(search_evaluations("good slides")), list(Evaluation.objects.filter(
+            user__in=self.users[:2]).order_by("-created_at", "-id")))
+        self.assertMatchesRebuild()
+
+    def test_edit(self):
+        evaluation = self.evaluate(self.users[0], self.seminars[0], suggestions="good slides")
+        self.evaluate(self.users[1], self.seminars[0], suggestions="good pacing")
+        evaluation = Evaluation.objects.get(pk=evaluation.pk)
+        evaluation.suggestions = "good pacing, longer breaks"
+        evaluation.save()
+
+        terms = dict(SuggestionTerm.objects.values_list("term", "count"))
+        self.assertNotIn("slides", terms)
+        self.assertEqual((terms["good"], terms["good pacing"], terms["breaks"]), (2, 2, 1))
+        self.assertMatchesRebuild()
+
+    def test_uncomplete_and_delete(self):
+        evaluation = self.evaluate(self.users[0], self.seminars[0], suggestions="good slides")
+        kept = self.evaluate(self.users[1], self.seminars[0], suggestions="slides")
+        evaluation.is_completed = False
+        evaluation.save()
+        self.assertFalse(SuggestionPosting.objects.filter(evaluation=evaluation).exists())
+        self.assertEqual(dict(SuggestionTerm.objects.values_list("term", "count")), {"slides": 1})
+
+        Evaluation.objects.get(pk=kept.pk).delete()
+        self.assertFalse(SuggestionTerm.objects.exists())
+        self.assertFalse(SuggestionPosting.objects.exists())
+        self.assertMatchesRebuild()
+
+    def test_seminar_move(self):
+        evaluation = self.evaluate(self.users[0], self.seminars[0], suggestions="good slides")
+        evaluation.seminar = self.seminars[1]
+        evaluation.save()
+        self.assertEqual(set(SuggestionTerm.objects.values_list("seminar_id", flat=True)), {self.seminars[1].id})
+        self.assertMatchesRebuild()
+
+    def test_top_terms_cached_without_seminar(self):
+        self.evaluate(self.users[0], self.seminars[0], suggestions="good slides")
+        self.evaluate(self.users[1], self.seminars[1], suggestions="good pacing")
+        category_id = self.seminars[0].category_id
+
+        self.assertEqual(top_terms(limit=1), [{"term": "good", "count": 2}])
+        self.assertEqual(top_terms(category_id=category_id, bigrams=True),
+                         [{"term": "good pacing", "count": 1}, {"term": "good slides", "count": 1}])
+        with self.assertNumQueries(0):
+            top_terms(limit=1)
+            top_terms(category_id=category_id, bigrams=True)
+        with self.assertNumQueries(1):
+            top_terms(seminar_id=self.seminars[0].id)
+
+    def test_suggestion_endpoints_reject_bad_parameters(self):
+        admin = CustomUser.objects.create_user("boss", "boss@example.com", "Passw0rd!", role="admin")
+        client = APIClient()
+        client.force_authenticate(admin)
+        self.evaluate(self.users[0], self.seminars[0], suggestions="good slides")
+
+        for query in ("category_id=abc", "seminar_id=abc", "limit=x"):
+            self.assertEqual(client.get(f"/api/evaluations/suggestions/terms/?{query}").status_code, 400, query)
+            if query != "limit=x":
+                response = client.get(f"/api/evaluations/suggestions/search/?q=slides&{query}")
+                self.assertEqual(response.status_code, 400, query)
 
-# Create your tests here.
+        response = client.get("/api/evaluations/suggestions/terms/?limit=-1")
+        self.assertEqual(response.json()["terms"], [{"term": "good", "count": 1}])
+        category_id = self.seminars[0].category_id
+        response = client.get(f"/api/evaluations/suggestions/terms/?category_id={category_id}&limit=500")
+        self.assertEqual(len(response.json()["terms"]), 2)
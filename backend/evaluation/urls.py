@@ -1,7 +1,10 @@
 # backend/evaluation/urls.py
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import EvaluationViewSet, AvailableEvaluationsAPIView, SeminarEvaluationAnalyticsAPIView
+from .views import (
+    EvaluationViewSet, AvailableEvaluationsAPIView, SeminarEvaluationAnalyticsAPIView, EvaluationAnalyticsAPIView,
+    SuggestionTermsAPIView, SuggestionSearchAPIView,
+)
 
 router = DefaultRouter()
 router.register(r'', EvaluationViewSet, basename='evaluation')
@@ -9,5 +12,8 @@ router.register(r'', EvaluationViewSet, basename='evaluation')
 urlpatterns = [
     path('available-evaluations/', AvailableEvaluationsAPIView.as_view(), name='available-evaluations'),
     path('seminar/<int:seminar_id>/analytics/', SeminarEvaluationAnalyticsAPIView.as_view(), name='seminar-evaluation-analytics'),
+    path('analytics/', EvaluationAnalyticsAPIView.as_view(), name='evaluation-analytics'),
+    path('suggestions/terms/', SuggestionTermsAPIView.as_view(), name='suggestion-terms'),
+    path('suggestions/search/', SuggestionSearchAPIView.as_view(), name='suggestion-search'),
     path('', include(router.urls)),
 ]
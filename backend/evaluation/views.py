@@ -5,15 +5,31 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
 from rest_framework.decorators import action
+from rest_framework.pagination import PageNumberPagination
 
 from attendance.models import Attendance
-from .models import Evaluation
-from .serializers import EvaluationSerializer
-from certificates.utils import generate_certificate
+from .models import Evaluation, EvaluationSummary, RATING_FIELDS
+from .serializers import EvaluationSerializer, EvaluationResponseSerializer, stored_certificate_id
+from .analytics import GROUP_BY_CHOICES, get_group_stats
+from .keywords import search_evaluations, top_terms
+from api.conditional import conditional_get, seminar_catalog, seminar_rows
+from api.replica import use_replica
+from certificates.serializers import CertificateDeliverySerializer
+from certificates.tasks import enqueue_certificate
 from seminars.serializers import SeminarSerializer
 from seminars.models import Seminar
 from users.serializers import UserSerializer
-from django.db.models import Avg
+from django.db.models import F, FilteredRelation, Q
+
+
+def available_sources(view, request):
+    attended = Attendance.objects.filter(user=request.user, is_present=True)
+    return [
+        attended,
+        Evaluation.objects.filter(user=request.user),
+        seminar_rows().filter(pk__in=attended.values("seminar_id")),
+        *seminar_catalog(),
+    ]
 
 
 class EvaluationViewSet(viewsets.ModelViewSet):
@@ -21,7 +37,11 @@ class EvaluationViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Evaluation.objects.filter(user=self.request.user).select_related("seminar")
+        return (
+            Evaluation.objects.filter(user=self.request.user)
+            .select_related("user", "seminar__category", "seminar__certificate_template")
+            .annotate(stored_certificate_id=stored_certificate_id())
+        )
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data, context={"request": request})
@@ -45,56 +65,68 @@ class EvaluationViewSet(viewsets.ModelViewSet):
                 existing_eval.is_completed = True
                 existing_eval.save()
 
-                # ✅ Generate certificate (returns base64 data URL)
-                certificate_url = generate_certificate(attendance)
+                # ✅ Certificate is rendered and emailed in the background
+                delivery = enqueue_certificate(attendance)
                 response_data = EvaluationSerializer(existing_eval, context={"request": request}).data
-                response_data["certificate_url"] = certificate_url
+                response_data["certificate_delivery"] = CertificateDeliverySerializer(delivery).data
                 return Response(response_data, status=status.HTTP_200_OK)
 
         evaluation = serializer.save(user=user, is_completed=True)
 
-        
-
-        # ✅ Generate certificate (returns base64 data URL)
-        certificate_url = generate_certificate(attendance)
+        # ✅ Certificate is rendered and emailed in the background;
+        # poll certificate_delivery.status_url for progress
+        delivery = enqueue_certificate(attendance)
         response_data = EvaluationSerializer(evaluation, context={"request": request}).data
-        response_data["certificate_url"] = certificate_url
+        response_data["certificate_delivery"] = CertificateDeliverySerializer(delivery).data
         return Response(response_data, status=status.HTTP_201_CREATED)
 
 
 class AvailableEvaluationsAPIView(APIView):
+    """
+    Seminars the user attended but hasn't finished evaluating.
+    One query: attendances LEFT JOIN the user's evaluation for each seminar,
+    with completed evaluations filtered out in SQL.
+    """
     permission_classes = [IsAuthenticated]
 
+    @conditional_get(available_sources)
     def get(self, request):
         user = request.user
 
-        attendances = Attendance.objects.filter(user=user, is_present=True).select_related("seminar")
-        evaluations_data = []
-
-        for att in attendances:
-            seminar = att.seminar
-            evaluation = Evaluation.objects.filter(user=user, seminar=seminar).first()
+        eval_columns = {f"eval_{field}": F(f"own_evaluation__{field}") for field in RATING_FIELDS}
+        attendances = (
+            Attendance.objects.filter(user=user, is_present=True)
+            .annotate(
+                own_evaluation=FilteredRelation(
+                    "seminar__evaluations",
+                    condition=Q(seminar__evaluations__user=user),
+                ),
+                eval_id=F("own_evaluation__id"),
+                eval_suggestions=F("own_evaluation__suggestions"),
+                eval_created_at=F("own_evaluation__created_at"),
+                **eval_columns,
+            )
+            .exclude(own_evaluation__is_completed=True)
+            .select_related("seminar__category", "seminar__certificate_template")
+        )
 
-            # ✅ Since we're not storing certificates, no certificate_url for available evaluations
-            # They'll get it when they submit the evaluation
+        # ✅ Serialize the user once, not once per seminar
+        user_data = UserSerializer(user, context={"request": request}).data
 
-            # ✅ Serialize user and seminar
-            seminar_data = SeminarSerializer(seminar, context={"request": request}).data
-            user_data = UserSerializer(user, context={"request": request}).data
+        evaluations_data = []
+        for att in attendances:
+            seminar_data = SeminarSerializer(att.seminar, context={"request": request}).data
 
-            if evaluation:
+            if att.eval_id:
+                # Started but not completed
                 eval_data = {
-                    "id": evaluation.id,
+                    "id": att.eval_id,
                     "seminar": seminar_data,
                     "user": user_data,
-                    "content_and_relevance": evaluation.content_and_relevance,
-                    "presenters_effectiveness": evaluation.presenters_effectiveness,
-                    "organization_and_structure": evaluation.organization_and_structure,
-                    "materials_usefulness": evaluation.materials_usefulness,
-                    "overall_satisfaction": evaluation.overall_satisfaction,
-                    "suggestions": evaluation.suggestions,
-                    "is_completed": evaluation.is_completed,
-                    "created_at": evaluation.created_at.isoformat(),
+                    **{field: getattr(att, f"eval_{field}") for field in RATING_FIELDS},
+                    "suggestions": att.eval_suggestions,
+                    "is_completed": False,
+                    "created_at": att.eval_created_at.isoformat(),
                     "certificate_url": "",  # Empty since certificates are ephemeral
                 }
             else:
@@ -103,56 +135,166 @@ class AvailableEvaluationsAPIView(APIView):
                     "id": None,
                     "seminar": seminar_data,
                     "user": user_data,
-                    "content_and_relevance": 0,
-                    "presenters_effectiveness": 0,
-                    "organization_and_structure": 0,
-                    "materials_usefulness": 0,
-                    "overall_satisfaction": 0,
+                    **{field: 0 for field in RATING_FIELDS},
                     "suggestions": "",
                     "is_completed": False,
                     "created_at": "",
                     "certificate_url": "",  # Empty since not yet generated
                 }
 
-            # Only include if evaluation is not completed
-            if not evaluation or not evaluation.is_completed:
-                evaluations_data.append(eval_data)
+            evaluations_data.append(eval_data)
 
         return Response(evaluations_data, status=status.HTTP_200_OK)
     
+
+class EvaluationResponsePagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+
 class SeminarEvaluationAnalyticsAPIView(APIView):
     """
     Returns analytics for a seminar — includes:
-    - Raw evaluations (for frontend rendering)
-    - Average ratings per category
+    - Average ratings per category and 1-5 distributions (from EvaluationSummary)
+    - Raw evaluations, paginated, only when ?include=responses is passed
     """
     permission_classes = [IsAuthenticated]
 
+    @use_replica
     def get(self, request, seminar_id):
-        seminar = get_object_or_404(Seminar, id=seminar_id)
-        evaluations = Evaluation.objects.filter(seminar=seminar, is_completed=True)
-
-        serializer = EvaluationSerializer(evaluations, many=True)
-
-        # Compute category averages
-        averages = evaluations.aggregate(
-            avg_content_and_relevance=Avg("content_and_relevance"),
-            avg_presenters_effectiveness=Avg("presenters_effectiveness"),
-            avg_organization_and_structure=Avg("organization_and_structure"),
-            avg_materials_usefulness=Avg("materials_usefulness"),
-            avg_overall_satisfaction=Avg("overall_satisfaction"),
+        seminar = get_object_or_404(Seminar.objects.only("id", "title"), id=seminar_id)
+        summary = (
+            EvaluationSummary.objects.filter(seminar=seminar).first()
+            or EvaluationSummary(seminar=seminar)
         )
 
-        # Clean out any binary/base64 fields if present
-        cleaned_evaluations = []
-        for e in serializer.data:
-            e.pop("certificate_url", None)  # Remove large binary data
-            cleaned_evaluations.append(e)
-
-        return Response({
+        data = {
             "seminar_id": seminar.id,
             "seminar_title": seminar.title,
-            "total_responses": evaluations.count(),
-            "averages": averages,
-            "evaluations": cleaned_evaluations,
-        }, status=status.HTTP_200_OK)
\ No newline at end of file
+            "total_responses": summary.total_responses,
+            "averages": summary.get_averages(),
+            "distributions": summary.get_distributions(),
+        }
+
+        if request.query_params.get("include") == "responses":
+            evaluations = (
+                Evaluation.objects.filter(seminar=seminar, is_completed=True)
+                .select_related("user")
+                .order_by("-created_at", "-id")
+            )
+            paginator = EvaluationResponsePagination()
+            page = paginator.paginate_queryset(evaluations, request, view=self)
+            data["evaluations"] = EvaluationResponseSerializer(page, many=True).data
+            data["next"] = paginator.get_next_link()
+            data["previous"] = paginator.get_previous_link()
+
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class EvaluationAnalyticsAPIView(APIView):
+    """
+    Compare evaluation scores across seminars (admin only)
+    GET /api/evaluations/analytics/?group_by=speaker|category|month
+    Each group has per-question mean, std dev, 95% CI and 1-5 distribution;
+    month groups are in chronological order for trends.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @use_replica
+    def get(self, request):
+        if request.user.role != "admin":
+            return Response(
+                {"error": "Only admins can view evaluation analytics"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        group_by = request.query_params.get("group_by", "category")
+        if group_by not in GROUP_BY_CHOICES:
+            return Response(
+                {"error": f"group_by must be one of: {', '.join(GROUP_BY_CHOICES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(get_group_stats(group_by), status=status.HTTP_200_OK)
+
+
+def _id_params(params, *names):
+    """Optional integer id query parameters, None when absent; ValueError names a bad one."""
+    ids = []
+    for name in names:
+        value = params.get(name) or None
+        if value is not None:
+            try:
+                value = int(value)
+            except ValueError:
+                raise ValueError(f"{name} must be a number")
+        ids.append(value)
+    return ids
+
+
+class SuggestionTermsAPIView(APIView):
+    """
+    Most mentioned words/phrases in evaluation suggestions (admin only)
+    GET /api/evaluations/suggestions/terms/?seminar_id=&category_id=&bigrams=true&limit=20
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role != "admin":
+            return Response(
+                {"error": "Only admins can view suggestion terms"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        try:
+            limit = min(max(int(request.query_params.get("limit", 20)), 1), 100)
+        except ValueError:
+            return Response({"error": "limit must be a number"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            seminar_id, category_id = _id_params(request.query_params, "seminar_id", "category_id")
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        bigrams = request.query_params.get("bigrams", "").lower() == "true"
+
+        return Response({
+            "seminar_id": seminar_id,
+            "category_id": category_id,
+            "bigrams": bigrams,
+            "terms": top_terms(seminar_id, category_id, bigrams=bigrams, limit=limit),
+        }, status=status.HTTP_200_OK)
+
+
+class SuggestionSearchAPIView(APIView):
+    """
+    Search evaluation suggestions by keyword through the keyword index (admin only)
+    GET /api/evaluations/suggestions/search/?q=slides&seminar_id=&category_id=&page=
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role != "admin":
+            return Response(
+                {"error": "Only admins can search suggestions"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            return Response({"error": "q parameter is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            seminar_id, category_id = _id_params(request.query_params, "seminar_id", "category_id")
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        evaluations = search_evaluations(
+            query, seminar_id=seminar_id, category_id=category_id,
+        ).select_related("user")
+
+        paginator = EvaluationResponsePagination()
+        page = paginator.paginate_queryset(evaluations, request, view=self)
+        return paginator.get_paginated_response(
+            EvaluationResponseSerializer(page, many=True).data
+        )
@@ -0,0 +1,34 @@
+# gunicorn.conf.py
+# Loaded automatically by gunicorn from the working directory.
+import glob
+import os
+import re
+
+# Multiprocess Prometheus metrics (api.metrics). Workers inherit this from
+# the master, which creates the directory in on_starting()
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/podium-metrics")
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def on_starting(server):
+    """
+    Drop metric files left by processes that are gone (earlier runs), but
+    keep those of live processes sharing the directory, e.g. the mail worker.
+    """
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not path:
+        return
+    os.makedirs(path, exist_ok=True)
+    for filename in glob.glob(os.path.join(path, "*.db")):
+        match = re.search(r"_(\d+)\.db$", filename)
+        if match and not _pid_alive(int(match.group(1))):
+            os.remove(filename)
@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import OutboxEmail
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'to_email', 'subject', 'status', 'attempts', 'created_at', 'sent_at']
+    list_filter = ['kind', 'status', 'created_at']
+    search_fields = ['to_email', 'subject', 'dedupe_key', 'batch_key']
+    readonly_fields = ['created_at', 'claimed_at', 'sent_at', 'message_id', 'last_error']
+    exclude = ['attachments']
@@ -0,0 +1,113 @@
+# mailer/brevo.py
+"""
+Process-wide Brevo client.
+
+Building a Configuration/ApiClient per email means a new urllib3 pool,
+so every send pays for a fresh TCP connection and TLS handshake. The
+client here is built once per process (rebuilt after a fork) and keeps
+up to BREVO_CONNECTION_POOL_SIZE keep-alive connections open.
+asend_transac_email() posts the same request through the pooled async
+client in api.http, for the async mail worker.
+"""
+import os
+import threading
+
+import sib_api_v3_sdk
+from django.conf import settings
+from sib_api_v3_sdk.rest import ApiException
+
+from api.http import get_async_client
+from api.metrics import BREVO_SEND_FAILURES, BREVO_SEND_SECONDS, timed
+
+_api = None
+_api_pid = None
+_lock = threading.Lock()
+
+
+def build_api(pool_size=None, host=None):
+    """A new TransactionalEmailsApi with its own connection pool."""
+    configuration = sib_api_v3_sdk.Configuration()
+    configuration.api_key['api-key'] = settings.BREVO_API_KEY
+    configuration.connection_pool_maxsize = pool_size or getattr(settings, "BREVO_CONNECTION_POOL_SIZE", 4)
+    host = host or getattr(settings, "BREVO_API_HOST", None)
+    if host:
+        configuration.host = host
+    return sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
+
+
+def get_api():
+    """The shared client, built on first use in each process."""
+    global _api, _api_pid
+    pid = os.getpid()
+    if _api is None or _api_pid != pid:
+        with _lock:
+            if _api is None or _api_pid != pid:
+                _api = build_api()
+                _api_pid = pid
+    return _api
+
+
+def reset_api():
+    """Drop the shared client so the next get_api() picks up new settings."""
+    global _api, _api_pid
+    with _lock:
+        _api = None
+        _api_pid = None
+
+
+def request_timeout():
+    """(connect, read) seconds passed to urllib3 on every call."""
+    return (
+        getattr(settings, "BREVO_CONNECT_TIMEOUT", 5),
+        getattr(settings, "BREVO_READ_TIMEOUT", 30),
+    )
+
+
+def send_transac_email(message, api=None):
+    """Send one SendSmtpEmail through the shared client (or the given one)."""
+    try:
+        with timed(BREVO_SEND_SECONDS):
+            return (api or get_api()).send_transac_email(message, _request_timeout=request_timeout())
+    except ApiException as e:
+        BREVO_SEND_FAILURES.labels(status=str(e.status or 0)).inc()
+        raise
+    except Exception:
+        # Connection errors and timeouts surface as urllib3 exceptions
+        BREVO_SEND_FAILURES.labels(status="0").inc()
+        raise
+
+
+async def asend_transac_email(message, host=None, client=None):
+    """
+    send_transac_email() without the SDK's blocking urllib3 call: the
+    message is serialized like the SDK does and posted with httpx. Errors
+    are raised as ApiException so the worker's retry rules still apply.
+    Returns what BrevoTransport.send() does: the message id, or the list of
+    ids for a messageVersions request.
+    """
+    import httpx
+
+    api_client = get_api().api_client
+    host = host or api_client.configuration.host
+    connect, read = request_timeout()
+    try:
+        with timed(BREVO_SEND_SECONDS):
+            response = await (client or get_async_client()).post(
+                f"{host.rstrip('/')}/smtp/email",
+                json=api_client.sanitize_for_serialization(message),
+                headers={"api-key": settings.BREVO_API_KEY or "", "accept": "application/json"},
+                timeout=httpx.Timeout(read, connect=connect),
+            )
+    except Exception:
+        BREVO_SEND_FAILURES.labels(status="0").inc()
+        raise
+    if response.status_code >= 300:
+        BREVO_SEND_FAILURES.labels(status=str(response.status_code)).inc()
+        error = ApiException(status=response.status_code, reason=response.reason_phrase)
+        error.body = response.text
+        error.headers = response.headers
+        raise error
+    from .transports import message_ids
+
+    data = response.json()
+    return message_ids(data.get("messageId"), data.get("messageIds"))
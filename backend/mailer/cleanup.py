@@ -0,0 +1,65 @@
+# mailer/cleanup.py
+"""
+Retention for the outbox. Sent and failed rows are kept for
+MAIL_RETENTION_DAYS for metrics and support, then deleted in bounded
+batches from the mail worker's loop (OutboxPurger), so each DELETE and its
+locks stay short. The dedupe keys go with them: by then nothing is going
+to queue the same email again.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+
+def purge_outbox(retention_days=None, batch_size=1000, max_batches=None, before_delete=None, now=None):
+    """
+    Delete sent rows sent, and failed rows created, more than retention_days
+    ago, at most batch_size per statement. before_delete(ids) runs ahead of
+    each DELETE for tables that point at the outbox. Returns rows deleted.
+    """
+    retention_days = retention_days or getattr(settings, "MAIL_RETENTION_DAYS", 30)
+    cutoff = (now or timezone.now()) - timedelta(days=retention_days)
+    expired = OutboxEmail.objects.filter(
+        Q(status=OutboxEmail.STATUS_SENT, sent_at__lt=cutoff)
+        | Q(status=OutboxEmail.STATUS_FAILED, created_at__lt=cutoff)
+    )
+    deleted = batches = 0
+    while max_batches is None or batches < max_batches:
+        ids = list(expired.order_by().values_list("id", flat=True)[:batch_size])
+        if not ids:
+            break
+        if before_delete:
+            before_delete(ids)
+        deleted += OutboxEmail.objects.filter(id__in=ids).delete()[0]
+        batches += 1
+        if len(ids) < batch_size:
+            break
+    return deleted
+
+
+class OutboxPurger:
+    """A purge at most every `interval` seconds, for the mail worker's loop."""
+
+    def __init__(self, interval=None, batch_size=1000, max_batches=None, before_delete=None):
+        self.interval = interval or getattr(settings, "MAIL_PURGE_INTERVAL", 3600)
+        self.batch_size = batch_size
+        # Bounded so one round never holds up email for long
+        self.max_batches = max_batches or getattr(settings, "MAIL_PURGE_MAX_BATCHES", 10)
+        self.before_delete = before_delete
+        self.next_run = 0.0
+
+    def run_due(self):
+        """Purge if the interval has passed. Returns how many rows were deleted."""
+        if time.monotonic() < self.next_run:
+            return 0
+        deleted = purge_outbox(batch_size=self.batch_size, max_batches=self.max_batches,
+                               before_delete=self.before_delete)
+        # A purge that hit max_batches left rows behind; carry on next round
+        if deleted < self.batch_size * self.max_batches:
+            self.next_run = time.monotonic() + self.interval
+        return deleted
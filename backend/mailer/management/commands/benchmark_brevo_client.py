@@ -0,0 +1,55 @@
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+import sib_api_v3_sdk
+from django.core.management.base import BaseCommand
+
+from mailer.brevo import build_api, send_transac_email
+from mailer.standin import StandInServer
+
+
+class Command(BaseCommand):
+    help = "Compare sends/second with a Brevo client per email versus the shared pooled client"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--emails", type=int, default=500)
+        parser.add_argument("--threads", type=int, default=4)
+        parser.add_argument("--latency-ms", type=float, default=0, help="Simulated server latency for the local stand-in")
+        parser.add_argument("--host", help="Send to this API base URL instead of a local stand-in (never the live API)")
+
+    def handle(self, *args, **options):
+        server = None
+        host = options["host"]
+        if not host:
+            server = StandInServer(latency=options["latency_ms"] / 1000).start()
+            host = server.url
+
+        message = sib_api_v3_sdk.SendSmtpEmail(
+            sender={"name": "Benchmark", "email": "benchmark@example.com"},
+            to=[{"email": "someone@example.com"}],
+            subject="Benchmark",
+            html_content="<p>Benchmark</p>",
+        )
+        emails, threads = options["emails"], options["threads"]
+
+        def per_send(_):
+            # What every send path used to do
+            send_transac_email(message, api=build_api(host=host))
+
+        shared_api = build_api(pool_size=threads, host=host)
+
+        def shared(_):
+            send_transac_email(message, api=shared_api)
+
+        try:
+            self.stdout.write(f"{emails} emails, {threads} threads, endpoint {host}")
+            self.stdout.write(f"{'client':<22}{'seconds':>10}{'sends/s':>12}")
+            for label, send in (("new client per send", per_send), ("shared pooled client", shared)):
+                with ThreadPoolExecutor(max_workers=threads) as pool:
+                    started = time.perf_counter()
+                    list(pool.map(send, range(emails)))
+                    elapsed = time.perf_counter() - started
+                self.stdout.write(f"{label:<22}{elapsed:>10.2f}{emails / elapsed:>12.1f}")
+        finally:
+            if server:
+                server.stop()
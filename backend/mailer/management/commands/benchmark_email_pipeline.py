@@ -0,0 +1,164 @@
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from mailer.models import OutboxEmail
+from mailer.standin import StandInServer
+from mailer.transports import BrevoTransport, FakeTransport
+from mailer.worker import OutboxWorker
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure end-to-end emails/second through send_new_seminar_emails and "
+        "generate_certificate, delivered by the outbox worker to a local stand-in. "
+        "Runs in a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--participants", type=int, default=2000)
+        parser.add_argument("--certificates", type=int, default=100)
+        parser.add_argument("--transport", choices=["standin", "fake"], default="standin")
+        parser.add_argument("--latency-ms", type=float, default=50, help="Per-request latency of the stand-in/fake")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests that fail with a retryable error")
+        parser.add_argument("--rate-limit", type=int, help="Stand-in requests per second before answering 429")
+        parser.add_argument("--worker-threads", type=int, default=8)
+        parser.add_argument("--worker-rate", type=float, default=1000, help="Worker token bucket, requests per second")
+        parser.add_argument("--render-threads", type=int, default=2, help="Threads rendering certificates")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        # The stand-in also serves the certificate template image
+        server = StandInServer(
+            latency=options["latency_ms"] / 1000,
+            error_rate=options["error_rate"],
+            rate_limit=options["rate_limit"],
+            seed=options["seed"],
+        ).start()
+
+        if options["transport"] == "fake":
+            transport = FakeTransport(
+                latency=options["latency_ms"] / 1000,
+                error_rate=options["error_rate"],
+                seed=options["seed"],
+            )
+        else:
+            transport = BrevoTransport(host=server.url, pool_size=options["worker_threads"])
+
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(
+                DEFAULT_CERTIFICATE_TEMPLATE_URL=server.template_url,
+                MAIL_RETRY_BASE_DELAY=0.05,
+                MAIL_RETRY_MAX_DELAY=0.5,
+                MAIL_MAX_ATTEMPTS=20,
+            ):
+                worker = OutboxWorker(
+                    transport=transport,
+                    threads=options["worker_threads"],
+                    rate=options["worker_rate"],
+                )
+                try:
+                    rows = self.run_benchmark(worker, options)
+                finally:
+                    worker.close()
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            server.stop()
+
+        self.stdout.write(
+            f"transport={options['transport']} latency={options['latency_ms']}ms "
+            f"error_rate={options['error_rate']} worker_threads={options['worker_threads']}"
+        )
+        self.stdout.write(f"{'phase':<28}{'emails':>8}{'seconds':>10}{'emails/s':>12}")
+        for label, emails, seconds in rows:
+            self.stdout.write(f"{label:<28}{emails:>8}{seconds:>10.2f}{emails / seconds if seconds else 0:>12.1f}")
+        stats = server.stats
+        self.stdout.write(
+            f"stand-in: accepted={stats.accepted} recipients={stats.recipients} "
+            f"errors={stats.errors} rate_limited={stats.rate_limited}"
+        )
+        self.stdout.write(f"worker: {worker.stats.snapshot()}")
+
+    def run_benchmark(self, worker, options):
+        from attendance.models import Attendance
+        from certificates.utils import generate_certificate
+        from seminars.models import Seminar
+        from seminars.services import send_new_seminar_emails
+        from users.models import CustomUser, EmailNotificationPreference
+
+        now = timezone.now()
+        users = CustomUser.objects.bulk_create([
+            CustomUser(
+                username=f"bench{i}",
+                email=f"bench{i}@example.com",
+                first_name=f"Bench{i}",
+                password="!",
+                role="participant",
+            )
+            for i in range(options["participants"])
+        ], batch_size=1000)
+        EmailNotificationPreference.objects.bulk_create(
+            [EmailNotificationPreference(user=user, enabled=True) for user in users],
+            batch_size=1000,
+        )
+        # Marked as queued so a running mail worker leaves the fan-out to the benchmark
+        seminar = Seminar.objects.bulk_create([
+            Seminar(title="Benchmark Seminar", speaker="Bench", date_start=now, date_end=now,
+                    notifications_queued_at=now)
+        ])[0]
+
+        rows = []
+
+        # New-seminar notifications
+        started = time.perf_counter()
+        queued = send_new_seminar_emails(seminar)
+        rows.append(("notifications: enqueue", queued, time.perf_counter() - started))
+        self.drain(worker)
+        rows.append(("notifications: end to end", queued, time.perf_counter() - started))
+
+        # Certificates
+        attendances = Attendance.objects.bulk_create([
+            Attendance(user=user, seminar=seminar, check_in=now, check_out=now, is_present=True)
+            for user in users[:options["certificates"]]
+        ])
+        attendances = list(
+            Attendance.objects.filter(id__in=[a.id for a in attendances]).select_related("user", "seminar")
+        )
+
+        def render(attendance):
+            try:
+                generate_certificate(attendance, dedupe_key=f"benchmark-certificate:{attendance.id}")
+            finally:
+                close_old_connections()
+
+        render_threads = options["render_threads"]
+        if connection.vendor == "sqlite":
+            # The in-memory test database can't take concurrent writers
+            render_threads = 1
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=render_threads) as pool:
+            list(pool.map(render, attendances))
+        rows.append(("certificates: render+enqueue", len(attendances), time.perf_counter() - started))
+        self.drain(worker)
+        rows.append(("certificates: end to end", len(attendances), time.perf_counter() - started))
+        return rows
+
+    @staticmethod
+    def drain(worker):
+        """Run the worker until nothing is left pending (retries included)."""
+        unfinished = OutboxEmail.objects.filter(
+            status__in=[OutboxEmail.STATUS_PENDING, OutboxEmail.STATUS_SENDING]
+        )
+        while True:
+            if worker.drain_once():
+                continue
+            if not unfinished.exists():
+                return
+            time.sleep(0.02)
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from mailer.standin import StandInServer
+
+
+class Command(BaseCommand):
+    help = "Serve a local stand-in for Brevo's send_transac_email endpoint (set BREVO_API_HOST to its URL)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--port", type=int, default=8025)
+        parser.add_argument("--latency-ms", type=float, default=0)
+        parser.add_argument("--error-rate", type=float, default=0, help="Share of requests answered with 500 (0-1)")
+        parser.add_argument("--rate-limit", type=int, help="Requests per second before answering 429")
+
+    def handle(self, *args, **options):
+        server = StandInServer(
+            port=options["port"],
+            latency=options["latency_ms"] / 1000,
+            error_rate=options["error_rate"],
+            rate_limit=options["rate_limit"],
+        )
+        self.stdout.write(f"Brevo stand-in on {server.url} (template image at {server.template_url})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stats = server.stats
+            self.stdout.write(
+                f"accepted={stats.accepted} recipients={stats.recipients} "
+                f"errors={stats.errors} rate_limited={stats.rate_limited}"
+            )
+            server.server_close()
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand
+
+from api.http import close_async_client
+from certificates.tasks import CertificateWorker, settle_deliveries
+from mailer.cleanup import OutboxPurger
+from mailer.worker import OutboxWorker
+from seminars.tasks import queue_pending_notifications
+from users.cleanup import EmailChangeSweeper
+from users.tasks import ImportWorker
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver queued outbox emails through Brevo, queue new-seminar notifications, "
+        "render queued certificates, run participant imports and purge old outbox rows "
+        "and email change requests"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Drain what is due now, then exit")
+        parser.add_argument("--threads", type=int, help="Parallel send threads (default MAIL_WORKER_THREADS)")
+        parser.add_argument("--rate", type=float, help="Brevo requests per second (default BREVO_RATE_LIMIT_PER_SECOND)")
+        parser.add_argument("--async", dest="use_async", action="store_true",
+                            help="Send from one event loop instead of a thread pool")
+        parser.add_argument("--concurrency", type=int,
+                            help="Requests in flight with --async (default MAIL_WORKER_CONCURRENCY)")
+        parser.add_argument("--no-certificates", action="store_true",
+                            help="Leave queued certificate deliveries to another worker")
+        parser.add_argument("--no-imports", action="store_true",
+                            help="Leave pending participant imports to another worker")
+        parser.add_argument("--stats-interval", type=int, default=60, help="Seconds between stats log lines")
+
+    def handle(self, *args, **options):
+        if not logging.getLogger("mailer").handlers and not logging.getLogger().handlers:
+            logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+        worker = OutboxWorker(threads=options["threads"], rate=options["rate"], concurrency=options["concurrency"])
+        certificates = None if options["no_certificates"] else CertificateWorker()
+        imports = None if options["no_imports"] else ImportWorker()
+        jobs = [
+            queue_pending_notifications,
+            EmailChangeSweeper().run_due,
+            OutboxPurger(before_delete=settle_deliveries).run_due,
+        ]
+        if certificates:
+            jobs.append(certificates.drain_once)
+        if imports:
+            jobs.append(imports.drain_once)
+        try:
+            if options["use_async"]:
+                asyncio.run(self.run_async(worker, jobs, options))
+            elif options["once"]:
+                total = 0
+                while True:
+                    claimed = sum(job() for job in jobs) + worker.drain_once()
+                    if not claimed:
+                        break
+                    total += claimed
+                self.report(worker, total)
+            else:
+                worker.run(stats_interval=options["stats_interval"], jobs=jobs)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            worker.close()
+            if certificates:
+                certificates.close()
+            if imports:
+                imports.close()
+
+    async def run_async(self, worker, jobs, options):
+        try:
+            if options["once"]:
+                total = 0
+                while True:
+                    claimed = 0
+                    for job in jobs:
+                        claimed += await sync_to_async(job)()
+                    claimed += await worker.adrain_once()
+                    if not claimed:
+                        break
+                    total += claimed
+                self.report(worker, total)
+            else:
+                await worker.arun(stats_interval=options["stats_interval"], jobs=jobs)
+        finally:
+            await close_async_client()
+
+    def report(self, worker, total):
+        self.stdout.write(self.style.SUCCESS(f"Processed {total} queued rows: {worker.stats.snapshot()}"))
@@ -0,0 +1,58 @@
+# mailer/metrics.py
+"""Outbox throughput and latency, computed from the table so every process sees the same numbers."""
+from datetime import timedelta
+
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+# How many recent sends the latency percentiles are computed over
+LATENCY_SAMPLE = 1000
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 2)
+
+
+def outbox_stats():
+    now = timezone.now()
+    by_status = dict(
+        OutboxEmail.objects.order_by().values_list("status").annotate(n=Count("id"))
+    )
+
+    sent = OutboxEmail.objects.filter(status=OutboxEmail.STATUS_SENT)
+    sent_last_minute = sent.filter(sent_at__gte=now - timedelta(minutes=1)).count()
+    sent_last_hour = sent.filter(sent_at__gte=now - timedelta(hours=1)).count()
+
+    recent = sent.order_by("-sent_at").values_list("created_at", "sent_at")[:LATENCY_SAMPLE]
+    latencies = [(sent_at - created_at).total_seconds() for created_at, sent_at in recent]
+
+    oldest_pending = (
+        OutboxEmail.objects.filter(status=OutboxEmail.STATUS_PENDING)
+        .order_by("created_at")
+        .values_list("created_at", flat=True)
+        .first()
+    )
+
+    return {
+        "counts": {status: by_status.get(status, 0) for status, _ in OutboxEmail.STATUS_CHOICES},
+        "throughput": {
+            "sent_last_minute": sent_last_minute,
+            "sent_last_hour": sent_last_hour,
+            "per_second_last_minute": round(sent_last_minute / 60, 2),
+        },
+        "latency_seconds": {
+            "sample": len(latencies),
+            "p50": _percentile(latencies, 50),
+            "p95": _percentile(latencies, 95),
+            "p99": _percentile(latencies, 99),
+        },
+        "oldest_pending_age_seconds": (
+            round((now - oldest_pending).total_seconds(), 1) if oldest_pending else None
+        ),
+    }
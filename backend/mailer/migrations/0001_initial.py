@@ -0,0 +1,43 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('certificate', 'Certificate'), ('password_reset', 'Password reset'), ('email_change_code', 'Email change code'), ('email_change_notice', 'Email change notice'), ('seminar_notification', 'Seminar notification')], max_length=30)),
+                ('dedupe_key', models.CharField(blank=True, max_length=255, null=True, unique=True)),
+                ('to_email', models.EmailField(max_length=254)),
+                ('to_name', models.CharField(blank=True, max_length=255)),
+                ('subject', models.CharField(max_length=255)),
+                ('html_content', models.TextField()),
+                ('params', models.JSONField(blank=True, null=True)),
+                ('attachments', models.JSONField(blank=True, default=list)),
+                ('batch_key', models.CharField(blank=True, db_index=True, max_length=100)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(auto_now_add=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('message_id', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Outbox Email',
+                'verbose_name_plural': 'Outbox Emails',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='mailer_outb_status_b61960_idx'), models.Index(fields=['status', 'sent_at'], name='mailer_outb_status_43e61d_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-20 10:05
+
+from django.db import migrations
+
+
+def clear_finished_content(apps, schema_editor):
+    """Rows sent or failed before the worker started clearing them still hold their bodies."""
+    OutboxEmail = apps.get_model("mailer", "OutboxEmail")
+    OutboxEmail.objects.filter(status__in=["sent", "failed"]).update(html_content="", attachments=[])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mailer', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_finished_content, migrations.RunPython.noop),
+    ]
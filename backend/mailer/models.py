@@ -0,0 +1,73 @@
+from django.db import models
+
+
+class OutboxEmail(models.Model):
+    """
+    One outgoing email. Request handlers only insert rows here;
+    the mail worker (manage.py run_mail_worker) delivers them through Brevo
+    and purges sent and failed rows after MAIL_RETENTION_DAYS (mailer.cleanup).
+    """
+    KIND_CERTIFICATE = "certificate"
+    KIND_PASSWORD_RESET = "password_reset"
+    KIND_EMAIL_CHANGE_CODE = "email_change_code"
+    KIND_EMAIL_CHANGE_NOTICE = "email_change_notice"
+    KIND_SEMINAR_NOTIFICATION = "seminar_notification"
+    KIND_CHOICES = [
+        (KIND_CERTIFICATE, "Certificate"),
+        (KIND_PASSWORD_RESET, "Password reset"),
+        (KIND_EMAIL_CHANGE_CODE, "Email change code"),
+        (KIND_EMAIL_CHANGE_NOTICE, "Email change notice"),
+        (KIND_SEMINAR_NOTIFICATION, "Seminar notification"),
+    ]
+
+    STATUS_PENDING = "pending"
+    STATUS_SENDING = "sending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENDING, "Sending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    ]
+    # Written over the body once a row is sent or failed: nothing sends it again,
+    # and certificate attachments run to megabytes per row
+    CLEARED_CONTENT = {"html_content": "", "attachments": []}
+
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    # Inserting a second row with the same key is a no-op
+    dedupe_key = models.CharField(max_length=255, unique=True, null=True, blank=True)
+
+    to_email = models.EmailField()
+    to_name = models.CharField(max_length=255, blank=True)
+    subject = models.CharField(max_length=255)
+    html_content = models.TextField()
+    # Brevo {{ params.X }} values for this recipient
+    params = models.JSONField(null=True, blank=True)
+    # [{"name": ..., "content": <base64>}]
+    attachments = models.JSONField(default=list, blank=True)
+    # Rows sharing a batch_key share subject/html and go out together as
+    # Brevo messageVersions
+    batch_key = models.CharField(max_length=100, blank=True, db_index=True)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(auto_now_add=True)
+    last_error = models.TextField(blank=True)
+    message_id = models.CharField(max_length=255, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        verbose_name = "Outbox Email"
+        verbose_name_plural = "Outbox Emails"
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"]),
+            models.Index(fields=["status", "sent_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} to {self.to_email} ({self.status})"
@@ -0,0 +1,38 @@
+# mailer/outbox.py
+"""
+Queueing side of the outbox. Request handlers call these instead of
+talking to Brevo; mailer.worker delivers the rows.
+"""
+from .models import OutboxEmail
+
+
+def enqueue_email(kind, to_email, subject, html_content, to_name="",
+                  params=None, attachments=None, batch_key="", dedupe_key=None):
+    """
+    Insert one outbox row and return it.
+    If dedupe_key is already in the outbox, the existing row is returned
+    instead, so a retried request or a double submit sends only once.
+    """
+    fields = {
+        "kind": kind,
+        "to_email": to_email,
+        "to_name": to_name,
+        "subject": subject,
+        "html_content": html_content,
+        "params": params,
+        "attachments": attachments or [],
+        "batch_key": batch_key,
+    }
+    if dedupe_key is None:
+        return OutboxEmail.objects.create(**fields)
+
+    email, _ = OutboxEmail.objects.get_or_create(dedupe_key=dedupe_key, defaults=fields)
+    return email
+
+
+def enqueue_emails(emails, batch_size=500):
+    """
+    Bulk insert unsaved OutboxEmail instances.
+    Rows whose dedupe_key is already queued are skipped.
+    """
+    OutboxEmail.objects.bulk_create(emails, batch_size=batch_size, ignore_conflicts=True)
@@ -0,0 +1,51 @@
+# mailer/ratelimit.py
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, holding at most
+    `capacity`. acquire() blocks until a token is available; aacquire()
+    waits on the event loop instead.
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens=1):
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            # Seconds until enough tokens have accumulated
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens=1):
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return
+            self._sleep(wait)
+
+    async def aacquire(self, tokens=1):
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
@@ -0,0 +1,148 @@
+# mailer/standin.py
+"""
+Local HTTP stand-in for Brevo's transactional email endpoint.
+
+POST /v3/smtp/email answers like send_transac_email (201 + messageId, or
+messageIds for a messageVersions request) after an optional delay, fails
+a share of requests with 500, and answers 429 once more than rate_limit
+requests arrive in one second. It also
+serves a blank PNG at /template.png, after template_latency, so certificate
+rendering and template probing can run without Cloudinary. Point BREVO_API_HOST at StandInServer.url to use it.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+import json
+import random
+import threading
+import time
+import uuid
+
+
+class StandInStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.accepted = 0
+        self.recipients = 0
+        self.errors = 0
+        self.rate_limited = 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keep-alive, like the real API
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; without this, Nagle plus delayed
+    # ACKs add ~40ms to every request on a kept-alive connection
+    disable_nagle_algorithm = True
+
+    def _reply(self, status, payload, content_type="application/json", headers=None):
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.split("?")[0] == "/template.png":
+            if self.server.template_latency:
+                time.sleep(self.server.template_latency)
+            self._reply(200, self.server.template_png, content_type="image/png")
+        else:
+            self._reply(404, {"code": "not_found"})
+
+    def do_POST(self):
+        server = self.server
+        raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.path.split("?")[0] != "/v3/smtp/email":
+            self._reply(404, {"code": "not_found"})
+            return
+
+        if server.latency:
+            time.sleep(server.latency)
+
+        stats = server.stats
+        with stats.lock:
+            if server.rate_limit and not server.take_slot():
+                stats.rate_limited += 1
+                status = 429
+            elif server.error_rate and server.random.random() < server.error_rate:
+                stats.errors += 1
+                status = 500
+            else:
+                status = 201
+                payload = json.loads(raw or b"{}")
+                stats.accepted += 1
+                stats.recipients += len(payload.get("messageVersions") or payload.get("to") or [])
+
+        if status == 429:
+            self._reply(429, {"code": "too_many_requests", "message": "Rate limit exceeded"}, headers={"Retry-After": "1"})
+        elif status == 500:
+            self._reply(500, {"code": "internal_error", "message": "Stand-in error"})
+        else:
+            # Like Brevo: one id per message version, else a single id
+            versions = payload.get("messageVersions")
+            if versions:
+                self._reply(201, {"messageIds": [f"<{uuid.uuid4().hex}@standin>" for _ in versions]})
+            else:
+                self._reply(201, {"messageId": f"<{uuid.uuid4().hex}@standin>"})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Load tests open hundreds of connections at once
+    request_queue_size = 1024
+
+    def __init__(self, port=0, latency=0.0, error_rate=0.0, rate_limit=None,
+                 template_size=(2000, 1414), seed=None, template_latency=0.0):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency = latency
+        self.template_latency = template_latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.random = random.Random(seed)
+        self.stats = StandInStats()
+        self.template_png = _blank_png(template_size)
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v3"
+
+    @property
+    def template_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/template.png"
+
+    def take_slot(self):
+        """Fixed one-second window; called with stats.lock held."""
+        now = time.monotonic()
+        if now - self._window_start >= 1:
+            self._window_start = now
+            self._window_count = 0
+        if self._window_count >= self.rate_limit:
+            return False
+        self._window_count += 1
+        return True
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True, name="brevo-standin")
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def _blank_png(size):
+    from PIL import Image
+
+    buffer = BytesIO()
+    Image.new("RGB", size, "white").save(buffer, format="PNG")
+    return buffer.getvalue()
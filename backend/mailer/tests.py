@@ -0,0 +1,190 @@
+# mailer/tests.py
+from datetime import timedelta
+from unittest import mock
+
+import sib_api_v3_sdk
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from sib_api_v3_sdk.rest import ApiException
+
+from mailer.cleanup import OutboxPurger, purge_outbox
+from mailer.models import OutboxEmail
+from mailer.outbox import enqueue_email, enqueue_emails
+from mailer.transports import BrevoTransport, FakeTransport
+from mailer.worker import OutboxWorker
+
+
+def outbox_row(i, **fields):
+    return OutboxEmail(
+        kind=OutboxEmail.KIND_SEMINAR_NOTIFICATION, to_email=f"to{i}@example.com",
+        subject="Hello", html_content="<p>Hi</p>", **fields,
+    )
+
+
+@override_settings(BREVO_SENDER_NAME="Podium", BREVO_SENDER_EMAIL="podium@example.com")
+class OutboxWorkerTests(TestCase):
+
+    def setUp(self):
+        self.transport = FakeTransport()
+        self.worker = OutboxWorker(transport=self.transport, threads=1, rate=1000, claim_size=3, max_attempts=3)
+        self.addCleanup(self.worker.close)
+
+    def test_claim_skips_locked_rows(self):
+        enqueue_emails([outbox_row(i) for i in range(5)])
+        real = QuerySet.select_for_update
+        with mock.patch.object(QuerySet, "select_for_update", autospec=True, side_effect=real) as select:
+            first = self.worker.claim()
+        self.assertEqual(select.call_args.kwargs, {"skip_locked": True})
+
+        # A second worker gets the rows the first didn't claim
+        second = OutboxWorker(transport=self.transport, threads=1, claim_size=10)
+        self.addCleanup(second.close)
+        rest = second.claim()
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(rest), 2)
+        self.assertFalse({e.id for e in first} & {e.id for e in rest})
+        self.assertEqual(OutboxEmail.objects.filter(status=OutboxEmail.STATUS_SENDING).count(), 5)
+
+    def test_claim_respects_next_attempt(self):
+        enqueue_emails([outbox_row(0)])
+        OutboxEmail.objects.update(next_attempt_at=timezone.now() + timedelta(minutes=5))
+        self.assertEqual(self.worker.claim(), [])
+
+    def test_stale_sending_rows_are_claimed_again(self):
+        enqueue_emails([outbox_row(0), outbox_row(1)])
+        now = timezone.now()
+        OutboxEmail.objects.filter(to_email="to0@example.com").update(
+            status=OutboxEmail.STATUS_SENDING, claimed_at=now - timedelta(hours=1))
+        OutboxEmail.objects.filter(to_email="to1@example.com").update(
+            status=OutboxEmail.STATUS_SENDING, claimed_at=now)
+
+        with mock.patch("mailer.worker.retry_delay", return_value=0):
+            self.assertEqual([e.to_email for e in self.worker.claim()], ["to0@example.com"])
+        self.assertEqual(OutboxEmail.objects.get(to_email="to0@example.com").attempts, 1)
+
+    def test_stale_sending_rows_back_off_and_fail(self):
+        enqueue_emails([outbox_row(0), outbox_row(1, attempts=2)])
+        OutboxEmail.objects.update(status=OutboxEmail.STATUS_SENDING, claimed_at=timezone.now() - timedelta(hours=1))
+
+        with mock.patch("mailer.worker.retry_delay", return_value=60):
+            self.assertEqual(self.worker.claim(), [])
+        retried = OutboxEmail.objects.get(to_email="to0@example.com")
+        self.assertEqual((retried.status, retried.attempts), (OutboxEmail.STATUS_PENDING, 1))
+        self.assertGreater(retried.next_attempt_at, timezone.now())
+        failed = OutboxEmail.objects.get(to_email="to1@example.com")
+        self.assertEqual((failed.status, failed.attempts), (OutboxEmail.STATUS_FAILED, 3))
+
+    def test_retryable_error_is_retried(self):
+        enqueue_emails([outbox_row(0)])
+        emails = self.worker.claim()
+        self.worker.record(emails, None, ApiException(status=503), 0.1)
+
+        email = OutboxEmail.objects.get()
+        self.assertEqual((email.status, email.attempts), (OutboxEmail.STATUS_PENDING, 1))
+        self.assertGreaterEqual(email.next_attempt_at, email.created_at)
+
+    def test_connection_error_is_retried(self):
+        enqueue_emails([outbox_row(0)])
+        self.worker.record(self.worker.claim(), None, ConnectionResetError(), 0.1)
+        self.assertEqual(OutboxEmail.objects.get().status, OutboxEmail.STATUS_PENDING)
+
+    def test_client_error_fails(self):
+        enqueue_emails([outbox_row(0)])
+        self.worker.record(self.worker.claim(), None, ApiException(status=400), 0.1)
+        email = OutboxEmail.objects.get()
+        self.assertEqual((email.status, email.attempts), (OutboxEmail.STATUS_FAILED, 1))
+
+    def test_gives_up_after_max_attempts(self):
+        enqueue_emails([outbox_row(0, attempts=2)])
+        self.worker.record(self.worker.claim(), None, ApiException(status=429), 0.1)
+        self.assertEqual(OutboxEmail.objects.get().status, OutboxEmail.STATUS_FAILED)
+
+    def test_batch_gets_one_message_id_per_recipient(self):
+        enqueue_emails([outbox_row(i, batch_key="seminar:1") for i in range(3)] + [outbox_row(9)])
+        self.worker.claim_size = 10
+        self.assertEqual(self.worker.drain_once(), 4)
+
+        self.assertEqual(len(self.transport.messages), 2)
+        ids = list(OutboxEmail.objects.values_list("message_id", flat=True))
+        self.assertTrue(all(ids))
+        self.assertEqual(len(set(ids)), 4)
+        self.assertFalse(OutboxEmail.objects.exclude(status=OutboxEmail.STATUS_SENT).exists())
+
+    def test_finished_rows_drop_their_content(self):
+        attachment = [{"name": "certificate.png", "content": "aGk="}]
+        enqueue_emails([outbox_row(0, attachments=attachment), outbox_row(1, attachments=attachment)])
+        sent, failed = self.worker.claim()[:2]
+        self.worker.record([sent], "<id>", None, 0.1)
+        self.worker.record([failed], None, ApiException(status=400), 0.1)
+        self.assertEqual(
+            list(OutboxEmail.objects.order_by("id").values_list("status", "html_content", "attachments")),
+            [(OutboxEmail.STATUS_SENT, "", []), (OutboxEmail.STATUS_FAILED, "", [])],
+        )
+
+
+class OutboxPurgeTests(TestCase):
+
+    def setUp(self):
+        now = timezone.now()
+        enqueue_emails([outbox_row(i) for i in range(6)])
+        rows = OutboxEmail.objects.order_by("id")
+        old = now - timedelta(days=40)
+        statuses = [
+            (OutboxEmail.STATUS_SENT, old), (OutboxEmail.STATUS_SENT, old), (OutboxEmail.STATUS_SENT, now),
+            (OutboxEmail.STATUS_FAILED, None), (OutboxEmail.STATUS_PENDING, None), (OutboxEmail.STATUS_SENDING, None),
+        ]
+        for row, (status, sent_at) in zip(rows, statuses):
+            OutboxEmail.objects.filter(id=row.id).update(status=status, sent_at=sent_at)
+        # Only the failed and in-flight rows are old enough by created_at
+        OutboxEmail.objects.filter(status__in=[OutboxEmail.STATUS_FAILED, OutboxEmail.STATUS_SENDING]).update(
+            created_at=old)
+
+    def test_deletes_old_finished_rows_only(self):
+        seen = []
+        self.assertEqual(purge_outbox(retention_days=30, batch_size=2, before_delete=seen.extend), 3)
+        self.assertEqual(len(seen), 3)
+        self.assertEqual(
+            sorted(OutboxEmail.objects.values_list("status", flat=True)),
+            [OutboxEmail.STATUS_PENDING, OutboxEmail.STATUS_SENDING, OutboxEmail.STATUS_SENT],
+        )
+
+    @override_settings(MAIL_RETENTION_DAYS=30)
+    def test_worker_purges_once_per_interval(self):
+        purger = OutboxPurger(interval=3600, batch_size=1, max_batches=2)
+        with mock.patch("mailer.cleanup.time.monotonic", return_value=1000.0):
+            # Capped at 2 batches, so the rest goes in the next round
+            self.assertEqual(purger.run_due(), 2)
+            self.assertEqual(purger.run_due(), 1)
+            self.assertEqual(purger.run_due(), 0)
+        self.assertEqual(OutboxEmail.objects.count(), 3)
+
+
+class OutboxDedupeTests(TestCase):
+
+    def test_enqueue_email_dedupes(self):
+        first = enqueue_email(OutboxEmail.KIND_PASSWORD_RESET, "a@example.com", "Reset", "<p>1</p>", dedupe_key="k")
+        second = enqueue_email(OutboxEmail.KIND_PASSWORD_RESET, "a@example.com", "Reset", "<p>2</p>", dedupe_key="k")
+        self.assertEqual(first.id, second.id)
+        self.assertEqual(OutboxEmail.objects.get().html_content, "<p>1</p>")
+
+    def test_enqueue_emails_skips_queued_keys(self):
+        enqueue_emails([outbox_row(0, dedupe_key="a"), outbox_row(1, dedupe_key="b")])
+        enqueue_emails([outbox_row(2, dedupe_key="b"), outbox_row(3, dedupe_key="c")])
+        self.assertEqual(
+            sorted(OutboxEmail.objects.values_list("dedupe_key", "to_email")),
+            [("a", "to0@example.com"), ("b", "to1@example.com"), ("c", "to3@example.com")],
+        )
+
+
+class BrevoTransportTests(TestCase):
+
+    def test_batch_response_ids(self):
+        api = mock.Mock()
+        api.send_transac_email.return_value = sib_api_v3_sdk.CreateSmtpEmail(message_ids=["<a@x>", "<b@x>"])
+        self.assertEqual(BrevoTransport(api=api).send(mock.Mock()), ["<a@x>", "<b@x>"])
+
+    def test_single_response_id(self):
+        api = mock.Mock()
+        api.send_transac_email.return_value = sib_api_v3_sdk.CreateSmtpEmail(message_id="<a@x>")
+        self.assertEqual(BrevoTransport(api=api).send(mock.Mock()), "<a@x>")
@@ -0,0 +1,99 @@
+# mailer/transports.py
+"""
+Email transports used by the mail worker.
+
+MAIL_TRANSPORT picks the class (dotted path). BrevoTransport is the real
+one; pointing BREVO_API_HOST at mailer.standin gives the same HTTP path
+without touching Brevo, and FakeTransport skips HTTP entirely. send() is
+for the threaded worker and asend() for the async one.
+"""
+import asyncio
+import random
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from sib_api_v3_sdk.rest import ApiException
+
+from . import brevo
+
+
+def message_ids(message_id=None, message_ids=None):
+    """
+    What a send returns: Brevo answers a messageVersions request with
+    messageIds, one per version in order, and any other with messageId.
+    """
+    return list(message_ids) if message_ids else (message_id or "")
+
+
+class BaseTransport:
+    def send(self, message):
+        """
+        Deliver one sib_api_v3_sdk.SendSmtpEmail. Returns its message id, or
+        a list of ids (one per version) for a messageVersions request.
+        """
+        raise NotImplementedError
+
+    async def asend(self, message):
+        """send() from the event loop; transports without an async path use a thread."""
+        return await asyncio.to_thread(self.send, message)
+
+
+class BrevoTransport(BaseTransport):
+    def __init__(self, api=None, host=None, pool_size=None):
+        # host builds a private client, e.g. for a stand-in server
+        self.api = api or (brevo.build_api(pool_size=pool_size, host=host) if host else None)
+
+    def send(self, message):
+        response = brevo.send_transac_email(message, api=self.api)
+        return message_ids(getattr(response, "message_id", None), getattr(response, "message_ids", None))
+
+    async def asend(self, message):
+        host = self.api.api_client.configuration.host if self.api else None
+        return await brevo.asend_transac_email(message, host=host)
+
+
+class FakeTransport(BaseTransport):
+    """
+    In-process transport that keeps sent messages in memory.
+    latency (seconds) and error_rate (0-1, raises a retryable 503) let it
+    stand in for a slow or flaky provider.
+    """
+
+    def __init__(self, latency=0.0, error_rate=0.0, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.messages = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def send(self, message):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._deliver(message)
+
+    async def asend(self, message):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._deliver(message)
+
+    def _deliver(self, message):
+        with self._lock:
+            if self.error_rate and self._random.random() < self.error_rate:
+                raise ApiException(status=503, reason="Fake transport error")
+            self.messages.append(message)
+        if message.message_versions:
+            return [f"<{uuid.uuid4().hex}@fake>" for _ in message.message_versions]
+        return f"<{uuid.uuid4().hex}@fake>"
+
+    @property
+    def recipients(self):
+        """Number of recipients across everything sent so far."""
+        with self._lock:
+            return sum(len(m.message_versions or []) or len(m.to or []) for m in self.messages)
+
+
+def get_transport():
+    return import_string(getattr(settings, "MAIL_TRANSPORT", "mailer.transports.BrevoTransport"))()
@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import OutboxStatsAPIView
+
+urlpatterns = [
+    path("stats/", OutboxStatsAPIView.as_view(), name="mailer-stats"),
+]
@@ -0,0 +1,16 @@
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+
+from .metrics import outbox_stats
+
+
+class OutboxStatsAPIView(APIView):
+    """Admin-only: outbox queue depth, throughput and delivery latency."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role != "admin":
+            return Response({"error": "Only admins can view email metrics."}, status=status.HTTP_403_FORBIDDEN)
+        return Response(outbox_stats())
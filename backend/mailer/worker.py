@@ -0,0 +1,360 @@
+# mailer/worker.py
+"""
+Outbox delivery worker.
+
+Claims due rows, groups rows that share a batch_key into one Brevo
+messageVersions request, and sends through a thread pool. Every request
+first takes a token from a bucket sized to the Brevo plan's rate limit.
+Transient failures are retried with exponential backoff and jitter.
+arun()/adrain_once() send from one event loop instead, up to `concurrency`
+requests in flight, with claiming and bookkeeping run through sync_to_async.
+"""
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import logging
+import random
+import time
+from datetime import timedelta
+
+import sib_api_v3_sdk
+from asgiref.sync import sync_to_async
+from sib_api_v3_sdk.rest import ApiException
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboxEmail
+from .ratelimit import TokenBucket
+from .transports import get_transport
+
+logger = logging.getLogger(__name__)
+
+# Brevo accepts at most this many messageVersions in one request
+MAX_MESSAGE_VERSIONS = 1000
+
+# Worth retrying: rate limited or Brevo-side errors
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+def retry_delay(attempts):
+    """Exponential backoff with full jitter, capped at MAIL_RETRY_MAX_DELAY."""
+    base = getattr(settings, "MAIL_RETRY_BASE_DELAY", 5)
+    cap = getattr(settings, "MAIL_RETRY_MAX_DELAY", 900)
+    return random.uniform(0, min(cap, base * 2 ** max(attempts - 1, 0)))
+
+
+def is_retryable(error):
+    if isinstance(error, ApiException):
+        # status 0: the SDK wraps connection/SSL errors with no HTTP status
+        return not error.status or error.status in RETRYABLE_STATUSES
+    # Connection resets, timeouts and other transport errors
+    return True
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class WorkerStats:
+    """In-process counters for one worker, logged periodically."""
+
+    def __init__(self, window=1000):
+        self.started = time.monotonic()
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.requests = 0
+        self.request_seconds = deque(maxlen=window)
+        self.queue_seconds = deque(maxlen=window)
+
+    def snapshot(self):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "requests": self.requests,
+            "emails_per_second": round(self.sent / elapsed, 2),
+            "request_p50_ms": _ms(_percentile(self.request_seconds, 50)),
+            "request_p95_ms": _ms(_percentile(self.request_seconds, 95)),
+            "queue_p50_seconds": _round(_percentile(self.queue_seconds, 50)),
+            "queue_p95_seconds": _round(_percentile(self.queue_seconds, 95)),
+        }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+def _round(seconds):
+    return None if seconds is None else round(seconds, 2)
+
+
+class OutboxWorker:
+
+    def __init__(self, transport=None, threads=None, rate=None, burst=None,
+                 claim_size=None, max_attempts=None, claim_timeout=None, concurrency=None):
+        self.transport = transport or get_transport()
+        self.threads = threads or getattr(settings, "MAIL_WORKER_THREADS", 4)
+        self.concurrency = concurrency or getattr(settings, "MAIL_WORKER_CONCURRENCY", 32)
+        self.bucket = TokenBucket(
+            rate or getattr(settings, "BREVO_RATE_LIMIT_PER_SECOND", 10),
+            burst or getattr(settings, "BREVO_RATE_LIMIT_BURST", None),
+        )
+        self.claim_size = claim_size or getattr(settings, "MAIL_WORKER_CLAIM_SIZE", 500)
+        self.max_attempts = max_attempts or getattr(settings, "MAIL_MAX_ATTEMPTS", 6)
+        # Rows stuck in "sending" this long (e.g. the worker was killed) are picked up again
+        self.claim_timeout = timedelta(seconds=claim_timeout or getattr(settings, "MAIL_CLAIM_TIMEOUT", 300))
+        self.executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="mailer")
+        self.stats = WorkerStats()
+
+    # --- claiming -----------------------------------------------------
+
+    def reset_stale(self, now):
+        """
+        Queue again rows whose worker stopped mid-send. That counts as an
+        attempt with the usual backoff, so a message that keeps crashing or
+        hanging the worker ends up failed like any other.
+        """
+        stale = OutboxEmail.objects.filter(
+            status=OutboxEmail.STATUS_SENDING,
+            claimed_at__lt=now - self.claim_timeout,
+        )
+        message = "The worker stopped before the send finished"
+        stale.filter(attempts__gte=self.max_attempts - 1).update(
+            status=OutboxEmail.STATUS_FAILED,
+            attempts=F("attempts") + 1,
+            last_error=message,
+            **OutboxEmail.CLEARED_CONTENT,
+        )
+        for attempts in set(stale.values_list("attempts", flat=True)):
+            stale.filter(attempts=attempts).update(
+                status=OutboxEmail.STATUS_PENDING,
+                attempts=attempts + 1,
+                last_error=message,
+                next_attempt_at=now + timedelta(seconds=retry_delay(attempts + 1)),
+            )
+
+    def claim(self):
+        now = timezone.now()
+        self.reset_stale(now)
+
+        with transaction.atomic():
+            # skip_locked lets several workers drain the same table
+            ids = list(
+                OutboxEmail.objects.select_for_update(skip_locked=True)
+                .filter(status=OutboxEmail.STATUS_PENDING, next_attempt_at__lte=now)
+                .order_by("next_attempt_at", "id")
+                .values_list("id", flat=True)[:self.claim_size]
+            )
+            if not ids:
+                return []
+            OutboxEmail.objects.filter(id__in=ids).update(
+                status=OutboxEmail.STATUS_SENDING,
+                claimed_at=now,
+            )
+        return list(OutboxEmail.objects.filter(id__in=ids).order_by("id"))
+
+    @staticmethod
+    def group(emails):
+        """Split claimed rows into requests: one per batch_key chunk, one per lone row."""
+        batches = defaultdict(list)
+        jobs = []
+        for email in emails:
+            if email.batch_key:
+                batches[email.batch_key].append(email)
+            else:
+                jobs.append([email])
+        for rows in batches.values():
+            for i in range(0, len(rows), MAX_MESSAGE_VERSIONS):
+                jobs.append(rows[i:i + MAX_MESSAGE_VERSIONS])
+        return jobs
+
+    # --- sending ------------------------------------------------------
+
+    @staticmethod
+    def build_message(emails):
+        first = emails[0]
+        sender = {
+            "name": settings.BREVO_SENDER_NAME,
+            "email": settings.BREVO_SENDER_EMAIL,
+        }
+        kwargs = {
+            "sender": sender,
+            "subject": first.subject,
+            "html_content": first.html_content,
+        }
+        if first.attachments:
+            kwargs["attachment"] = first.attachments
+
+        if first.batch_key:
+            kwargs["message_versions"] = [
+                sib_api_v3_sdk.SendSmtpEmailMessageVersions(
+                    to=[{"email": email.to_email, "name": email.to_name or email.to_email}],
+                    params=email.params or None,
+                )
+                for email in emails
+            ]
+        else:
+            kwargs["to"] = [{"email": first.to_email, "name": first.to_name or first.to_email}]
+            if first.params:
+                kwargs["params"] = first.params
+        return sib_api_v3_sdk.SendSmtpEmail(**kwargs)
+
+    def send(self, emails):
+        """Runs on a pool thread. Returns (emails, message_id, error, seconds)."""
+        self.bucket.acquire()
+        started = time.monotonic()
+        try:
+            message_id = self.transport.send(self.build_message(emails))
+        except Exception as e:
+            return emails, None, e, time.monotonic() - started
+        return emails, message_id or "", None, time.monotonic() - started
+
+    async def asend(self, emails):
+        """send() on the event loop."""
+        await self.bucket.aacquire()
+        started = time.monotonic()
+        try:
+            message_id = await self.transport.asend(self.build_message(emails))
+        except Exception as e:
+            return emails, None, e, time.monotonic() - started
+        return emails, message_id or "", None, time.monotonic() - started
+
+    def record(self, emails, message_id, error, seconds):
+        self.stats.requests += 1
+        self.stats.request_seconds.append(seconds)
+        ids = [email.id for email in emails]
+        now = timezone.now()
+
+        if error is None:
+            if isinstance(message_id, list) and len(message_id) != len(emails):
+                message_id = ",".join(message_id)
+            per_email = isinstance(message_id, list)
+            OutboxEmail.objects.filter(id__in=ids).update(
+                status=OutboxEmail.STATUS_SENT,
+                sent_at=now,
+                message_id="" if per_email else message_id[:255],
+                last_error="",
+                **OutboxEmail.CLEARED_CONTENT,
+            )
+            if per_email:
+                # messageVersions: Brevo's ids are in the order the versions were sent
+                for email, email_message_id in zip(emails, message_id):
+                    email.message_id = email_message_id[:255]
+                OutboxEmail.objects.bulk_update(emails, ["message_id"])
+            self.stats.sent += len(emails)
+            for email in emails:
+                self.stats.queue_seconds.append((now - email.created_at).total_seconds())
+            return
+
+        attempts = emails[0].attempts + 1
+        message = str(error)[:1000]
+        if attempts >= self.max_attempts or not is_retryable(error):
+            logger.warning("Giving up on outbox emails %s after %d attempts: %s", ids, attempts, message)
+            OutboxEmail.objects.filter(id__in=ids).update(
+                status=OutboxEmail.STATUS_FAILED,
+                attempts=attempts,
+                last_error=message,
+                **OutboxEmail.CLEARED_CONTENT,
+            )
+            self.stats.failed += len(emails)
+            return
+
+        OutboxEmail.objects.filter(id__in=ids).update(
+            status=OutboxEmail.STATUS_PENDING,
+            attempts=attempts,
+            last_error=message,
+            next_attempt_at=now + timedelta(seconds=retry_delay(attempts)),
+        )
+        self.stats.retried += len(emails)
+
+    def drain_once(self):
+        """Claim and send one round of due rows. Returns how many rows were claimed."""
+        emails = self.claim()
+        if not emails:
+            return 0
+        futures = [self.executor.submit(self.send, job) for job in self.group(emails)]
+        for future in futures:
+            self.record(*future.result())
+        return len(emails)
+
+    def record_all(self, results):
+        for result in results:
+            self.record(*result)
+
+    async def adrain_once(self):
+        """drain_once() with every request of the round in flight at once, up to concurrency."""
+        emails = await sync_to_async(self.claim)()
+        if not emails:
+            return 0
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def send(job):
+            async with semaphore:
+                return await self.asend(job)
+
+        results = await asyncio.gather(*(send(job) for job in self.group(emails)))
+        await sync_to_async(self.record_all)(results)
+        return len(emails)
+
+    def run(self, poll_interval=None, stats_interval=60, stop=None, jobs=()):
+        """
+        Drain forever (or until stop() returns True), sleeping when idle.
+        jobs are other queues drained in the same loop: called before each
+        round, each returns how many rows it handled.
+        """
+        poll_interval = poll_interval or getattr(settings, "MAIL_WORKER_POLL_INTERVAL", 2)
+        last_report = time.monotonic()
+        logger.info(
+            "Mail worker started: %d threads, %.1f requests/s",
+            self.threads, self.bucket.rate,
+        )
+        while not (stop and stop()):
+            close_old_connections()
+            claimed = 0
+            for job in (*jobs, self.drain_once):
+                try:
+                    claimed += job()
+                except Exception:
+                    logger.exception("Mail worker round failed")
+
+            if time.monotonic() - last_report >= stats_interval:
+                logger.info("Mail worker stats: %s", self.stats.snapshot())
+                last_report = time.monotonic()
+
+            if not claimed:
+                time.sleep(poll_interval)
+
+    async def arun(self, poll_interval=None, stats_interval=60, stop=None, jobs=()):
+        """run() on the event loop; jobs run through sync_to_async."""
+        poll_interval = poll_interval or getattr(settings, "MAIL_WORKER_POLL_INTERVAL", 2)
+        last_report = time.monotonic()
+        logger.info(
+            "Async mail worker started: %d requests in flight, %.1f requests/s",
+            self.concurrency, self.bucket.rate,
+        )
+        while not (stop and stop()):
+            await sync_to_async(close_old_connections)()
+            claimed = 0
+            for job in (*(sync_to_async(job) for job in jobs), self.adrain_once):
+                try:
+                    claimed += await job()
+                except Exception:
+                    logger.exception("Mail worker round failed")
+
+            if time.monotonic() - last_report >= stats_interval:
+                logger.info("Mail worker stats: %s", self.stats.snapshot())
+                last_report = time.monotonic()
+
+            if not claimed:
+                await asyncio.sleep(poll_interval)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from seminars.models import Seminar
+from seminars.tasks import queue_pending_notifications, queue_seminar_notifications
+
+
+class Command(BaseCommand):
+    help = (
+        "Queue new-seminar emails for seminars the mail worker hasn't handled yet, "
+        "or again for one seminar (recipients already queued are skipped)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seminar", type=int, help="Re-run this seminar even if it was already queued")
+
+    def handle(self, *args, **options):
+        if options["seminar"]:
+            seminar = Seminar._base_manager.filter(id=options["seminar"]).first()
+            if seminar is None:
+                raise CommandError(f"Seminar {options['seminar']} does not exist")
+            queued = queue_seminar_notifications(seminar)
+            self.stdout.write(self.style.SUCCESS(f"Seminar {seminar.id}: {queued} recipients considered"))
+            return
+
+        total = 0
+        while True:
+            handled = queue_pending_notifications()
+            if not handled:
+                break
+            total += handled
+        self.stdout.write(self.style.SUCCESS(f"Queued notifications for {total} seminars"))
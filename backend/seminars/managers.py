@@ -5,5 +5,6 @@ class SeminarManager(models.Manager):
     def get_queryset(self):
         qs = super().get_queryset()
         now = timezone.now()
-        qs.filter(is_done=False, date_end__lt=now).update(is_done=True)
+        # update() skips auto_now; set updated_at so conditional GETs see the change
+        qs.filter(is_done=False, date_end__lt=now).update(is_done=True, updated_at=now)
         return qs
\ No newline at end of file
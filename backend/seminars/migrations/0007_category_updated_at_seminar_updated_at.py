@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # SeminarNotification was created and dropped again before release;
+    # databases that ran those migrations get this one marked as applied
+    replaces = [
+        ('seminars', '0007_seminarnotification'),
+        ('seminars', '0008_delete_seminarnotification'),
+        ('seminars', '0009_category_updated_at_seminar_updated_at'),
+    ]
+
+    dependencies = [
+        ('seminars', '0006_assign_other_category'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='seminar',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
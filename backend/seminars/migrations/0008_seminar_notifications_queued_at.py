@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-20 09:40
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def mark_existing_seminars(apps, schema_editor):
+    # Existing seminars were announced when they were created
+    Seminar = apps.get_model("seminars", "Seminar")
+    Seminar.objects.update(notifications_queued_at=F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seminars', '0007_category_updated_at_seminar_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='seminar',
+            name='notifications_queued_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(mark_existing_seminars, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-19 20:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seminars', '0008_seminar_notifications_queued_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='seminar',
+            name='notification_attempts',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='seminar',
+            name='notifications_retry_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -10,6 +10,7 @@ User = settings.AUTH_USER_MODEL
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["name"]
@@ -27,6 +28,12 @@ class Seminar(models.Model):
     duration_minutes = models.PositiveIntegerField(null=True, blank=True)
     is_done = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Set once the new-seminar emails are in the outbox (seminars.tasks)
+    notifications_queued_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Failed queuing runs and when the worker may try again
+    notification_attempts = models.PositiveSmallIntegerField(default=0, editable=False)
+    notifications_retry_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     objects = SeminarManager()
 
@@ -55,8 +62,3 @@ class PlannedSeminar(models.Model):
 
     def __str__(self):
         return f"{self.user} plans to attend {self.seminar}"
-
-
-
-
-
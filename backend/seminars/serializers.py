@@ -62,7 +62,8 @@ class SeminarSerializer(serializers.ModelSerializer):
 
 class PlannedSeminarSerializer(serializers.ModelSerializer):
     user = serializers.PrimaryKeyRelatedField(read_only=True)
-    seminar = serializers.PrimaryKeyRelatedField(queryset=Seminar.objects.all())
+    # _base_manager: Seminar.objects runs SeminarManager's UPDATE, here at import time
+    seminar = serializers.PrimaryKeyRelatedField(queryset=Seminar._base_manager.all())
 
     class Meta:
         model = PlannedSeminar
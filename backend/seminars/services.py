@@ -1,51 +1,85 @@
-import sib_api_v3_sdk
-from sib_api_v3_sdk.rest import ApiException
+import logging
+
 from django.conf import settings
-from users.models import CustomUser
 from django.template.loader import render_to_string
-from django.conf import settings
+from django.utils.html import escape
+from mailer.models import OutboxEmail
+from mailer.outbox import enqueue_emails
+from users.models import CustomUser
+
+logger = logging.getLogger(__name__)
+
+# Brevo substitutes these per recipient from each message version's params
+RECIPIENT_PLACEHOLDERS = {
+    "first_name": "{{ params.FIRST_NAME }}",
+    "username": "{{ params.USERNAME }}",
+}
+
+
+def notification_dedupe_key(seminar_id, user_id):
+    return f"seminar-notification:{seminar_id}:{user_id}"
+
 
 def get_notification_recipients():
-    return CustomUser.objects.filter(
+    recipients = CustomUser.objects.filter(
         role="participant",
         email_notification_pref__enabled=True
-    ).select_related("email_notification_pref")
+    )
+    return recipients.only("id", "email", "first_name", "last_name", "username").order_by("id")
 
-def send_new_seminar_emails(seminar):
-    recipients = get_notification_recipients()
-    print("function called")
-    if not recipients.exists():
-        return
 
-    configuration = sib_api_v3_sdk.Configuration()
-    configuration.api_key['api-key'] = settings.BREVO_API_KEY
+def render_new_seminar_email(seminar):
+    """Render the notification once, with Brevo placeholders where the recipient goes."""
+    return render_to_string("new_seminar_notif.html", {
+        "user": RECIPIENT_PLACEHOLDERS,
+        "seminar": seminar,
+        "site_name": "The Podium",
+        "BASE_URL": settings.BASE_URL,
+    })
+
 
-    api_instance = sib_api_v3_sdk.TransactionalEmailsApi(
-        sib_api_v3_sdk.ApiClient(configuration)
+def _outbox_row(seminar, subject, html, user):
+    return OutboxEmail(
+        kind=OutboxEmail.KIND_SEMINAR_NOTIFICATION,
+        to_email=user.email,
+        to_name=user.get_full_name() or user.username,
+        subject=subject,
+        html_content=html,
+        params={
+            "FIRST_NAME": escape(user.first_name or user.username),
+            "USERNAME": escape(user.username),
+        },
+        # The mail worker sends rows with the same batch_key as one
+        # Brevo request with a message version per recipient
+        batch_key=f"seminar:{seminar.id}",
+        dedupe_key=notification_dedupe_key(seminar.id, user.id),
     )
 
-    sender = {
-        "name": settings.BREVO_SENDER_NAME,
-        "email": settings.BREVO_SENDER_EMAIL,
-    }
 
+def send_new_seminar_emails(seminar):
+    """
+    Queue the new-seminar email for every opted-in participant.
+    Renders the template once and bulk inserts one outbox row per recipient,
+    SEMINAR_NOTIFICATION_BATCH_SIZE at a time. Dedupe keys make a re-run
+    skip anyone already queued. Returns how many recipients were considered.
+    """
+    batch_size = getattr(settings, "SEMINAR_NOTIFICATION_BATCH_SIZE", 500)
+    recipients = get_notification_recipients().iterator(chunk_size=batch_size)
+
+    html = render_new_seminar_email(seminar)
+    subject = f"New Seminar: {seminar.title}"
+
+    queued = 0
+    rows = []
     for user in recipients:
-        html = render_to_string("new_seminar_notif.html", {
-            "user": user,
-            "seminar": seminar,
-            "site_name": "The Podium",
-            "BASE_URL" : settings.BASE_URL,
-        })
-
-        email = sib_api_v3_sdk.SendSmtpEmail(
-            to=[{"email": user.email, "name": user.get_full_name() or user.username}],
-            sender=sender,
-            subject=f"New Seminar: {seminar.title}",
-            html_content=html,
-        )
-
-        try:
-            api_instance.send_transac_email(email)
-            print("email sent")
-        except ApiException as e:
-            print(f"Email failed for {user.email}: {e}")
+        rows.append(_outbox_row(seminar, subject, html, user))
+        if len(rows) >= batch_size:
+            enqueue_emails(rows, batch_size=batch_size)
+            queued += len(rows)
+            rows = []
+    if rows:
+        enqueue_emails(rows, batch_size=batch_size)
+        queued += len(rows)
+
+    logger.info("Seminar %s notifications queued for %d recipients", seminar.id, queued)
+    return queued
@@ -0,0 +1,82 @@
+# seminars/tasks.py
+"""
+Queueing of new-seminar notifications, so creating a seminar doesn't hold
+the admin's request open while thousands of outbox rows are inserted.
+
+A new seminar is saved with notifications_queued_at empty, which makes
+the seminar table the queue. The mail worker (manage.py run_mail_worker)
+calls queue_pending_notifications() every round: each seminar is claimed
+with skip_locked and fanned out into the outbox in one transaction, and it
+is marked in that same transaction. A worker killed mid-seminar rolls back,
+and the next round starts that seminar again. A seminar whose queuing
+fails is retried with backoff and given up on after
+SEMINAR_NOTIFICATION_MAX_ATTEMPTS failures. Dedupe keys mean a re-run
+never queues anyone twice. manage.py queue_seminar_notifications runs the
+same step by hand, and with --seminar retries one that was given up on.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Seminar
+from .services import send_new_seminar_emails
+
+logger = logging.getLogger(__name__)
+
+
+def queue_seminar_notifications(seminar):
+    """Fan one seminar's notification out into the outbox and mark it queued."""
+    with transaction.atomic():
+        queued = send_new_seminar_emails(seminar)
+        Seminar._base_manager.filter(pk=seminar.pk).update(notifications_queued_at=timezone.now())
+    return queued
+
+
+def _record_failure(seminar, now):
+    attempts = seminar.notification_attempts + 1
+    max_attempts = getattr(settings, "SEMINAR_NOTIFICATION_MAX_ATTEMPTS", 5)
+    delay = getattr(settings, "SEMINAR_NOTIFICATION_RETRY_DELAY", 60) * 2 ** (attempts - 1)
+    Seminar._base_manager.filter(pk=seminar.pk).update(
+        notification_attempts=attempts,
+        notifications_retry_at=now + timedelta(seconds=delay),
+    )
+    if attempts >= max_attempts:
+        logger.error(
+            "Giving up on new seminar notifications for seminar %s after %d attempts", seminar.id, attempts,
+        )
+
+
+def queue_pending_notifications(limit=10):
+    """Queue notifications for up to limit new seminars; returns how many were handled."""
+    handled = tried = 0
+    max_attempts = getattr(settings, "SEMINAR_NOTIFICATION_MAX_ATTEMPTS", 5)
+    while tried < limit:
+        tried += 1
+        now = timezone.now()
+        with transaction.atomic():
+            # _base_manager: SeminarManager's UPDATE isn't wanted on every poll
+            seminar = (
+                Seminar._base_manager.filter(
+                    Q(notifications_retry_at__isnull=True) | Q(notifications_retry_at__lte=now),
+                    notifications_queued_at__isnull=True,
+                    notification_attempts__lt=max_attempts,
+                )
+                .select_for_update(skip_locked=True)
+                .order_by("id")
+                .first()
+            )
+            if seminar is None:
+                break
+            try:
+                queue_seminar_notifications(seminar)
+            except Exception:
+                # Rolled back and left unmarked; pushed back so this round moves on
+                logger.exception("New seminar notifications for seminar %s failed", seminar.id)
+                _record_failure(seminar, now)
+                continue
+        handled += 1
+    return handled
@@ -1,3 +1,91 @@
-from django.test import TestCase
+# seminars/tests.py
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from mailer.models import OutboxEmail
+from seminars.models import Seminar
+from seminars.services import send_new_seminar_emails
+from seminars.tasks import queue_pending_notifications
+from users.models import CustomUser, EmailNotificationPreference
+
+
+class SeminarNotificationQueueTests(TestCase):
+    """New seminars wait in the seminar table until their emails are in the outbox."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(3):
+            user = CustomUser.objects.create_user(f"fan{i}", f"fan{i}@example.com", "Passw0rd!", role="participant")
+            EmailNotificationPreference.objects.create(user=user, enabled=True)
+
+    def create_seminar(self, title="Soil Science"):
+        start = timezone.now() + timedelta(days=7)
+        return Seminar.objects.create(title=title, date_start=start, date_end=start + timedelta(hours=2))
+
+    def test_queued_by_worker_job(self):
+        seminar = self.create_seminar()
+        self.assertFalse(OutboxEmail.objects.exists())
+
+        self.assertEqual(queue_pending_notifications(), 1)
+        self.assertEqual(OutboxEmail.objects.filter(batch_key=f"seminar:{seminar.id}").count(), 3)
+        seminar.refresh_from_db()
+        self.assertIsNotNone(seminar.notifications_queued_at)
+        self.assertEqual(queue_pending_notifications(), 0)
+
+    def test_failure_leaves_seminar_pending(self):
+        failing, other = self.create_seminar("Broken"), self.create_seminar("Fine")
+
+        def send(seminar):
+            queued = send_new_seminar_emails(seminar)
+            if seminar.id == failing.id:
+                raise RuntimeError("worker died")
+            return queued
+
+        with mock.patch("seminars.tasks.send_new_seminar_emails", side_effect=send):
+            self.assertEqual(queue_pending_notifications(), 1)
+
+        # Rolled back: nothing queued for the failed seminar, which is still pending
+        self.assertFalse(OutboxEmail.objects.filter(batch_key=f"seminar:{failing.id}").exists())
+        self.assertEqual(OutboxEmail.objects.filter(batch_key=f"seminar:{other.id}").count(), 3)
+        self.assertEqual(list(Seminar._base_manager.filter(notifications_queued_at__isnull=True)), [failing])
+
+        # Backed off, then queued once the retry time has passed
+        self.assertEqual(queue_pending_notifications(), 0)
+        Seminar._base_manager.filter(pk=failing.pk).update(notifications_retry_at=timezone.now())
+        self.assertEqual(queue_pending_notifications(), 1)
+        self.assertEqual(OutboxEmail.objects.filter(batch_key=f"seminar:{failing.id}").count(), 3)
+
+    @override_settings(SEMINAR_NOTIFICATION_MAX_ATTEMPTS=2, SEMINAR_NOTIFICATION_RETRY_DELAY=60)
+    def test_gives_up_after_max_attempts(self):
+        seminar = self.create_seminar()
+        with mock.patch("seminars.tasks.send_new_seminar_emails", side_effect=RuntimeError("bad template")):
+            for attempts in (1, 2):
+                Seminar._base_manager.filter(pk=seminar.pk).update(notifications_retry_at=None)
+                self.assertEqual(queue_pending_notifications(), 0)
+                seminar.refresh_from_db()
+                self.assertEqual(seminar.notification_attempts, attempts)
+            self.assertGreater(seminar.notifications_retry_at, timezone.now() + timedelta(seconds=100))
+
+            Seminar._base_manager.filter(pk=seminar.pk).update(notifications_retry_at=None)
+            self.assertEqual(queue_pending_notifications(), 0)
+            self.assertEqual(Seminar._base_manager.get(pk=seminar.pk).notification_attempts, 2)
+            self.assertIsNone(seminar.notifications_queued_at)
+
+        # Still possible by hand
+        call_command("queue_seminar_notifications", seminar=seminar.id, stdout=mock.MagicMock())
+        self.assertEqual(OutboxEmail.objects.filter(batch_key=f"seminar:{seminar.id}").count(), 3)
+
+    def test_command_reruns_without_duplicates(self):
+        seminar = self.create_seminar()
+        call_command("queue_seminar_notifications", stdout=mock.MagicMock())
+        OutboxEmail.objects.filter(to_email="fan0@example.com").delete()
+
+        call_command("queue_seminar_notifications", seminar=seminar.id, stdout=mock.MagicMock())
+        self.assertEqual(
+            sorted(OutboxEmail.objects.values_list("to_email", flat=True)),
+            ["fan0@example.com", "fan1@example.com", "fan2@example.com"],
+        )
@@ -17,29 +17,29 @@ from rest_framework import status, permissions
 from django.shortcuts import get_object_or_404
 from .models import Seminar
 from .serializers import SeminarSerializer
+from api.conditional import conditional_get, seminar_catalog, seminar_rows
+from api.dashboard import invalidate_dashboard
 
 class SeminarListCreateAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
-    def get(self, request):
-        # Automatically mark seminars as done if past end date
-        Seminar.objects.filter(
-            date_end__lt=timezone.now(),
-            is_done=False
-        ).update(is_done=True)
+    def get_queryset(self, request, manager=Seminar.objects):
+        # SeminarManager marks seminars past their end date as done on every query
 
         # 1️⃣ Base queryset (role-based)
-        if request.user.role == "admin":
-            seminars = Seminar.objects.all()
-        else:
-            seminars = Seminar.objects.filter(is_done=False)
+        seminars = manager.select_related("category", "certificate_template")
+        if request.user.role != "admin":
+            seminars = seminars.filter(is_done=False)
 
         # 2️⃣ Optional category filter
         category_id = request.query_params.get("category")
         if category_id:
             seminars = seminars.filter(category_id=category_id)
+        return seminars
 
-        serializer = SeminarSerializer(seminars, many=True)
+    @conditional_get(lambda view, request: [view.get_queryset(request, seminar_rows()), *seminar_catalog()])
+    def get(self, request):
+        serializer = SeminarSerializer(self.get_queryset(request), many=True)
         return Response(serializer.data)
 
 
@@ -56,8 +56,9 @@ class SeminarListCreateAPIView(APIView):
 # Retrieve, update, delete a specific seminar by ID
 class SeminarDetailAPIView(APIView):
     def get_object(self, pk):               #helper function
-        return get_object_or_404(Seminar, pk=pk) 
+        return get_object_or_404(Seminar.objects.select_related("category", "certificate_template"), pk=pk)
 
+    @conditional_get(lambda view, request, pk: [seminar_rows().filter(pk=pk), *seminar_catalog()])
     def get(self, request, pk):
         seminar = self.get_object(pk)
         serializer = SeminarSerializer(seminar)
@@ -82,7 +83,10 @@ class PlannedSeminarAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        planned_seminars = PlannedSeminar.objects.filter(user=request.user, seminar__is_done=False)
+        planned_seminars = (
+            PlannedSeminar.objects.filter(user=request.user, seminar__is_done=False)
+            .select_related("seminar__category", "seminar__certificate_template")
+        )
         serializer = PlannedSeminarSerializer(planned_seminars, many=True)
         return Response(serializer.data)
 
@@ -105,12 +109,15 @@ class PlannedSeminarDetailAPIView(APIView):
     def delete(self, request, pk):
         planned_seminar = self.get_object(pk, request.user)
         planned_seminar.delete()
+        # No post_delete receiver for planned seminars (api.signals)
+        invalidate_dashboard(request.user.id)
         return Response(status=status.HTTP_204_NO_CONTENT)
     
 
 class CategoryListCreateAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional_get(lambda view, request: [Category.objects.all()])
     def get(self, request):
         categories = Category.objects.all()
         serializer = CategorySerializer(categories, many=True)
@@ -1,9 +1,15 @@
 from django.contrib import admin
-from .models import EmailChangeRequest
+from .models import EmailChangeRequest, ParticipantImport
 
 @admin.register(EmailChangeRequest)
 class EmailChangeRequestAdmin(admin.ModelAdmin):
     list_display = ['user', 'new_email', 'verification_code', 'created_at', 'expires_at', 'attempts', 'is_used']
     list_filter = ['is_used', 'created_at']
     search_fields = ['user__username', 'user__email', 'new_email']
-    readonly_fields = ['verification_code', 'created_at', 'expires_at']
\ No newline at end of file
+    readonly_fields = ['verification_code', 'created_at', 'expires_at']
+
+@admin.register(ParticipantImport)
+class ParticipantImportAdmin(admin.ModelAdmin):
+    list_display = ['id', 'filename', 'status', 'created_by', 'created_at', 'updated_at']
+    list_filter = ['status']
+    readonly_fields = ['created_by', 'filename', 'status', 'result', 'error', 'created_at', 'updated_at']
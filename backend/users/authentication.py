@@ -0,0 +1,71 @@
+# users/authentication.py
+"""
+Token authentication that caches token -> user.
+
+DRF's TokenAuthentication joins Token and CustomUser on every request.
+CachedTokenAuthentication keeps that row in TOKEN_AUTH_CACHE, a cache
+alias every worker process shares (Redis, Memcached, the database cache),
+for up to TOKEN_AUTH_CACHE_TTL seconds. users.signals deletes entries there
+on logout (token delete) and on user save/delete, which covers password
+changes and deactivation, so every process stops accepting the old state
+at once. There is deliberately no per-process layer: entries another
+process can't invalidate would keep a deactivated user signed in. Without
+TOKEN_AUTH_CACHE nothing is cached.
+"""
+import hashlib
+import pickle
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+
+def _cache():
+    alias = getattr(settings, "TOKEN_AUTH_CACHE", None)
+    return caches[alias] if alias else None
+
+
+def _cache_key(key):
+    # Never put raw tokens into cache keys
+    return "token-auth:" + hashlib.sha256(key.encode()).hexdigest()
+
+
+def invalidate_token(key):
+    cache = _cache()
+    if cache is not None:
+        cache.delete(_cache_key(key))
+
+
+def invalidate_user(user_id):
+    cache = _cache()
+    if cache is not None:
+        from rest_framework.authtoken.models import Token
+
+        keys = Token.objects.filter(user_id=user_id).values_list("key", flat=True)
+        cache.delete_many([_cache_key(key) for key in keys])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+
+    def authenticate_credentials(self, key):
+        cache = _cache()
+        if cache is None:
+            return super().authenticate_credentials(key)
+
+        payload = cache.get(_cache_key(key))
+        if payload is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set(
+                _cache_key(key),
+                pickle.dumps(user, protocol=pickle.HIGHEST_PROTOCOL),
+                getattr(settings, "TOKEN_AUTH_CACHE_TTL", 30),
+            )
+            return (user, token)
+
+        # Each request gets its own copy, so views can't modify the cached user
+        user = pickle.loads(payload)
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+        # The token was cached on the user by the select_related lookup
+        return (user, user.auth_token)
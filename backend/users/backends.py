@@ -0,0 +1,41 @@
+# users/backends.py
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+
+class EmailOrUsernameBackend(ModelBackend):
+    """
+    Log in with a username or an email address (case-insensitive).
+    Resolves the account in one query, served by the username index and the
+    unique index on lower(email), and always runs exactly one password hash.
+    """
+
+    def get_login_user(self, login):
+        candidates = list(
+            get_user_model()._default_manager
+            .alias(email_lower=Lower("email"))
+            .filter(Q(username=login) | Q(email_lower=login.lower()))[:2]
+        )
+        # A username match wins over someone else's email
+        for user in candidates:
+            if user.username == login:
+                return user
+        return candidates[0] if candidates else None
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(get_user_model().USERNAME_FIELD)
+        if not username or password is None:
+            return None
+
+        user = self.get_login_user(username.strip())
+        if user is None:
+            # Hash anyway so unknown accounts take as long as wrong passwords
+            get_user_model()().set_password(password)
+            return None
+
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
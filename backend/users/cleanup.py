@@ -0,0 +1,69 @@
+# users/cleanup.py
+"""
+Sweeper for EmailChangeRequest rows. Codes are single use and expire after
+an hour, so anything used or expired can go; deleting in bounded batches
+keeps each transaction and its locks short. The mail worker (manage.py
+run_mail_worker) sweeps every EMAIL_CHANGE_SWEEP_INTERVAL seconds through
+EmailChangeSweeper; manage.py sweep_email_change_requests runs a sweep by hand.
+"""
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import EmailChangeRequest
+
+
+def _delete_in_batches(queryset, batch_size, pause, max_batches):
+    deleted = batches = 0
+    while max_batches is None or batches < max_batches:
+        ids = list(queryset.order_by().values_list("id", flat=True)[:batch_size])
+        if not ids:
+            break
+        # No cascades or signals on this model, so this is a single DELETE
+        deleted += EmailChangeRequest.objects.filter(id__in=ids).delete()[0]
+        batches += 1
+        if len(ids) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return deleted, batches
+
+
+def sweep_email_change_requests(batch_size=1000, pause=0, max_batches=None, now=None):
+    """
+    Delete used requests, then unused ones past expires_at, at most
+    batch_size rows per statement. Returns {"used": n, "expired": n}.
+    """
+    now = now or timezone.now()
+    used, batches = _delete_in_batches(
+        EmailChangeRequest.objects.filter(is_used=True), batch_size, pause, max_batches,
+    )
+    expired = 0
+    if max_batches is None or batches < max_batches:
+        expired, _ = _delete_in_batches(
+            EmailChangeRequest.objects.filter(is_used=False, expires_at__lt=now),
+            batch_size, pause, None if max_batches is None else max_batches - batches,
+        )
+    return {"used": used, "expired": expired}
+
+
+class EmailChangeSweeper:
+    """A sweep at most every `interval` seconds, for the mail worker's loop."""
+
+    def __init__(self, interval=None, batch_size=1000, max_batches=None):
+        self.interval = interval or getattr(settings, "EMAIL_CHANGE_SWEEP_INTERVAL", 3600)
+        self.batch_size = batch_size
+        # Bounded so one round never holds up email for long
+        self.max_batches = max_batches or getattr(settings, "EMAIL_CHANGE_SWEEP_MAX_BATCHES", 10)
+        self.next_run = 0.0
+
+    def run_due(self):
+        """Sweep if the interval has passed. Returns how many rows were deleted."""
+        if time.monotonic() < self.next_run:
+            return 0
+        deleted = sum(sweep_email_change_requests(self.batch_size, max_batches=self.max_batches).values())
+        # A sweep that hit max_batches left rows behind; carry on next round
+        if deleted < self.batch_size * self.max_batches:
+            self.next_run = time.monotonic() + self.interval
+        return deleted
@@ -0,0 +1,17 @@
+# users/hashing.py
+"""
+Process-pool entry points for password hashing. Kept free of model
+imports: spawned workers import this module before Django is set up.
+"""
+from django.utils.module_loading import import_string
+
+
+def init_worker():
+    import django
+    django.setup()
+
+
+def hash_passwords(hasher_path, passwords):
+    """make_password() with a hasher chosen by the parent, so its settings apply here too."""
+    hasher = import_string(hasher_path)()
+    return [hasher.encode(password, hasher.salt()) for password in passwords]
@@ -0,0 +1,306 @@
+# users/importer.py
+"""
+Bulk participant import from CSV.
+
+Rows are validated together (one pair of queries per chunk checks
+usernames and emails against the database), passwords are hashed on a
+process pool since PBKDF2 is CPU bound and holds the GIL, and users,
+their allauth email addresses and notification preferences are inserted
+with bulk_create in the same batch transaction. A user created between
+validation and the insert only costs that batch a row-by-row retry, and
+the conflicting row is reported like any other error.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import csv
+import io
+import multiprocessing
+import os
+import time
+
+from allauth.account.models import EmailAddress
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.contrib.auth.password_validation import validate_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+
+from .hashing import hash_passwords, init_worker
+from .models import CustomUser, EmailNotificationPreference
+
+REQUIRED_COLUMNS = ("username", "email")
+OPTIONAL_COLUMNS = ("first_name", "last_name", "password")
+
+# Passwords sent to a pool worker per task; big enough to amortise pickling
+HASH_CHUNK_SIZE = 64
+LOOKUP_CHUNK_SIZE = 1000
+# Seconds between heartbeat() calls while hashing and inserting
+HEARTBEAT_SECONDS = 30
+# Errors kept on the result (and in ParticipantImport.result); the rest are only counted
+MAX_ERRORS = 1000
+
+_username_validator = UnicodeUsernameValidator()
+
+
+class ImportResult:
+    def __init__(self):
+        self.total_rows = 0
+        self.created = 0
+        self.hashed = 0
+        self.errors = []
+        self.error_count = 0
+        self.validate_seconds = 0.0
+        # Hashing and inserting overlap, so they are timed together
+        self.write_seconds = 0.0
+        self.seconds = 0.0
+
+    def add_error(self, line, error):
+        self.error_count += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append({"line": line, "error": error})
+
+    @property
+    def rows_per_second(self):
+        return round(self.created / self.seconds, 1) if self.seconds else 0.0
+
+    def to_dict(self):
+        return {
+            "total_rows": self.total_rows,
+            "created": self.created,
+            "skipped": self.total_rows - self.created,
+            "hashed_passwords": self.hashed,
+            "errors": self.errors,
+            "error_count": self.error_count,
+            "seconds": round(self.seconds, 3),
+            "validate_seconds": round(self.validate_seconds, 3),
+            "write_seconds": round(self.write_seconds, 3),
+            "rows_per_second": self.rows_per_second,
+        }
+
+
+def read_rows(file_obj):
+    """[(line number, row dict)] from a CSV file object or string; raises ValueError on bad headers."""
+    if isinstance(file_obj, str):
+        file_obj = io.StringIO(file_obj)
+    elif isinstance(file_obj, (bytes, bytearray)):
+        file_obj = io.StringIO(file_obj.decode("utf-8-sig"))
+
+    reader = csv.DictReader(file_obj)
+    if not reader.fieldnames:
+        raise ValueError("The CSV file is empty")
+    reader.fieldnames = [(name or "").strip().lower().lstrip("\ufeff") for name in reader.fieldnames]
+    missing = [column for column in REQUIRED_COLUMNS if column not in reader.fieldnames]
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+
+    columns = REQUIRED_COLUMNS + OPTIONAL_COLUMNS
+    return [
+        (reader.line_num, {column: (row.get(column) or "").strip() for column in columns})
+        for row in reader
+    ]
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _existing(usernames, emails):
+    """Usernames and lowercased emails that are already taken."""
+    taken_usernames, taken_emails = set(), set()
+    for chunk in _chunks(usernames, LOOKUP_CHUNK_SIZE):
+        taken_usernames.update(CustomUser.objects.filter(username__in=chunk).values_list("username", flat=True))
+    for chunk in _chunks(emails, LOOKUP_CHUNK_SIZE):
+        taken_emails.update(
+            CustomUser.objects.annotate(email_lower=Lower("email"))
+            .filter(email_lower__in=chunk)
+            .values_list("email_lower", flat=True)
+        )
+    return taken_usernames, taken_emails
+
+
+def _row_error(row, check_passwords):
+    username, email, password = row["username"], row["email"], row["password"]
+    if not username:
+        return "username is required"
+    if len(username) > 150:
+        return "username is longer than 150 characters"
+    try:
+        _username_validator(username)
+    except ValidationError:
+        return "username may only contain letters, digits and @/./+/-/_"
+    if not email:
+        return "email is required"
+    try:
+        validate_email(email)
+    except ValidationError:
+        return f"invalid email '{email}'"
+    if password and check_passwords:
+        try:
+            validate_password(password, CustomUser(username=username, email=email,
+                                                   first_name=row["first_name"], last_name=row["last_name"]))
+        except ValidationError as e:
+            return " ".join(e.messages)
+    return None
+
+
+def validate_rows(rows, result, check_passwords=True):
+    """Rows that can be imported; everything else is recorded on result.errors."""
+    valid = []
+    seen_usernames, seen_emails = set(), set()
+    for line, row in rows:
+        error = _row_error(row, check_passwords)
+        if error is None:
+            email = row["email"].lower()
+            if row["username"] in seen_usernames:
+                error = f"duplicate username '{row['username']}' in file"
+            elif email in seen_emails:
+                error = f"duplicate email '{row['email']}' in file"
+            seen_usernames.add(row["username"])
+            seen_emails.add(email)
+        if error:
+            result.add_error(line, error)
+        else:
+            valid.append((line, row))
+
+    taken_usernames, taken_emails = _existing(
+        [row["username"] for _, row in valid],
+        [row["email"].lower() for _, row in valid],
+    )
+    if not taken_usernames and not taken_emails:
+        return valid
+
+    remaining = []
+    for line, row in valid:
+        if row["username"] in taken_usernames:
+            result.add_error(line, f"username '{row['username']}' already exists")
+        elif row["email"].lower() in taken_emails:
+            result.add_error(line, f"email '{row['email']}' is already registered")
+        else:
+            remaining.append((line, row))
+    return remaining
+
+
+def _hash_pool(workers):
+    # spawn rather than fork: the admin endpoint runs this from a thread
+    # inside a multithreaded web worker, where forking is unsafe
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+    )
+
+
+def _with_password_hashes(rows, pool):
+    """
+    Yield (line, row, password hash) in file order. Rows without a password get
+    an unusable one (they set theirs through forgot-password) and skip the pool.
+    All chunks are submitted up front so hashing runs ahead of the inserts.
+    """
+    to_hash = [row["password"] for _, row in rows if row["password"]]
+    hasher = get_hasher()
+    hash_chunk = partial(hash_passwords, f"{type(hasher).__module__}.{type(hasher).__qualname__}")
+    # Chunk by chunk in-process too, so rows (and heartbeats) come out while hashing
+    mapper = pool.map if to_hash and pool is not None else map
+    hashed = (h for chunk in mapper(hash_chunk, _chunks(to_hash, HASH_CHUNK_SIZE)) for h in chunk)
+    for line, row in rows:
+        yield line, row, next(hashed) if row["password"] else make_password(None)
+
+
+def _insert_batch(batch, notifications_enabled):
+    with transaction.atomic():
+        users = CustomUser.objects.bulk_create([
+            CustomUser(
+                username=row["username"],
+                email=row["email"],
+                first_name=row["first_name"],
+                last_name=row["last_name"],
+                password=password,
+                role="participant",
+            )
+            for _, row, password in batch
+        ])
+        EmailAddress.objects.bulk_create([
+            EmailAddress(user=user, email=user.email, primary=True, verified=False)
+            for user in users
+        ])
+        EmailNotificationPreference.objects.bulk_create([
+            EmailNotificationPreference(user=user, enabled=notifications_enabled)
+            for user in users
+        ])
+    return len(users)
+
+
+def _conflict_error(row):
+    taken_usernames, _ = _existing([row["username"]], [])
+    if taken_usernames:
+        return f"username '{row['username']}' already exists"
+    return f"email '{row['email']}' is already registered"
+
+
+def _write_batch(batch, notifications_enabled, result):
+    """Insert a batch; if another writer took one of its usernames or emails meanwhile, go row by row."""
+    try:
+        result.created += _insert_batch(batch, notifications_enabled)
+        return
+    except IntegrityError:
+        pass
+    for item in batch:
+        try:
+            result.created += _insert_batch([item], notifications_enabled)
+        except IntegrityError:
+            result.add_error(item[0], _conflict_error(item[1]))
+
+
+def import_participants(file_obj, workers=None, batch_size=1000, dry_run=False,
+                        notifications_enabled=False, check_passwords=True, progress=None, heartbeat=None):
+    """
+    Validate and create participants from a CSV with username, email and
+    optional first_name, last_name and password columns. Invalid or
+    conflicting rows are reported and skipped; the rest are imported.
+    progress(result) is called after every inserted batch, and heartbeat()
+    about every HEARTBEAT_SECONDS while a batch is being hashed.
+    """
+    result = ImportResult()
+    started = time.perf_counter()
+
+    rows = read_rows(file_obj)
+    result.total_rows = len(rows)
+    valid = validate_rows(rows, result, check_passwords=check_passwords)
+    result.validate_seconds = time.perf_counter() - started
+
+    if dry_run or not valid:
+        result.seconds = time.perf_counter() - started
+        return result
+
+    hashing = sum(1 for _, row in valid if row["password"])
+    workers = workers or os.cpu_count() or 1
+    pool = _hash_pool(workers) if hashing > HASH_CHUNK_SIZE and workers > 1 else None
+    write_started = time.perf_counter()
+    last_beat = time.monotonic()
+    try:
+        batch = []
+        for item in _with_password_hashes(valid, pool):
+            if heartbeat and time.monotonic() - last_beat >= HEARTBEAT_SECONDS:
+                heartbeat()
+                last_beat = time.monotonic()
+            batch.append(item)
+            if len(batch) >= batch_size:
+                _write_batch(batch, notifications_enabled, result)
+                batch = []
+                if progress:
+                    progress(result)
+        if batch:
+            _write_batch(batch, notifications_enabled, result)
+            if progress:
+                progress(result)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    result.hashed = hashing
+    result.write_seconds = time.perf_counter() - write_started
+    result.seconds = time.perf_counter() - started
+    return result
@@ -0,0 +1,122 @@
+from concurrent.futures import ThreadPoolExecutor
+import statistics
+import time
+from unittest import mock
+
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework import serializers
+
+from users.models import CustomUser
+from users.serializers import CustomLoginSerializer
+
+
+def legacy_login(username, password):
+    """The pre-backend CustomLoginSerializer.validate lookup, for comparison."""
+    user = authenticate(username=username, password=password)
+    if not user:
+        user_queryset = CustomUser.objects.filter(email=username)
+        if user_queryset.count() > 1:
+            return None
+        if user_queryset.exists():
+            user_obj = user_queryset.first()
+            user = authenticate(username=user_obj.username, password=password)
+    return user
+
+
+def current_login(username, password):
+    serializer = CustomLoginSerializer(data={"username": username, "password": password})
+    try:
+        serializer.is_valid(raise_exception=True)
+    except serializers.ValidationError:
+        return None
+    return serializer.validated_data["user"]
+
+
+class Command(BaseCommand):
+    help = "Benchmark login (queries, password hashes, latency, throughput) in a throwaway test database"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--attempts", type=int, default=20, help="Logins per scenario")
+        parser.add_argument("--threads", type=int, default=8, help="Concurrent logins in the load phase")
+        parser.add_argument(
+            "--fast-hasher", action="store_true",
+            help="Use MD5 so the numbers show lookup overhead instead of PBKDF2 cost",
+        )
+
+    def handle(self, *args, **options):
+        hashers = ["django.contrib.auth.hashers.MD5PasswordHasher"] if options["fast_hasher"] else None
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(**({"PASSWORD_HASHERS": hashers} if hashers else {})):
+                self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def run(self, options):
+        password = "correct horse battery"
+        hashed = get_hasher().encode(password, get_hasher().salt())
+        CustomUser.objects.bulk_create([
+            CustomUser(username=f"user{i}", email=f"User{i}@Example.com", password=hashed)
+            for i in range(options["users"])
+        ], batch_size=1000)
+        target = options["users"] // 2
+
+        scenarios = [
+            ("username", f"user{target}", password),
+            ("email (other case)", f"user{target}@example.com", password),
+            ("wrong password", f"user{target}", "wrong"),
+            ("unknown account", "nobody@example.com", password),
+        ]
+
+        hasher_class = type(get_hasher())
+        calls = {"n": 0}
+        original_encode = hasher_class.encode
+
+        def counting_encode(self, *args, **kwargs):
+            calls["n"] += 1
+            return original_encode(self, *args, **kwargs)
+
+        self.stdout.write(f"{'implementation':<16}{'scenario':<22}{'queries':>9}{'hashes':>8}{'ms/login':>10}")
+        with mock.patch.object(hasher_class, "encode", counting_encode):
+            for label, login in (("before", legacy_login), ("after", current_login)):
+                for name, username, secret in scenarios:
+                    calls["n"] = 0
+                    timings = []
+                    with CaptureQueriesContext(connection) as queries:
+                        for _ in range(options["attempts"]):
+                            started = time.perf_counter()
+                            login(username, secret)
+                            timings.append(time.perf_counter() - started)
+                    n = options["attempts"]
+                    self.stdout.write(
+                        f"{label:<16}{name:<22}{len(queries) / n:>9.1f}{calls['n'] / n:>8.1f}"
+                        f"{statistics.median(timings) * 1000:>10.2f}"
+                    )
+
+        # Mixed load against the current implementation
+        total = options["attempts"] * len(scenarios)
+
+        def attempt(i):
+            _, username, secret = scenarios[i % len(scenarios)]
+            try:
+                started = time.perf_counter()
+                current_login(username, secret)
+                return time.perf_counter() - started
+            finally:
+                close_old_connections()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["threads"]) as pool:
+            timings = sorted(pool.map(attempt, range(total)))
+        elapsed = time.perf_counter() - started
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f"load: {total} mixed logins on {options['threads']} threads: "
+            f"{total / elapsed:.1f} logins/s, p50 {statistics.median(timings) * 1000:.1f}ms, p95 {p95 * 1000:.1f}ms"
+        )
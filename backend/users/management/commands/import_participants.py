@@ -0,0 +1,61 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.importer import import_participants
+
+
+class Command(BaseCommand):
+    help = (
+        "Create participants from a CSV with username, email and optional "
+        "first_name, last_name, password columns. Rows without a password get "
+        "an unusable one and set theirs through forgot-password."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_path")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                            help="Processes used to hash passwords")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true", help="Validate and report errors only")
+        parser.add_argument("--notifications", action="store_true",
+                            help="Opt the new participants in to seminar emails")
+        parser.add_argument("--skip-password-validation", action="store_true",
+                            help="Don't run AUTH_PASSWORD_VALIDATORS on the supplied passwords")
+        parser.add_argument("--max-errors", type=int, default=50, help="Errors to print")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["csv_path"], newline="", encoding="utf-8-sig") as f:
+                result = import_participants(
+                    f,
+                    workers=options["workers"],
+                    batch_size=options["batch_size"],
+                    dry_run=options["dry_run"],
+                    notifications_enabled=options["notifications"],
+                    check_passwords=not options["skip_password_validation"],
+                    progress=self.progress,
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for error in result.errors[:options["max_errors"]]:
+            self.stderr.write(f"line {error['line']}: {error['error']}")
+        if result.error_count > options["max_errors"]:
+            self.stderr.write(f"... and {result.error_count - options['max_errors']} more errors")
+
+        summary = result.to_dict()
+        verb = "Would import" if options["dry_run"] else "Imported"
+        valid = result.total_rows - result.error_count
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {valid if options['dry_run'] else result.created} of {result.total_rows} rows "
+            f"({result.error_count} skipped) in {summary['seconds']}s"
+        ))
+        self.stdout.write(
+            f"validate {summary['validate_seconds']}s, hash+insert {summary['write_seconds']}s, "
+            f"{result.hashed} passwords hashed on {options['workers']} processes, "
+            f"{summary['rows_per_second']} rows/s"
+        )
+
+    def progress(self, result):
+        self.stdout.write(f"  {result.created} created")
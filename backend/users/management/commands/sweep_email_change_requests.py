@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.cleanup import sweep_email_change_requests
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete used and expired email change requests in bounded batches. "
+        "The mail worker already does this every EMAIL_CHANGE_SWEEP_INTERVAL seconds"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per DELETE")
+        parser.add_argument("--pause", type=float, default=0.05, help="Seconds to sleep between batches")
+        parser.add_argument("--max-batches", type=int, help="Stop after this many batches")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        deleted = sweep_email_change_requests(
+            batch_size=options["batch_size"],
+            pause=options["pause"],
+            max_batches=options["max_batches"],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {deleted['used']} used and {deleted['expired']} expired email change "
+            f"requests in {time.monotonic() - started:.2f}s"
+        ))
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:33
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+import users.models
+
+
+def check_duplicate_emails(apps, schema_editor):
+    # Fail with a readable list instead of an IntegrityError from the index
+    CustomUser = apps.get_model("users", "CustomUser")
+    duplicates = list(
+        CustomUser.objects.exclude(email="")
+        .annotate(email_lower=Lower("email"))
+        .values("email_lower")
+        .annotate(n=Count("id"))
+        .filter(n__gt=1)
+        .values_list("email_lower", flat=True)[:20]
+    )
+    if duplicates:
+        raise RuntimeError(
+            "Cannot add the case-insensitive unique email constraint; these emails "
+            "belong to more than one account: " + ", ".join(duplicates)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0003_emailnotificationpreference'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='customuser',
+            managers=[
+                ('objects', users.models.CustomUserManager()),
+            ],
+        ),
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='customuser',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), condition=models.Q(('email', ''), _negated=True), name='users_customuser_email_lower_uniq'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_participantimport'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emailchangerequest',
+            index=models.Index(condition=models.Q(('is_used', False)), fields=['user', 'new_email', '-created_at'], name='users_emailchange_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emailchangerequest',
+            index=models.Index(fields=['is_used', 'expires_at'], name='users_emailchange_sweep_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-19 20:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_emailchangerequest_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='participantimport',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='participantimport',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='participantimport',
+            name='content',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='participantimport',
+            name='notifications_enabled',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -1,9 +1,18 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Lower
 from django.utils import timezone
 from datetime import timedelta
 import random
 
+class CustomUserManager(UserManager):
+
+    def with_email(self, email):
+        """Case-insensitive email match that uses the lower(email) index."""
+        return self.alias(email_lower=Lower("email")).filter(email_lower=email.lower())
+
+
 class CustomUser(AbstractUser):
     ROLE_CHOICES = [
         ('admin', 'Admin'),
@@ -11,6 +20,18 @@ class CustomUser(AbstractUser):
     ]
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='participant')
     is_email_verified = models.BooleanField(default=False)
+
+    objects = CustomUserManager()
+
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            # Case-insensitive unique email; also the index behind email login
+            models.UniqueConstraint(
+                Lower("email"),
+                condition=~Q(email=""),
+                name="users_customuser_email_lower_uniq",
+            ),
+        ]
     
     def __str__(self):
         return self.username or self.email
@@ -27,6 +48,17 @@ class EmailChangeRequest(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Pending requests only: RequestEmailChangeView's UPDATE (user) and
+            # VerifyEmailChangeView's latest lookup (user, new_email, newest first)
+            models.Index(
+                fields=['user', 'new_email', '-created_at'],
+                condition=Q(is_used=False),
+                name='users_emailchange_pending_idx',
+            ),
+            # sweep_email_change_requests: used rows, then unused expired ones
+            models.Index(fields=['is_used', 'expires_at'], name='users_emailchange_sweep_idx'),
+        ]
     
     def save(self, *args, **kwargs):
         if not self.pk:  # Only on creation
@@ -57,3 +89,39 @@ class EmailNotificationPreference(models.Model):
     def __str__(self):
         return f"{self.user.username} - {'ON' if self.enabled else 'OFF'}"
 
+
+class ParticipantImport(models.Model):
+    """
+    A CSV participant import started from the admin endpoint. The table is the
+    queue: the mail worker claims pending rows (users.tasks) and runs them.
+    """
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    created_by = models.ForeignKey('CustomUser', on_delete=models.SET_NULL, null=True, related_name='+')
+    filename = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    # ImportResult.to_dict(), refreshed after every inserted batch
+    result = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    # The uploaded CSV, kept until the import finishes so a killed run can be retried
+    content = models.TextField(blank=True, editable=False)
+    notifications_enabled = models.BooleanField(default=False)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Import {self.id} ({self.filename or 'upload'}) - {self.status}"
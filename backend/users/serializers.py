@@ -2,7 +2,7 @@ from rest_framework import serializers
 from .models import CustomUser
 from dj_rest_auth.registration.serializers import RegisterSerializer
 from dj_rest_auth.serializers import LoginSerializer as DefaultLoginSerializer
-from django.contrib.auth import authenticate
+from .backends import EmailOrUsernameBackend
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -13,6 +13,14 @@ class UserSerializer(serializers.ModelSerializer):
             "email", "role", "is_email_verified"
         ]
 
+    def update(self, instance, validated_data):
+        # Save only the submitted fields: instance is usually request.user,
+        # which another request may have changed since it was loaded
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=list(validated_data))
+        return instance
+
 
 class CustomRegisterSerializer(RegisterSerializer):
     first_name = serializers.CharField(required=True)
@@ -46,36 +54,19 @@ class CustomLoginSerializer(serializers.Serializer):
         username = attrs.get('username')
         password = attrs.get('password')
 
-        if username and password:
-            # Try to authenticate with username
-            user = authenticate(username=username, password=password)
-            
-            if not user:
-                # Try to authenticate with email as username
-                try:
-                    # FIX: Get the user by email and check uniqueness
-                    user_queryset = CustomUser.objects.filter(email=username)
-                    
-                    # Check if multiple users have this email (data integrity issue)
-                    if user_queryset.count() > 1:
-                        raise serializers.ValidationError(
-                            'Multiple accounts found with this email. Please contact support.'
-                        )
-                    
-                    # Get the single user with this email
-                    if user_queryset.exists():
-                        user_obj = user_queryset.first()
-                        user = authenticate(username=user_obj.username, password=password)
-                except CustomUser.DoesNotExist:
-                    pass
-
-            if user:
-                if not user.is_active:
-                    raise serializers.ValidationError('User account is disabled.')
-                attrs['user'] = user
-                return attrs
-            else:
-                raise serializers.ValidationError('Unable to log in with provided credentials.')
-        else:
+        if not (username and password):
             raise serializers.ValidationError('Must include "username" and "password".')
-        return attrs
\ No newline at end of file
+
+        # Username or email in one lookup, one password hash
+        user = EmailOrUsernameBackend().authenticate(
+            self.context.get('request'),
+            username=username,
+            password=password,
+        )
+
+        if not user:
+            # Inactive accounts are rejected by the backend too
+            raise serializers.ValidationError('Unable to log in with provided credentials.')
+
+        attrs['user'] = user
+        return attrs
@@ -0,0 +1,138 @@
+# users/tasks.py
+"""
+Background participant imports.
+
+The admin endpoint stores the CSV on a pending ParticipantImport row, which
+makes the table the queue. ImportWorker, run by the mail worker (manage.py
+run_mail_worker), claims one row at a time with skip_locked and runs it on
+its own thread, so a long import doesn't hold up email; password hashing
+inside the import fans out to a process pool. A running import touches
+updated_at after every batch and every importer.HEARTBEAT_SECONDS while
+hashing, so a job is never stuck with a process that died: one that hasn't
+moved for PARTICIPANT_IMPORT_CLAIM_TIMEOUT is queued again, and failed
+after PARTICIPANT_IMPORT_MAX_ATTEMPTS claims. Batches are committed as they go,
+so rows a killed run already created are reported as existing on the retry.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .importer import import_participants
+from .models import ParticipantImport
+
+logger = logging.getLogger(__name__)
+
+
+def run_participant_import(job_id):
+    """Run a claimed import, recording progress and the outcome on the row."""
+    close_old_connections()
+    try:
+        job = ParticipantImport.objects.get(id=job_id)
+
+        def progress(result):
+            job.result = result.to_dict()
+            job.save(update_fields=["result", "updated_at"])
+
+        def heartbeat():
+            ParticipantImport.objects.filter(id=job_id).update(updated_at=timezone.now())
+
+        try:
+            result = import_participants(
+                job.content,
+                workers=getattr(settings, "PARTICIPANT_IMPORT_WORKERS", None),
+                batch_size=getattr(settings, "PARTICIPANT_IMPORT_BATCH_SIZE", 1000),
+                notifications_enabled=job.notifications_enabled,
+                progress=progress,
+                heartbeat=heartbeat,
+            )
+        except Exception as e:
+            logger.exception("Participant import %s failed", job_id)
+            job.status = ParticipantImport.STATUS_FAILED
+            job.error = str(e)[:1000]
+            # The CSV may hold passwords; don't keep it once nothing will read it again
+            job.content = ""
+            job.save(update_fields=["status", "error", "content", "updated_at"])
+            return
+
+        job.status = ParticipantImport.STATUS_DONE
+        job.result = result.to_dict()
+        job.content = ""
+        job.save(update_fields=["status", "result", "content", "updated_at"])
+        logger.info(
+            "Participant import %s created %d of %d rows (%.1f rows/s)",
+            job_id, result.created, result.total_rows, result.rows_per_second,
+        )
+    finally:
+        close_old_connections()
+
+
+class ImportWorker:
+    """Claims pending imports and runs one at a time; each one already uses every core to hash."""
+
+    def __init__(self, claim_timeout=None, max_attempts=None):
+        self.claim_timeout = timedelta(
+            seconds=claim_timeout or getattr(settings, "PARTICIPANT_IMPORT_CLAIM_TIMEOUT", 600)
+        )
+        self.max_attempts = max_attempts or getattr(settings, "PARTICIPANT_IMPORT_MAX_ATTEMPTS", 3)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="participant-import")
+        self.future = None
+
+    def reset_stale(self, now):
+        """Queue again jobs whose worker stopped mid-import; fail the ones that keep stopping it."""
+        # Progress and heartbeats keep updated_at moving while anybody is running it
+        stale = ParticipantImport.objects.filter(
+            status=ParticipantImport.STATUS_RUNNING,
+            updated_at__lt=now - self.claim_timeout,
+        )
+        stale.filter(attempts__gte=self.max_attempts).update(
+            status=ParticipantImport.STATUS_FAILED,
+            error=f"The import did not finish after {self.max_attempts} attempts",
+            content="",
+            updated_at=now,
+        )
+        stale.filter(content="").update(
+            status=ParticipantImport.STATUS_FAILED,
+            error="The import stopped and its file is no longer available",
+            updated_at=now,
+        )
+        stale.update(status=ParticipantImport.STATUS_PENDING, updated_at=now)
+
+    def claim(self):
+        now = timezone.now()
+        self.reset_stale(now)
+
+        with transaction.atomic():
+            # skip_locked lets several workers drain the same table
+            job_id = (
+                ParticipantImport.objects.select_for_update(skip_locked=True)
+                .filter(status=ParticipantImport.STATUS_PENDING)
+                .order_by("id")
+                .values_list("id", flat=True)
+                .first()
+            )
+            if job_id is not None:
+                ParticipantImport.objects.filter(id=job_id).update(
+                    status=ParticipantImport.STATUS_RUNNING,
+                    claimed_at=now,
+                    attempts=F("attempts") + 1,
+                    updated_at=now,
+                )
+        return job_id
+
+    def drain_once(self):
+        """Start the next pending import unless one is still running. Returns how many were claimed."""
+        if self.future is not None and not self.future.done():
+            return 0
+        job_id = self.claim()
+        if job_id is None:
+            return 0
+        self.future = self.executor.submit(run_participant_import, job_id)
+        return 1
+
+    def close(self):
+        self.executor.shutdown(wait=True)
@@ -1,3 +1,315 @@
-from django.test import TestCase
+# users/tests.py
+from concurrent.futures import Future
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.throttling import TokenBucketThrottle
+from users import importer
+from users.cleanup import EmailChangeSweeper, sweep_email_change_requests
+from users.importer import import_participants
+from users.models import CustomUser, EmailChangeRequest, ParticipantImport
+from users.tasks import ImportWorker, run_participant_import
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Requests authenticated by header through CachedTokenAuthentication, not force_authenticate."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user("reader", "reader@example.com", "Old-passw0rd!", first_name="Ada")
+        cls.token = Token.objects.create(user=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_uncached_by_default(self):
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                self.assertEqual(self.client.get("/api/user/").status_code, 200)
+
+    @override_settings(TOKEN_AUTH_CACHE="default")
+    def test_cached_in_shared_cache(self):
+        with self.assertNumQueries(1):
+            self.client.get("/api/user/")
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/user/")
+        self.assertEqual(response.json()["username"], "reader")
+
+    @override_settings(TOKEN_AUTH_CACHE="default")
+    def test_deactivation_is_seen_at_once(self):
+        self.client.get("/api/user/")
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get("/api/user/").status_code, 401)
+
+    @override_settings(TOKEN_AUTH_CACHE="default")
+    def test_logout_drops_token(self):
+        self.client.get("/api/user/")
+        self.assertEqual(self.client.post("/dj-rest-auth/logout/").status_code, 200)
+        self.assertEqual(self.client.get("/api/user/").status_code, 401)
+
+    @override_settings(TOKEN_AUTH_CACHE="default")
+    def test_password_change_keeps_newer_fields(self):
+        self.client.get("/api/user/")
+        # Changed without signals, so the cached user still has the old name
+        CustomUser.objects.filter(pk=self.user.pk).update(first_name="Grace")
+        response = self.client.patch(
+            "/api/user/", {"new_password1": "N3w-passw0rd!", "new_password2": "N3w-passw0rd!"}, format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        user = CustomUser.objects.get(pk=self.user.pk)
+        self.assertEqual(user.first_name, "Grace")
+        self.assertTrue(user.check_password("N3w-passw0rd!"))
+
+    @override_settings(TOKEN_AUTH_CACHE="default")
+    def test_profile_update_saves_submitted_fields(self):
+        self.client.get("/api/user/")
+        CustomUser.objects.filter(pk=self.user.pk).update(email="moved@example.com")
+        response = self.client.patch("/api/user/", {"last_name": "Lovelace"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        user = CustomUser.objects.get(pk=self.user.pk)
+        self.assertEqual((user.last_name, user.email), ("Lovelace", "moved@example.com"))
+
+
+class ThrottleTests(TestCase):
+    """Token buckets on the password reset and email change endpoints (rates from settings)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            CustomUser.objects.create_user(f"user{i}", f"user{i}@example.com", "Old-passw0rd!") for i in range(6)
+        ]
+        CustomUser.objects.create_user("taken", "taken@example.com", "Old-passw0rd!")
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def forgot(self, email, ip="10.0.0.1"):
+        return self.client.post("/api/forgot-password/", {"email": email}, format="json", REMOTE_ADDR=ip)
+
+    def request_change(self, user, new_email):
+        self.client.force_authenticate(user)
+        return self.client.post("/api/request-email-change/", {"new_email": new_email}, format="json")
+
+    def test_password_reset_per_email(self):
+        for i in range(3):
+            self.assertEqual(self.forgot("user0@example.com", ip=f"10.0.0.{i}").status_code, 200)
+        response = self.forgot("USER0@example.com ", ip="10.0.0.9")
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("error", response.json())
+        self.assertGreater(int(response["Retry-After"]), 0)
+        self.assertEqual(self.forgot("user1@example.com").status_code, 200)
+
+    def test_password_reset_per_ip(self):
+        for i in range(10):
+            self.assertEqual(self.forgot(f"nobody{i}@example.com").status_code, 200)
+        self.assertEqual(self.forgot("nobody10@example.com").status_code, 429)
+        self.assertEqual(self.forgot("nobody10@example.com", ip="10.0.0.2").status_code, 200)
+
+    def test_email_change_per_user(self):
+        user = self.users[0]
+        self.assertEqual(self.request_change(user, "moved@example.com").status_code, 200)
+        response = self.request_change(user, "elsewhere@example.com")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(EmailChangeRequest.objects.filter(user=user).count(), 1)
+        self.assertEqual(self.request_change(self.users[1], "elsewhere@example.com").status_code, 200)
+
+    def test_email_change_rejected_input_keeps_token(self):
+        user = self.users[0]
+        for new_email in ("", "not-an-email", user.email, "taken@example.com"):
+            self.assertEqual(self.request_change(user, new_email).status_code, 400, new_email)
+        self.assertEqual(self.request_change(user, "moved@example.com").status_code, 200)
+
+    def test_email_change_per_target(self):
+        for user in self.users[:5]:
+            self.assertEqual(self.request_change(user, "wanted@example.com").status_code, 200)
+        self.assertEqual(self.request_change(self.users[5], "wanted@example.com").status_code, 429)
+        self.assertEqual(EmailChangeRequest.objects.filter(new_email="wanted@example.com").count(), 5)
+
+    def test_bucket_refills(self):
+        user = self.users[0]
+        with mock.patch.object(TokenBucketThrottle, "timer", return_value=1000.0):
+            self.request_change(user, "moved@example.com")
+            self.assertEqual(self.request_change(user, "moved@example.com").status_code, 429)
+        with mock.patch.object(TokenBucketThrottle, "timer", return_value=1061.0):
+            self.assertEqual(self.request_change(user, "moved@example.com").status_code, 200)
+
+
+def participants_csv(*rows):
+    return "username,email\n" + "".join(f"{username},{email}\n" for username, email in rows)
+
+
+class ImporterTests(TestCase):
+
+    def test_imports_valid_rows_and_reports_the_rest(self):
+        CustomUser.objects.create_user("taken", "taken@example.com")
+        result = import_participants(participants_csv(
+            ("ada", "ada@example.com"),
+            ("taken", "other@example.com"),
+            ("grace", "TAKEN@example.com"),
+            ("bad name", "bad@example.com"),
+            ("alan", "ada@example.com"),
+        ))
+        self.assertEqual(result.created, 1)
+        self.assertEqual(sorted(error["line"] for error in result.errors), [3, 4, 5, 6])
+        self.assertEqual(result.to_dict()["skipped"], 4)
+        user = CustomUser.objects.get(username="ada")
+        self.assertFalse(user.has_usable_password())
+        self.assertTrue(user.emailaddress_set.filter(email="ada@example.com", primary=True).exists())
+
+    def test_conflict_after_validation_costs_only_that_row(self):
+        rows = [(f"user{i}", f"user{i}@example.com") for i in range(4)]
+        real_insert = importer._insert_batch
+
+        def insert_after_someone_else(batch, notifications_enabled):
+            # Another writer registers user2 between validation and the insert
+            if not CustomUser.objects.filter(username="user2").exists():
+                CustomUser.objects.create_user("user2", "elsewhere@example.com")
+            return real_insert(batch, notifications_enabled)
+
+        with mock.patch.object(importer, "_insert_batch", side_effect=insert_after_someone_else):
+            result = import_participants(participants_csv(*rows), batch_size=2)
+        self.assertEqual(result.created, 3)
+        self.assertEqual(result.errors, [{"line": 4, "error": "username 'user2' already exists"}])
+        self.assertEqual(CustomUser.objects.filter(email__startswith="user").count(), 3)
+
+    def test_errors_are_capped(self):
+        rows = [(f"user{i}", "not-an-email") for i in range(5)]
+        with mock.patch.object(importer, "MAX_ERRORS", 2):
+            summary = import_participants(participants_csv(*rows)).to_dict()
+        self.assertEqual(len(summary["errors"]), 2)
+        self.assertEqual((summary["error_count"], summary["skipped"]), (5, 5))
+
+
+class ImportWorkerTests(TestCase):
+
+    def setUp(self):
+        self.worker = ImportWorker()
+
+    def tearDown(self):
+        self.worker.close()
+
+    def drain(self):
+        # Inline rather than on the worker thread, which can't see this test's transaction
+        def submit(fn, *args):
+            future = Future()
+            future.set_result(fn(*args))
+            return future
+
+        with mock.patch.object(self.worker.executor, "submit", side_effect=submit), \
+                mock.patch("users.tasks.close_old_connections"):
+            return self.worker.drain_once()
+
+    def test_runs_pending_import_and_drops_the_file(self):
+        job = ParticipantImport.objects.create(
+            content=participants_csv(("ada", "ada@example.com")), notifications_enabled=True,
+        )
+        self.assertEqual(self.drain(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.content), (ParticipantImport.STATUS_DONE, 1, ""))
+        self.assertEqual(job.result["created"], 1)
+        self.assertTrue(CustomUser.objects.get(username="ada").email_notification_pref.enabled)
+        self.assertEqual(self.drain(), 0)
+
+    def test_stale_running_import_is_queued_again(self):
+        job = ParticipantImport.objects.create(
+            content=participants_csv(("ada", "ada@example.com")),
+            status=ParticipantImport.STATUS_RUNNING,
+            attempts=1,
+        )
+        ParticipantImport.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(self.drain(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (ParticipantImport.STATUS_DONE, 2))
+
+    def test_import_still_hashing_is_not_requeued(self):
+        long_ago = timezone.now() - timedelta(hours=1)
+        job = ParticipantImport.objects.create(
+            content=participants_csv(("ada", "ada@example.com"), ("alan", "alan@example.com")),
+            status=ParticipantImport.STATUS_RUNNING,
+            attempts=1,
+        )
+        # Claimed an hour ago and no batch inserted since: only heartbeats show it is alive
+        ParticipantImport.objects.filter(pk=job.pk).update(claimed_at=long_ago, updated_at=long_ago)
+        statuses = []
+        real_insert = importer._insert_batch
+
+        def insert(batch, notifications_enabled):
+            ImportWorker().reset_stale(timezone.now())
+            statuses.append(ParticipantImport.objects.get(pk=job.pk).status)
+            return real_insert(batch, notifications_enabled)
+
+        with mock.patch.object(importer, "HEARTBEAT_SECONDS", 0), \
+                mock.patch.object(importer, "_insert_batch", side_effect=insert), \
+                mock.patch("users.tasks.close_old_connections"):
+            run_participant_import(job.pk)
+        self.assertEqual(statuses, [ParticipantImport.STATUS_RUNNING])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (ParticipantImport.STATUS_DONE, 1))
+
+    def test_recent_running_import_is_left_alone(self):
+        ParticipantImport.objects.create(content="username,email\n", status=ParticipantImport.STATUS_RUNNING)
+        self.assertEqual(self.drain(), 0)
+
+    def test_stale_import_fails_after_max_attempts(self):
+        job = ParticipantImport.objects.create(
+            content="username,email\n", status=ParticipantImport.STATUS_RUNNING, attempts=3,
+        )
+        ParticipantImport.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(self.drain(), 0)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.content), (ParticipantImport.STATUS_FAILED, ""))
+        self.assertIn("3 attempts", job.error)
+
+
+class EmailChangeSweepTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user("mover", "mover@example.com")
+
+    def add_requests(self, count, is_used=False, expires_in=timedelta(hours=1)):
+        EmailChangeRequest.objects.bulk_create([
+            EmailChangeRequest(
+                user=self.user,
+                new_email=f"new{i}@example.com",
+                verification_code="123456",
+                expires_at=timezone.now() + expires_in,
+                is_used=is_used,
+            )
+            for i in range(count)
+        ])
+
+    def test_deletes_used_and_expired_only(self):
+        self.add_requests(3, is_used=True)
+        self.add_requests(4, expires_in=-timedelta(minutes=1))
+        self.add_requests(2)
+        self.assertEqual(sweep_email_change_requests(batch_size=2), {"used": 3, "expired": 4})
+        self.assertEqual(EmailChangeRequest.objects.count(), 2)
+
+    def test_max_batches_spans_both_kinds(self):
+        self.add_requests(3, is_used=True)
+        self.add_requests(3, expires_in=-timedelta(minutes=1))
+        self.assertEqual(sweep_email_change_requests(batch_size=2, max_batches=3), {"used": 3, "expired": 2})
+        self.assertEqual(sweep_email_change_requests(batch_size=2, max_batches=3), {"used": 0, "expired": 1})
+
+    def test_worker_sweeps_once_per_interval(self):
+        sweeper = EmailChangeSweeper(interval=3600, batch_size=2, max_batches=2)
+        self.add_requests(5, is_used=True)
+        with mock.patch("users.cleanup.time.monotonic", return_value=1000.0):
+            # Capped at 2 batches, so the rest goes in the next round
+            self.assertEqual(sweeper.run_due(), 4)
+            self.assertEqual(sweeper.run_due(), 1)
+            self.add_requests(1, is_used=True)
+            self.assertEqual(sweeper.run_due(), 0)
+        with mock.patch("users.cleanup.time.monotonic", return_value=4601.0):
+            self.assertEqual(sweeper.run_due(), 1)
@@ -0,0 +1,21 @@
+from api.throttling import FieldTokenBucketThrottle, IPTokenBucketThrottle, UserTokenBucketThrottle
+
+
+class PasswordResetIPThrottle(IPTokenBucketThrottle):
+    scope = "password_reset_ip"
+
+
+class PasswordResetEmailThrottle(FieldTokenBucketThrottle):
+    scope = "password_reset_email"
+    field = "email"
+
+
+class EmailChangeUserThrottle(UserTokenBucketThrottle):
+    # Replaces the 60 second cooldown query on EmailChangeRequest. Only
+    # consumed once the request is valid (RequestEmailChangeView)
+    scope = "email_change_user"
+
+
+class EmailChangeTargetThrottle(FieldTokenBucketThrottle):
+    scope = "email_change_email"
+    field = "new_email"
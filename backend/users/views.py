@@ -17,11 +17,17 @@ from django.conf import settings
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 from .models import CustomUser, EmailNotificationPreference
-import sib_api_v3_sdk
-from sib_api_v3_sdk.rest import ApiException
-from django.utils import timezone
-from datetime import timedelta
-from .models import EmailChangeRequest
+from mailer.models import OutboxEmail
+from mailer.outbox import enqueue_email
+from .models import EmailChangeRequest, ParticipantImport
+from .importer import import_participants, read_rows
+from .throttling import (
+    EmailChangeTargetThrottle,
+    EmailChangeUserThrottle,
+    PasswordResetEmailThrottle,
+    PasswordResetIPThrottle,
+)
+from api.throttling import ErrorMessageThrottleMixin, ValidatedThrottleMixin
 
 
 class CurrentUserView(APIView):
@@ -62,7 +68,8 @@ class CurrentUserView(APIView):
                 )
 
             user.set_password(new_password1)
-            user.save()
+            # Only the changed column, so a stale request.user can't write other fields back
+            user.save(update_fields=["password"])
 
             return Response(
                 {"message": "Password updated successfully."},
@@ -87,8 +94,11 @@ class CurrentUserView(APIView):
         return self.patch(request)
 
 
-class ForgotPasswordView(APIView):
+class ForgotPasswordView(ErrorMessageThrottleMixin, APIView):
     permission_classes = [AllowAny]
+    # Checked before the user lookup, token generation or outbox insert
+    throttle_classes = [PasswordResetIPThrottle, PasswordResetEmailThrottle]
+    throttle_message = 'Too many password reset requests. Please try again in {wait} seconds.'
 
     def post(self, request):
         email = request.data.get('email', '').strip()
@@ -100,7 +110,7 @@ class ForgotPasswordView(APIView):
             )
 
         try:
-            user = CustomUser.objects.get(email=email)
+            user = CustomUser.objects.with_email(email).get()
         except CustomUser.DoesNotExist:
             # Don't reveal if email exists or not (security)
             return Response(
@@ -122,41 +132,15 @@ class ForgotPasswordView(APIView):
             'site_name': 'The Podium',
         })
 
-        # Configure Brevo API
-        configuration = sib_api_v3_sdk.Configuration()
-        configuration.api_key['api-key'] = settings.BREVO_API_KEY
-        
-        api_instance = sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
-        
-        # Prepare email
-        sender = {
-            "name": settings.BREVO_SENDER_NAME,
-            "email": settings.BREVO_SENDER_EMAIL
-        }
-        to = [{"email": user.email, "name": f"{user.first_name} {user.last_name}".strip() or user.username}]
-        
-        send_smtp_email = sib_api_v3_sdk.SendSmtpEmail(
-            to=to,
-            sender=sender,
+        # Delivered by the mail worker
+        enqueue_email(
+            kind=OutboxEmail.KIND_PASSWORD_RESET,
+            to_email=user.email,
+            to_name=f"{user.first_name} {user.last_name}".strip() or user.username,
             subject='Reset Your Password - The Podium',
-            html_content=html_message
+            html_content=html_message,
         )
 
-        try:
-            api_response = api_instance.send_transac_email(send_smtp_email)
-            print(f"✅ Password reset email sent successfully to {user.email}")
-            print(f"   Brevo Message ID: {api_response.message_id}")
-        except ApiException as e:
-            print(f"   Failed to send password reset email to {user.email}")
-            print(f"   Error: {e}")
-            print(f"   Status: {e.status}")
-            print(f"   Reason: {e.reason}")
-            print(f"   Body: {e.body}")
-            return Response(
-                {'error': 'Failed to send reset email. Please try again later.'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-
         return Response(
             {'message': 'If an account exists with this email, a password reset link has been sent.'},
             status=status.HTTP_200_OK
@@ -210,8 +194,11 @@ class ResetPasswordView(APIView):
         )
     
 
-class RequestEmailChangeView(APIView):
+class RequestEmailChangeView(ValidatedThrottleMixin, ErrorMessageThrottleMixin, APIView):
     permission_classes = [IsAuthenticated]
+    # Consumed after validation, so a typo doesn't lock the user out for a minute
+    throttle_classes = [EmailChangeUserThrottle, EmailChangeTargetThrottle]
+    throttle_message = 'Please wait {wait} seconds before requesting a new code'
 
     def post(self, request):
         new_email = request.data.get('new_email', '').strip().lower()
@@ -241,24 +228,13 @@ class RequestEmailChangeView(APIView):
             )
         
         # Check if email is already taken by another user
-        if CustomUser.objects.filter(email=new_email).exists():
+        if CustomUser.objects.with_email(new_email).exists():
             return Response(
                 {'error': 'This email is already in use by another account'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        # Rate limiting: Check for recent requests (60 seconds cooldown)
-        recent_request = EmailChangeRequest.objects.filter(
-            user=request.user,
-            created_at__gte=timezone.now() - timedelta(seconds=60)
-        ).first()
-        
-        if recent_request:
-            seconds_remaining = 60 - (timezone.now() - recent_request.created_at).seconds
-            return Response(
-                {'error': f'Please wait {seconds_remaining} seconds before requesting a new code'},
-                status=status.HTTP_429_TOO_MANY_REQUESTS
-            )
+
+        self.consume_throttles(request)
         
         # Invalidate any previous unused requests for this user
         EmailChangeRequest.objects.filter(
@@ -279,41 +255,16 @@ class RequestEmailChangeView(APIView):
             'verification_code': email_change_request.verification_code,
         })
         
-        # Configure Brevo API
-        configuration = sib_api_v3_sdk.Configuration()
-        configuration.api_key['api-key'] = settings.BREVO_API_KEY
-        
-        api_instance = sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
-        
-        # Prepare email - SEND TO CURRENT EMAIL (not new email)
-        sender = {
-            "name": settings.BREVO_SENDER_NAME,
-            "email": settings.BREVO_SENDER_EMAIL
-        }
-        to = [{"email": request.user.email, "name": f"{request.user.first_name} {request.user.last_name}".strip() or request.user.username}]
-        
-        send_smtp_email = sib_api_v3_sdk.SendSmtpEmail(
-            to=to,
-            sender=sender,
+        # Delivered by the mail worker; the dedupe key keeps one email per code
+        enqueue_email(
+            kind=OutboxEmail.KIND_EMAIL_CHANGE_CODE,
+            to_email=request.user.email,
+            to_name=f"{request.user.first_name} {request.user.last_name}".strip() or request.user.username,
             subject='Verify Your Email Change - The Podium',
-            html_content=html_message
+            html_content=html_message,
+            dedupe_key=f"email-change-code:{email_change_request.id}",
         )
         
-        try:
-            api_response = api_instance.send_transac_email(send_smtp_email)
-            print(f"Email verification code sent successfully to {request.user.email}")
-            print(f"   Brevo Message ID: {api_response.message_id}")
-            print(f"   Verification Code: {email_change_request.verification_code}")  # For testing
-        except ApiException as e:
-            print(f"Failed to send verification email to {request.user.email}")
-            print(f" Error: {e}")
-            # Clean up the failed request
-            email_change_request.delete()
-            return Response(
-                {'error': 'Failed to send verification email. Please try again later.'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-        
         return Response(
             {
                 'message': 'Verification code sent to your current email address',
@@ -379,7 +330,7 @@ class VerifyEmailChangeView(APIView):
             )
         
         # Double-check email is still available
-        if CustomUser.objects.filter(email=new_email).exists():
+        if CustomUser.objects.with_email(new_email).exists():
             return Response(
                 {'error': 'This email is already in use by another account'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -390,7 +341,7 @@ class VerifyEmailChangeView(APIView):
         
         # Update user email
         request.user.email = new_email
-        request.user.save()
+        request.user.save(update_fields=["email"])
         
         # Mark request as used
         email_change_request.is_used = True
@@ -403,32 +354,15 @@ class VerifyEmailChangeView(APIView):
             'new_email': new_email,
         })
         
-        configuration = sib_api_v3_sdk.Configuration()
-        configuration.api_key['api-key'] = settings.BREVO_API_KEY
-        
-        api_instance = sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
-        
-        sender = {
-            "name": settings.BREVO_SENDER_NAME,
-            "email": settings.BREVO_SENDER_EMAIL
-        }
-        to = [{"email": new_email, "name": f"{request.user.first_name} {request.user.last_name}".strip() or request.user.username}]
-        
-        send_smtp_email = sib_api_v3_sdk.SendSmtpEmail(
-            to=to,
-            sender=sender,
+        enqueue_email(
+            kind=OutboxEmail.KIND_EMAIL_CHANGE_NOTICE,
+            to_email=new_email,
+            to_name=f"{request.user.first_name} {request.user.last_name}".strip() or request.user.username,
             subject='Email Address Changed Successfully - The Podium',
-            html_content=html_notification
+            html_content=html_notification,
+            dedupe_key=f"email-change-notice:{email_change_request.id}",
         )
         
-        try:
-            api_instance.send_transac_email(send_smtp_email)
-            print(f"Email change notification sent to new email: {new_email}")
-        except ApiException as e:
-            print(f"Failed to send notification to new email: {new_email}")
-            print(f"Error: {e}")
-            # Don't fail the request if notification fails
-        
         # Return updated user data
         serializer = UserSerializer(request.user)
         return Response(
@@ -474,3 +408,70 @@ class EmailNotificationToggleView(APIView):
             "enabled": pref.enabled
         })
 
+
+
+def _participant_import_data(job):
+    return {
+        "id": job.id,
+        "filename": job.filename,
+        "status": job.status,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+    }
+
+
+class ParticipantImportView(APIView):
+    """
+    Admin-only CSV import of participants (username, email and optional
+    first_name, last_name, password columns). dry_run=true validates and
+    reports errors without creating anyone; otherwise the import runs in
+    the background and this returns the job to poll.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if request.user.role != "admin":
+            return Response({"error": "Only admins can import participants."}, status=status.HTTP_403_FORBIDDEN)
+
+        upload = request.FILES.get("file")
+        if not upload:
+            return Response({"error": "A CSV file is required"}, status=status.HTTP_400_BAD_REQUEST)
+        max_bytes = getattr(settings, "PARTICIPANT_IMPORT_MAX_BYTES", 20 * 1024 * 1024)
+        if upload.size > max_bytes:
+            return Response({"error": f"The file is larger than {max_bytes // (1024 * 1024)} MB"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            content = upload.read().decode("utf-8-sig")
+            # Bad headers fail the request now rather than the background job
+            read_rows(content)
+        except (UnicodeDecodeError, ValueError) as e:
+            message = "The file must be UTF-8 encoded CSV" if isinstance(e, UnicodeDecodeError) else str(e)
+            return Response({"error": message}, status=status.HTTP_400_BAD_REQUEST)
+
+        if str(request.data.get("dry_run", "")).lower() in ("1", "true", "yes"):
+            result = import_participants(content, dry_run=True)
+            return Response(result.to_dict())
+
+        notifications_enabled = str(request.data.get("notifications", "")).lower() in ("1", "true", "yes")
+        # Picked up by the mail worker (users.tasks.ImportWorker)
+        job = ParticipantImport.objects.create(
+            created_by=request.user,
+            filename=upload.name[:255],
+            content=content,
+            notifications_enabled=notifications_enabled,
+        )
+        return Response(_participant_import_data(job), status=status.HTTP_202_ACCEPTED)
+
+
+class ParticipantImportDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        if request.user.role != "admin":
+            return Response({"error": "Only admins can view imports."}, status=status.HTTP_403_FORBIDDEN)
+        job = ParticipantImport.objects.filter(pk=pk).first()
+        if job is None:
+            return Response({"error": "Import not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(_participant_import_data(job))
@@ -18,7 +18,7 @@ import {
 } from "recharts";
 import { useEffect, useRef, useState } from "react";
 import { motion } from "framer-motion";
-import type { EvaluationAnalytics, Evaluation } from "@/utils/types";
+import type { EvaluationAnalytics } from "@/utils/types";
 
 const COLORS = [
   "#c2beff", // Light violet — high contrast on dark, soft on light
@@ -51,13 +51,11 @@ function buildCategoryDataset(
     return labels.map((label, i) => ({ name: label, value: series[i] }));
   }
 
-  const counts = [0, 0, 0, 0, 0];
-  analytics.evaluations.forEach((e: Evaluation) => {
-    const val = (e as any)[category] ?? 0;
-    if (val >= 1 && val <= 5) counts[val - 1] += 1;
-  });
-
-  return counts.map((c, idx) => ({ name: String(idx + 1), value: c }));
+  const counts = analytics.distributions?.[category] ?? {};
+  return [1, 2, 3, 4, 5].map((rating) => ({
+    name: String(rating),
+    value: counts[String(rating)] ?? 0,
+  }));
 }
 
 export default function ChartSwitcher({
@@ -25,13 +25,23 @@ interface Props {
   isOpen: boolean;
   onClose: () => void;
   evaluations: Evaluation[];
+  // Responses are paged from the server; search and copy cover the loaded ones
+  total?: number;
+  hasMore?: boolean;
+  loading?: boolean;
+  onLoadMore?: () => void;
 }
 
 export default function SuggestionsListDrawer({
   isOpen,
   onClose,
   evaluations,
+  total,
+  hasMore = false,
+  loading = false,
+  onLoadMore,
 }: Props) {
+  const evaluatorCount = total ?? evaluations.length;
   const [query, setQuery] = useState("");
   const [currentPage, setCurrentPage] = useState(1);
   const [visibleCount, setVisibleCount] = useState(10);
@@ -107,7 +117,9 @@ export default function SuggestionsListDrawer({
                 Evaluator Suggestions
               </DialogTitle>
               <div className="text-sm text-muted-foreground">
-                {evaluations.length} evaluator{evaluations.length !== 1 && "s"}
+                {evaluatorCount} evaluator{evaluatorCount !== 1 && "s"}
+                {evaluations.length < evaluatorCount &&
+                  ` (${evaluations.length} loaded)`}
               </div>
             </div>
 
@@ -199,7 +211,7 @@ export default function SuggestionsListDrawer({
               </motion.div>
             ))}
 
-            {filtered.length === 0 && (
+            {filtered.length === 0 && !loading && (
               <div className="text-center py-10 text-sm text-muted-foreground">
                 No evaluators found.
               </div>
@@ -266,7 +278,12 @@ export default function SuggestionsListDrawer({
         )}
 
         {/* Footer */}
-        <div className="flex items-center justify-end pt-2">
+        <div className="flex items-center justify-end gap-2 pt-2">
+          {(hasMore || loading) && onLoadMore && (
+            <Button variant="outline" onClick={onLoadMore} disabled={loading}>
+              {loading ? "Loading..." : "Load more responses"}
+            </Button>
+          )}
           <Button variant="ghost" onClick={onClose}>
             Close
           </Button>
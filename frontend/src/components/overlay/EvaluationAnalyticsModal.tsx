@@ -25,7 +25,7 @@ import {
   MessageSquare,
   RefreshCw,
 } from "lucide-react";
-import { useSeminarAnalytics } from "@/hooks/useSeminarAnalytics";
+import { useSeminarAnalytics, useSeminarResponses } from "@/hooks/useSeminarAnalytics";
 import ChartSwitcher from "@/components/analytics/ChartSwitcher";
 import RatingsSummary from "@/components/analytics/RatingsSummary";
 import SuggestionsListDrawer from "@/components/analytics/SuggestionsListDrawer";
@@ -62,6 +62,7 @@ export default function EvaluationAnalyticsModal({
   const [chartType, setChartType] = useState<"bar" | "pie" | "radar">("bar");
   const [category, setCategory] = useState<CategoryKey>("all");
   const [showSuggestions, setShowSuggestions] = useState(false);
+  const responses = useSeminarResponses(seminarId, showSuggestions);
 
   const { averages, labels, series } = useMemo(() => {
     const out = {
@@ -76,30 +77,17 @@ export default function EvaluationAnalyticsModal({
       series: [] as number[],
     };
 
-    if (!data?.evaluations?.length) return out;
+    if (!data?.total_responses) return out;
 
-    const counts = data.evaluations.length;
-    const totals = {
-      content_and_relevance: 0,
-      presenters_effectiveness: 0,
-      organization_structure: 0,
-      materials_usefulness: 0,
-      overall_satisfaction: 0,
+    // Averages come precomputed from the seminar's evaluation summary
+    out.averages = {
+      content_and_relevance: +(data.averages.avg_content_and_relevance ?? 0).toFixed(2),
+      presenters_effectiveness: +(data.averages.avg_presenters_effectiveness ?? 0).toFixed(2),
+      organization_structure: +(data.averages.avg_organization_and_structure ?? 0).toFixed(2),
+      materials_usefulness: +(data.averages.avg_materials_usefulness ?? 0).toFixed(2),
+      overall_satisfaction: +(data.averages.avg_overall_satisfaction ?? 0).toFixed(2),
     };
 
-    data.evaluations.forEach((e) => {
-      totals.content_and_relevance += e.content_and_relevance;
-      totals.presenters_effectiveness += e.presenters_effectiveness;
-      totals.organization_structure += e.organization_and_structure;
-      totals.materials_usefulness += e.materials_usefulness;
-      totals.overall_satisfaction += e.overall_satisfaction;
-    });
-
-    Object.keys(totals).forEach((key) => {
-      // @ts-ignore
-      out.averages[key] = +(totals[key] / counts).toFixed(2);
-    });
-
     out.labels = [
       "Content & Relevance",
       "Presenter Effectiveness",
@@ -251,7 +239,7 @@ export default function EvaluationAnalyticsModal({
                     <p className="py-8 text-sm text-center text-destructive">
                       {error}
                     </p>
-                  ) : !data?.evaluations?.length ? (
+                  ) : !data?.total_responses ? (
                     <p className="py-8 text-sm text-center text-muted-foreground">
                       No evaluation data to display.
                     </p>
@@ -283,7 +271,11 @@ export default function EvaluationAnalyticsModal({
       <SuggestionsListDrawer
         isOpen={showSuggestions}
         onClose={() => setShowSuggestions(false)}
-        evaluations={data?.evaluations ?? []}
+        evaluations={responses.evaluations}
+        total={data?.total_responses}
+        hasMore={responses.hasMore}
+        loading={responses.loading}
+        onLoadMore={responses.loadMore}
       />
     </>
   );
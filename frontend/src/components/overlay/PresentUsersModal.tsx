@@ -129,7 +129,8 @@ export function PresentUsersModal({
 
       if (res.ok && data.status === "success") {
         setCertificateDialog({
-          base64: data.certificate_base64,
+          // Hosted certificates come back as a signed link instead of base64
+          base64: data.certificate_base64 ?? data.certificate_url,
           email: user.email, // now always uses the correct attendee email
         });
         setConfirmUser(null);
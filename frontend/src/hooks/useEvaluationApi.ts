@@ -25,6 +25,10 @@ interface UseEvaluationApi {
   getSeminarAnalytics: (
     seminarId: number
   ) => Promise<ApiResponse<EvaluationAnalytics>>;
+  getSeminarResponses: (
+    seminarId: number,
+    page: number
+  ) => Promise<ApiResponse<EvaluationAnalytics>>;
 }
 
 export function useEvaluationApi(): UseEvaluationApi {
@@ -93,6 +97,7 @@ export function useEvaluationApi(): UseEvaluationApi {
   };
 
   
+  // Summary only: averages and distributions, without the raw responses
   const getSeminarAnalytics = async (
     seminarId: number
   ): Promise<ApiResponse<EvaluationAnalytics>> => {
@@ -107,10 +112,27 @@ export function useEvaluationApi(): UseEvaluationApi {
     return { status: res.status, data };
   };
 
+  // One page (50) of responses, fetched when the suggestions list needs it
+  const getSeminarResponses = async (
+    seminarId: number,
+    page: number
+  ): Promise<ApiResponse<EvaluationAnalytics>> => {
+    if (!token) throw new Error("Missing authentication token");
+    const res = await fetch(
+      `${BASE_URL}/api/evaluations/seminar/${seminarId}/analytics/?include=responses&page=${page}`,
+      {
+        headers: { Authorization: `Token ${token}` },
+      }
+    );
+    const data = await res.json();
+    return { status: res.status, data };
+  };
+
   return {
     getAvailableEvaluations,
     submitEvaluation,
     submitEvaluationWithCertificate,
     getSeminarAnalytics,
+    getSeminarResponses,
   };
 }
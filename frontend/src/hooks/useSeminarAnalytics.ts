@@ -1,6 +1,6 @@
-import { useEffect, useState, useRef } from "react";
+import { useCallback, useEffect, useState, useRef } from "react";
 import { useEvaluationApi } from "@/hooks/useEvaluationApi";
-import type { EvaluationAnalytics } from "@/utils/types";
+import type { Evaluation, EvaluationAnalytics } from "@/utils/types";
 
 interface ApiResponse<T> {
   status: number;
@@ -56,3 +56,48 @@ export function useSeminarAnalytics(seminarId: number | null) {
 
   return { data, loading, error };
 }
+
+// Raw responses, paged on demand: nothing is fetched until enabled, then
+// one page at a time through loadMore()
+export function useSeminarResponses(seminarId: number | null, enabled: boolean) {
+  const { getSeminarResponses } = useEvaluationApi();
+  const getResponsesRef = useRef(getSeminarResponses); // keep stable ref
+  const [evaluations, setEvaluations] = useState<Evaluation[]>([]);
+  const [nextPage, setNextPage] = useState<number | null>(1);
+  const [loading, setLoading] = useState(false);
+  const [error, setError] = useState<string | null>(null);
+  const loadingRef = useRef(false);
+
+  useEffect(() => {
+    setEvaluations([]);
+    setNextPage(1);
+    setError(null);
+  }, [seminarId]);
+
+  const loadMore = useCallback(async () => {
+    if (!seminarId || nextPage === null || loadingRef.current) return;
+    loadingRef.current = true;
+    setLoading(true);
+    setError(null);
+    try {
+      const res = await getResponsesRef.current(seminarId, nextPage);
+      if (res.status >= 200 && res.status < 300) {
+        setEvaluations((prev) => [...prev, ...(res.data.evaluations ?? [])]);
+        setNextPage(res.data.next ? nextPage + 1 : null);
+      } else {
+        setError("Failed to load responses");
+      }
+    } catch (err) {
+      setError((err as Error)?.message ?? "Unknown error");
+    } finally {
+      loadingRef.current = false;
+      setLoading(false);
+    }
+  }, [seminarId, nextPage]);
+
+  useEffect(() => {
+    if (enabled && nextPage === 1 && evaluations.length === 0) loadMore();
+  }, [enabled, nextPage, evaluations.length, loadMore]);
+
+  return { evaluations, hasMore: nextPage !== null, loading, error, loadMore };
+}
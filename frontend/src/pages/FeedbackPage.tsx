@@ -59,7 +59,11 @@ const handleSubmit = async (payload: EvaluationPayload) => {
       setSelectedSeminar(null);
     }
 
-    toast.success("Evaluation submitted successfully!");
+    toast.success(
+      response?.certificate_delivery
+        ? "Evaluation submitted! Your certificate will be emailed to you shortly."
+        : "Evaluation submitted successfully!"
+    );
   } catch (err) {
     console.error("Submission failed", err);
     toast.error("Failed to submit evaluation. Please try again.");
@@ -111,16 +111,32 @@ export interface EvaluationPayload {
   suggestions: string;
 }
 
+export interface CertificateDelivery {
+  id: number;
+  seminar: number;
+  user: number;
+  status: "queued" | "rendering" | "queued_for_email" | "sent" | "failed";
+  error: string;
+  created_at: string;
+  updated_at: string;
+  status_url: string;
+}
+
 export interface SubmitEvaluationResponse {
   success: string;
   certificate_url: string;
+  certificate_delivery?: CertificateDelivery;
 }
 
 export interface EvaluationAnalytics {
   seminar_id: number;
   seminar_title: string;
   total_responses: number;
-  evaluations: Evaluation[];
+  averages: Record<string, number | null>;
+  distributions: Record<string, Record<string, number>>;
+  evaluations?: Evaluation[]; // only with ?include=responses, 50 per page
+  next?: string | null;
+  previous?: string | null;
 }
 
 // src/utils/types.ts (additions)